@@ -0,0 +1,92 @@
+"""pytest-benchmark suite of the hot paths, on synthetic data only.
+
+Not collected by the unit test run (``testpaths = tests``), run it with::
+
+    pytest benchmarks                      # measure
+    tox -e benchmark                       # compare to the stored baseline
+
+The baseline is ``benchmarks/baselines/baseline.json``.  Absolute
+times only mean something on the machine they were measured on, so every
+run also times a fixed numpy workload (`reference_seconds`) and stores it
+in its JSON.  When comparing, the baseline times are scaled by the ratio
+of the two reference times: what is compared is each benchmark relative
+to the reference, measured in the same run.  ``tox -e benchmark`` fails
+when the minimum time of a benchmark got more than 25 % slower than that,
+and when there is no baseline to compare to.
+
+Small numbers of a loaded machine still vary more than 25 % from run to
+run; the gate is meant for a quiet CI runner.  The baseline is recorded
+once, at the end of a series of changes, in a commit of its own::
+
+    pytest benchmarks --benchmark-json=benchmarks/baselines/baseline.json
+"""
+
+import functools
+import time
+
+import numpy as np
+import pytest
+
+from orbit_viewer import synthetic
+
+SIZES = [10 ** 5, 10 ** 6, 10 ** 7]
+
+_STATS = ['min', 'max', 'mean', 'stddev', 'median', 'iqr', 'q1', 'q3', 'ld15iqr', 'hd15iqr', 'total']
+
+
+@functools.lru_cache()
+def reference_seconds(repeat: int = 20) -> float:
+    """Best time of a fixed sort and sine of 2^20 floats, the unit benchmarks are compared in."""
+    values = np.random.default_rng(0).normal(size=1 << 20)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        np.sort(values)
+        np.sin(values)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    output_json['reference_seconds'] = reference_seconds()
+
+
+def pytest_benchmark_compare_machine_info(config, benchmarksession, machine_info, compared_benchmark):
+    """Scale the times of the baseline to the speed of this run."""
+    saved = compared_benchmark.get('reference_seconds')
+    if not saved:
+        benchmarksession.logger.warning('the baseline has no reference time, comparing absolute times')
+        return
+
+    scale = reference_seconds() / saved
+    benchmarksession.logger.info('baseline times scaled by {:.3f}, the ratio of the reference times'.format(scale))
+    for benchmark in compared_benchmark['benchmarks']:
+        stats = benchmark['stats']
+        for name in _STATS:
+            if name in stats:
+                stats[name] *= scale
+        stats['ops'] /= scale
+
+
+def synthetic_orbit(samples: int):
+    """`samples` minutes of an MMS-like orbit."""
+    start = np.datetime64('2020-01-01', 'ns')
+    return synthetic.orbit('mms', start, start + samples * np.timedelta64(60, 's'))
+
+
+def magnetopause(theta, phi):
+    """Shue et al. 1997 like boundary, standing in for `space.models.planetary`."""
+    r = 10.0 * (2 / (1 + np.cos(theta))) ** 0.58
+    return r * np.cos(theta), r * np.sin(theta) * np.cos(phi), r * np.sin(theta) * np.sin(phi)
+
+
+_orbits = {}
+
+
+@pytest.fixture
+def orbit(request):
+    """Synthetic orbit of `request.param` samples, generated once per session."""
+    samples = request.param
+    if samples not in _orbits:
+        _orbits[samples] = synthetic_orbit(samples)
+    return _orbits[samples]
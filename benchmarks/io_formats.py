@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Compare reading a selection back from .ovc, .npz and CSV.
+
+    python benchmarks/io_formats.py [samples]
+
+.ovc and .npz hold the selected samples and their intervals in one file,
+read by `load_selection`; the text export is a CSV of the samples and a
+CSV of the intervals.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from orbit_viewer.io import load_intervals, load_orbit, load_selection, save_intervals, save_selection
+from orbit_viewer.shapes import intervals
+from orbit_viewer.trajectory import Trajectory
+
+
+def _timed(function, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _save_csv(path, trajectory, mask, selected):
+    samples = trajectory[mask]
+    np.savetxt(path, np.column_stack([np.datetime_as_string(samples.datetimes), samples.positions]),
+               fmt='%s', delimiter=',')
+    save_intervals(_intervals_path(path), selected)
+
+
+def _load_csv(path):
+    return load_orbit(path), load_intervals(_intervals_path(path))
+
+
+def _intervals_path(path):
+    return path.replace('.csv', '.intervals.csv')
+
+
+if __name__ == '__main__':
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    rng = np.random.default_rng(0)
+    times = np.datetime64('2020-01-01', 'ns') + np.arange(samples) * np.timedelta64(60, 's')
+    trajectory = Trajectory(times, rng.normal(size=(samples, 3)) * 10,
+                            velocities=rng.normal(size=(samples, 3)))
+    # half of the samples, in hour long intervals
+    mask = (np.arange(samples) // 60) % 2 == 0
+    selected = intervals(trajectory.datetimes, mask)
+
+    with tempfile.TemporaryDirectory() as directory:
+        print('{} samples, {} selected in {} intervals'.format(samples, mask.sum(), len(selected)))
+        for suffix in ['.ovc', '.npz', '.csv']:
+            path = os.path.join(directory, 'selection' + suffix)
+
+            if suffix == '.csv':
+                written, _ = _timed(lambda: _save_csv(path, trajectory, mask, selected), 1)
+                opened, (loaded, _) = _timed(lambda: _load_csv(path), 1)
+                size = os.path.getsize(path) + os.path.getsize(_intervals_path(path))
+            else:
+                written, _ = _timed(lambda: save_selection(path, trajectory, mask, selected), 1)
+                opened, (loaded, _) = _timed(lambda: load_selection(path))
+                size = os.path.getsize(path)
+            # touching every sample, what an analysis would do next
+            touched, _ = _timed(lambda: loaded.positions.sum(axis=0))
+
+            print('{:5} write {:8.3f}s  open {:8.4f}s  full scan {:8.4f}s  {:8.1f} MB'.format(
+                suffix, written, opened, touched, size / 1e6))
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Cost of building representative scenes, headless.
+
+    python benchmarks/scene_construction.py [--json results.json] [scene ...]
+
+Each scene is built in its own process on the offscreen Qt platform with
+software OpenGL (see `orbit_viewer.offscreen`), so neither a display nor
+a GPU is needed.  Reported per scene: construction time, the number of
+entities and Qt3D nodes, the memory Python allocated while building
+(tracemalloc: numpy arrays and Python objects, not Qt's C++ side) and the
+time from the start of the construction to the first rendered frame.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def _magnetopause(theta, phi):
+    r = 10.0 * (2 / (1 + np.cos(theta))) ** 0.58
+    return r * np.cos(theta), r * np.sin(theta) * np.cos(phi), r * np.sin(theta) * np.sin(phi)
+
+
+def _bow_shock(theta, phi):
+    r = 13.0 * (2 / (1 + 0.8 * np.cos(theta))) ** 0.7
+    return r * np.cos(theta), r * np.sin(theta) * np.cos(phi), r * np.sin(theta) * np.sin(phi)
+
+
+def point_grid(scene, data):
+    """121 small entities like example/simple3d.py."""
+    from PySide2.Qt3DCore import Qt3DCore
+    from PySide2.Qt3DExtras import Qt3DExtras
+    from PySide2.QtGui import QVector3D
+
+    scene.points = []
+    for x in range(-5, 6):
+        for y in range(-5, 6):
+            entity = Qt3DCore.QEntity(scene)
+            mesh = Qt3DExtras.QSphereMesh(entity)
+            mesh.setRadius(0.2)
+            transform = Qt3DCore.QTransform(entity)
+            transform.setTranslation(QVector3D(x * 2, y * 2, 0))
+            entity.addComponent(mesh)
+            entity.addComponent(transform)
+            entity.addComponent(Qt3DExtras.QPhongMaterial(entity))
+            scene.points.append(entity)
+
+
+def _cloud():
+    rng = np.random.default_rng(0)
+    return rng.normal(scale=10.0, size=(10 ** 6, 3)).astype(np.float32), rng.random((10 ** 6, 3))
+
+
+def point_cloud(scene, cloud):
+    """10^6 points with their own colors, one entity and one draw call."""
+    positions, colors = cloud
+    scene.addPoints(positions, colors=colors, size=2.0)
+
+
+def _samples():
+    from orbit_viewer.synthetic import orbit
+
+    # 10^6 minutes
+    return orbit('mms', np.datetime64('2020-01-01'), np.datetime64('2020-01-01') + np.timedelta64(10 ** 6, 'm'))
+
+
+def scatter(scene, trajectory):
+    """10^6 orbit samples colored by time, from the numpy arrays as example/orbit.py does."""
+    from orbit_viewer.geometry import colormap
+
+    scene.addPoints(trajectory.positions32, size=3.0, colors=colormap(trajectory.times))
+
+
+def dv_scatter(scene, trajectory):
+    """The same samples fed to a QtDataVisualization scatter series, one QVector3D per sample."""
+    from PySide2.QtDataVisualization import QtDataVisualization
+    from PySide2.QtGui import QVector3D
+
+    # resetArray() of a whole list aborts in PySide2 5.13, items go one by one
+    proxy = QtDataVisualization.QScatterDataProxy()
+    for x, y, z in trajectory.positions.tolist():
+        proxy.addItem(QtDataVisualization.QScatterDataItem(QVector3D(x, y, z)))
+    scene.scatterSeries = QtDataVisualization.QScatter3DSeries(proxy)
+
+
+def _earth_map():
+    import os
+    import tempfile
+    from PySide2.QtGui import QImage, QColor
+
+    image = QImage(2048, 1024, QImage.Format_RGB32)
+    image.fill(QColor(40, 90, 200))
+    path = os.path.join(tempfile.mkdtemp(), 'earthmap.png')
+    image.save(path)
+    return path
+
+
+def textured_planes(scene, path):
+    """50 planes with the same 2048 x 1024 image, from the scene's texture cache."""
+    from PySide2.Qt3DCore import Qt3DCore
+    from PySide2.Qt3DExtras import Qt3DExtras
+    from PySide2.QtGui import QVector3D
+
+    scene.planes = []
+    for i in range(50):
+        entity = Qt3DCore.QEntity(scene)
+        mesh = Qt3DExtras.QPlaneMesh(entity)
+        transform = Qt3DCore.QTransform(entity)
+        transform.setTranslation(QVector3D(0, i, 0))
+        entity.addComponent(mesh)
+        entity.addComponent(transform)
+        entity.addComponent(scene.textures.material(path))
+        scene.planes.append(entity)
+
+
+def models(scene, data):
+    """Magnetopause and bow shock as in example/magneto.py."""
+    from PySide2.QtCore import QSize
+    from PySide2.QtGui import QColor
+
+    scene.addModel(_magnetopause, QColor.fromRgb(100, 20, 0, 150), resolution=QSize(10, 10))
+    scene.addModel(_bow_shock, QColor.fromRgb(20, 100, 0, 150), resolution=QSize(10, 10), lines=True)
+
+
+def fine_models(scene, data):
+    """The same models at 500 x 500 vertices."""
+    from PySide2.QtCore import QSize
+    from PySide2.QtGui import QColor
+
+    scene.addModel(_magnetopause, QColor.fromRgb(100, 20, 0, 150), resolution=QSize(500, 500))
+    scene.addModel(_bow_shock, QColor.fromRgb(20, 100, 0, 150), resolution=QSize(500, 500), lines=True)
+
+
+def pool_models(scene, data):
+    """The same, built by a pool of worker processes, until both are shown."""
+    from PySide2.QtCore import QSize
+    from PySide2.QtGui import QColor
+    from orbit_viewer.surfaces import SurfaceBuilder
+
+    with SurfaceBuilder() as builder:
+        scene.addModel(_magnetopause, QColor.fromRgb(100, 20, 0, 150), resolution=QSize(500, 500), builder=builder)
+        scene.addModel(_bow_shock, QColor.fromRgb(20, 100, 0, 150), resolution=QSize(500, 500), lines=True,
+                       builder=builder)
+        scene.finishModels()
+
+
+def _fleet():
+    from orbit_viewer.synthetic import constellation
+
+    return list(constellation(10, 'mms', '2020-01-01', '2020-03-10T10:40').values())
+
+
+def trajectories(scene, fleet):
+    """Ten spacecraft of 10^5 samples each."""
+    from PySide2.QtGui import QColor
+
+    scene.setTrajectory(fleet[0])
+    for i, trajectory in enumerate(fleet[1:], 1):
+        scene.addTrajectory(trajectory, QColor.fromRgb(0, 20 * i, 200))
+
+
+SCENES = {function.__name__.replace('_', '-'): function
+          for function in [point_grid, point_cloud, scatter, dv_scatter, textured_planes, models, fine_models,
+                           pool_models, trajectories]}
+
+# input data of a scene, made before its construction is measured
+DATA = {'trajectories': _fleet, 'point-cloud': _cloud, 'textured-planes': _earth_map,
+        'scatter': _samples, 'dv-scatter': _samples}
+
+
+def measure(name: str, timeout: int):
+    """Build scene `name` in this process, yield the construction measures, then the first frame time.
+
+    Without a usable OpenGL context Qt3D may time out or even crash in the
+    first frame, so the construction measures are reported before.
+    """
+    from orbit_viewer.offscreen import application, OffscreenRenderer
+    from PySide2.Qt3DCore import Qt3DCore
+    from PySide2.QtCore import QSize
+
+    app = application()  # noqa: F841, keeps the application alive
+    renderer = OffscreenRenderer(QSize(640, 480), timeout=timeout)
+    before = len(renderer.root.findChildren(Qt3DCore.QNode))
+    entitiesBefore = len(renderer.root.findChildren(Qt3DCore.QEntity))
+
+    data = DATA[name]() if name in DATA else None
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    SCENES[name](renderer.scene, data)
+    renderer.scene.sync()  # what the first frame would apply
+    built = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    yield {
+        'scene': name,
+        'construction_seconds': built,
+        'entities': len(renderer.root.findChildren(Qt3DCore.QEntity)) - entitiesBefore,
+        'nodes': len(renderer.root.findChildren(Qt3DCore.QNode)) - before,
+        'allocated_bytes': current,
+        'peak_allocated_bytes': peak,
+    }
+
+    try:
+        renderer.renderImage()
+        yield {'first_frame_seconds': time.perf_counter() - start}
+    except RuntimeError:
+        pass  # no OpenGL context could be made
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('scenes', nargs='*', help='scenes to build, of {} (default: all)'.format(
+        ', '.join(sorted(SCENES))))
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--timeout', type=int, default=30000, help='first frame timeout in ms')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    unknown = set(args.scenes) - set(SCENES)
+    if unknown:
+        parser.error('unknown scenes: {}'.format(', '.join(sorted(unknown))))
+
+    if args.child:
+        for measures in measure(args.child, args.timeout):
+            print(json.dumps(measures), flush=True)
+        return 0
+
+    results = []
+    print('{:<14} {:>10} {:>12} {:>9} {:>7} {:>10} {:>10}'.format(
+        'scene', 'build ms', '1st frame ms', 'entities', 'nodes', 'alloc MB', 'peak MB'))
+    for name in args.scenes or sorted(SCENES):
+        # a fresh process per scene: no Qt or allocator state carries over
+        output = subprocess.run([sys.executable, __file__, '--child', name, '--timeout', str(args.timeout)],
+                                stdout=subprocess.PIPE, universal_newlines=True).stdout
+        result = {'first_frame_seconds': None}
+        for line in output.splitlines():
+            if line.startswith('{'):
+                result.update(json.loads(line))
+        if 'construction_seconds' not in result:
+            print('{:<14} failed'.format(name))
+            continue
+        results.append(result)
+
+        firstFrame = result['first_frame_seconds']
+        print('{:<14} {:>10.1f} {:>12} {:>9} {:>7} {:>10.2f} {:>10.2f}'.format(
+            name, result['construction_seconds'] * 1e3,
+            'no frame' if firstFrame is None else '{:.1f}'.format(firstFrame * 1e3),
+            result['entities'], result['nodes'],
+            result['allocated_bytes'] / 1e6, result['peak_allocated_bytes'] / 1e6))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""Vertex and index buffer builders at increasing grid resolutions."""
+
+import pytest
+
+from orbit_viewer import geometry
+
+from conftest import magnetopause
+
+RESOLUTIONS = [10, 100, 1000]
+
+
+@pytest.mark.parametrize('resolution', RESOLUTIONS)
+def test_model_vertex_data(benchmark, resolution):
+    data = benchmark(geometry.model_vertex_data, 3.0, 6.3, magnetopause, resolution, resolution)
+    assert data.shape == (resolution * resolution, geometry.ELEMENT_SIZE)
+
+
+@pytest.mark.parametrize('resolution', RESOLUTIONS)
+def test_plane_vertex_data(benchmark, resolution):
+    benchmark(geometry.plane_vertex_data, 10.0, 10.0, resolution, resolution)
+
+
+@pytest.mark.parametrize('resolution', RESOLUTIONS)
+def test_grid_index_data(benchmark, resolution):
+    indices = benchmark(geometry.grid_index_data, resolution, resolution)
+    assert len(indices) == 6 * (resolution - 1) ** 2
@@ -0,0 +1,34 @@
+"""Reading orbit caches."""
+
+import os
+
+import numpy as np
+import pytest
+
+from orbit_viewer.io import load_orbit, save_orbit
+
+from conftest import SIZES
+
+
+@pytest.fixture(scope='module')
+def directory(tmp_path_factory):
+    return tmp_path_factory.mktemp('orbits')
+
+
+@pytest.mark.parametrize('suffix', ['.ovc', '.npz'])
+@pytest.mark.parametrize('orbit', SIZES, indirect=True)
+def test_load_orbit(benchmark, orbit, suffix, directory):
+    path = os.path.join(str(directory), '{}{}'.format(len(orbit), suffix))
+    if not os.path.exists(path):
+        save_orbit(path, orbit)
+
+    # a full scan, the cache is useless until the positions are read
+    benchmark(lambda: load_orbit(path).positions.sum())
+
+
+@pytest.mark.parametrize('orbit', [10 ** 4], indirect=True)
+def test_load_csv(benchmark, orbit, directory):
+    path = os.path.join(str(directory), 'orbit.csv')
+    np.savetxt(path, np.column_stack([np.datetime_as_string(orbit.datetimes), orbit.positions]),
+               fmt='%s', delimiter=',')
+    benchmark(load_orbit, path)
@@ -0,0 +1,27 @@
+"""Ray picking in long trajectories."""
+
+import numpy as np
+import pytest
+
+from orbit_viewer.picking import TrajectoryIndex
+
+from conftest import SIZES
+
+orbits = pytest.mark.parametrize('orbit', SIZES, indirect=True)
+
+
+@orbits
+def test_build_index(benchmark, orbit):
+    benchmark(TrajectoryIndex, orbit)
+
+
+@orbits
+def test_pick(benchmark, orbit):
+    index = TrajectoryIndex(orbit)
+    origin = np.array([40.0, -40.0, 30.0])
+    targets = iter(orbit.positions[np.random.default_rng(0).integers(len(orbit), size=100000)])
+
+    def pick():
+        return index.pick(origin, next(targets) - origin, 0.05)
+
+    assert benchmark(pick) is not None
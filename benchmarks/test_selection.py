@@ -0,0 +1,67 @@
+"""Selection, decimation and transforms of long trajectories."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from orbit_viewer.conjunctions import resample
+from orbit_viewer.picking import TrajectoryIndex
+from orbit_viewer.selection import LiveSelection
+from orbit_viewer.shapes import Cuboid, InsideModel, Sphere, intervals, select
+
+from conftest import SIZES, magnetopause
+
+orbits = pytest.mark.parametrize('orbit', SIZES, indirect=True)
+
+
+@orbits
+def test_select_shapes(benchmark, orbit):
+    shapes = [Sphere(10, 0, 0, 4), Cuboid(-5, -5, -1, 3, 3, 2)]
+    benchmark(select, orbit.positions, shapes)
+
+
+@orbits
+def test_select_expression(benchmark, orbit):
+    expression = (InsideModel(magnetopause) - Sphere(0, 0, 0, 12)) | Cuboid(5, -2, -2, 4, 4, 4)
+    compiled = expression.compile()
+    benchmark(compiled.contains, orbit.positions)
+
+
+@orbits
+def test_drag(benchmark, orbit):
+    """One drag event of the viewer without Qt: re-select the moved shape, the bytes of the changed samples."""
+    selection = LiveSelection(TrajectoryIndex(orbit))
+    selection.set_shape('cuboid', Cuboid(-25, -3, -2, 6, 6, 4))
+    sphere = Sphere(-15, 4, 2, 6)
+    centers = itertools.cycle(np.linspace([-20, 4, 2], [-10, 4, 2], 100))
+
+    def drag():
+        sphere.move_handle('center', next(centers))
+        changed = selection.set_shape('sphere', sphere)
+        return selection.mask[changed].view(np.uint8).tobytes()
+
+    benchmark(drag)
+
+
+@orbits
+def test_intervals(benchmark, orbit):
+    mask = select(orbit.positions, [Sphere(10, 0, 0, 8)])
+    benchmark(intervals, orbit.datetimes, mask)
+
+
+@orbits
+def test_decimate(benchmark, orbit):
+    benchmark(orbit.decimate, 100000)
+
+
+@orbits
+def test_positions32(benchmark, orbit):
+    benchmark(orbit.positions.astype, np.float32)
+
+
+@orbits
+def test_resample(benchmark, orbit):
+    # onto a grid with a different cadence and phase
+    times = np.arange(orbit.times[0] + 17 * 10 ** 9, orbit.times[-1], 45 * 10 ** 9)
+    benchmark(resample, orbit, times)
@@ -2,6 +2,11 @@
 
 import sys
 
+import numpy as np
+
+from orbit_viewer.annotations import LabelLayer
+from orbit_viewer.scene import OrbitScene
+
 from PySide2.QtWidgets import (
     QApplication,
 )
@@ -10,7 +15,6 @@ from PySide2.QtGui import (
     QColor,
     QVector3D,
     QFontDatabase,
-    QFont
 )
 
 from PySide2.Qt3DExtras import Qt3DExtras as q3dx
@@ -21,7 +25,7 @@ if __name__ == '__main__':
     app = QApplication(sys.argv)
 
     view = q3dx.Qt3DWindow()
-    view.setTitle("3D Text CPP");
+    view.setTitle("3D Text")
     view.defaultFrameGraph().setClearColor(QColor(210, 210, 220))
 
     root = q3dc.QEntity()
@@ -42,38 +46,23 @@ if __name__ == '__main__':
     plane.addComponent(planeMesh)
     plane.addComponent(planeTransform)
 
-    # text
-
-    i = 0
-
-    texts = []
-    for family in QFontDatabase().families():
-        if not family.startswith('Liberation'):
-            continue
-
-        font = QFont(family, 32, -1, False)
-
-        textTransform = q3dc.QTransform()
-        textTransform.setTranslation(QVector3D(-2.45, i * .5, 0))
-        textTransform.setScale(.2)
-
-        textMesh = q3dx.QExtrudedTextMesh()
-        textMesh.setDepth(.45)
-        textMesh.setFont(font)
-        textMesh.setText(family)
-
-        textMaterial = q3dx.QPhongMaterial(root)
-        textMaterial.setDiffuse(QColor(111, 150, 255))
+    # text: one label layer for all labels, glyphs rasterized once
 
-        text = q3dc.QEntity(root)
-        text.addComponent(textMaterial)
-        text.addComponent(textMesh)
-        text.addComponent(textTransform)
+    families = [family for family in QFontDatabase().families() if family.startswith('Liberation')]
+    positions = [(-2.45, i * .5, 0) for i in range(len(families))]
 
-        texts.append([text, textMesh, textMaterial, textTransform])
+    # and a thousand labels on a helix, decluttered as the camera moves
+    t = np.linspace(0, 20 * np.pi, 1000)
+    helix = np.column_stack([3 * np.cos(t), 3 * np.sin(t), t / 10])
 
-        i += 1
+    # the scene model of an OrbitScene updates the labels once per frame
+    scene = OrbitScene(root)
+    scene.earth.setEnabled(False)
 
+    labels = LabelLayer(scene, view.camera(), color=QColor(111, 150, 255))
+    labels.setLabels(np.concatenate([np.reshape(positions, (-1, 3)), helix]),
+                     families + ['{:.2f}'.format(x) for x in t],
+                     priorities=np.concatenate([np.ones(len(families)), np.zeros(len(t))]))
 
     # camera
     aspect = float(view.screen().size().width()) / view.screen().size().height()
@@ -92,43 +81,8 @@ if __name__ == '__main__':
 
     view.setRootEntity(root)
     view.show()
+    labels.setViewportSize(view.width(), view.height())
 
     # Run the main Qt loop
     sys.exit(app.exec_())
 
-"""
-    auto *textMaterial = new Qt3DExtras::QPhongMaterial(root);
-    { // text
-        int i = 0;
-        const QStringList fonts = QFontDatabase::families();
-
-        for (const QString &family : fonts)
-        {
-            auto *text = new Qt3DCore::QEntity(root);
-            auto *textMesh = new Qt3DExtras::QExtrudedTextMesh();
-
-            auto *textTransform = new Qt3DCore::QTransform();
-            QFont font(family, 32, -1, false);
-            textTransform->setTranslation(QVector3D(-2.45f, i * .5f, 0));
-            textTransform->setScale(.2f);
-            textMesh->setDepth(.45f);
-            textMesh->setFont(font);
-            textMesh->setText(family);
-            textMaterial->setDiffuse(QColor(111, 150, 255));
-
-            text->addComponent(textMaterial);
-            text->addComponent(textMesh);
-            text->addComponent(textTransform);
-
-            i++;
-        }
-    }
-
-
-    view->setRootEntity(root);
-    view->show();
-
-    return a.exec();
-}
-
-"""
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import sys
+
+from space.models.planetary import mp_formisano1979, bs_formisano1979
+
+import numpy as np
+
+from orbit_viewer.offscreen import application, OffscreenRenderer
+from orbit_viewer.synthetic import Elements, orbit
+
+from PySide2.QtGui import (
+    QColor,
+)
+
+from PySide2.QtCore import (
+    QSize,
+)
+
+
+if __name__ == "__main__":
+    app = application()
+
+    renderer = OffscreenRenderer(QSize(800, 600))
+    renderer.scene.addModel(mp_formisano1979, QColor.fromRgb(100, 20, 0, 150))
+    renderer.scene.addModel(bs_formisano1979, QColor.fromRgb(20, 100, 0, 150), lines=True)
+
+    # scene is built once, only the trajectory changes from image to image
+    jobs = ((orbit(Elements(12.0, 0.8, np.radians(i), 0.0, 0.0, 0.0), '2020-01-01', '2020-01-03'),
+             'orbit-{:03d}.png'.format(i))
+            for i in range(0, 90, 5))
+
+    for path, seconds in renderer.renderBatch(jobs):
+        print('{} {:.3f}s'.format(path, seconds))
+
+    sys.exit(0)
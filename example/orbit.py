@@ -16,7 +16,11 @@
 
 import sys
 
-from typing import List
+from orbit_viewer.geometry import colormap
+from orbit_viewer.io import load_orbit
+from orbit_viewer.synthetic import orbit
+from orbit_viewer.trajectory import Trajectory
+from orbit_viewer.viewer import OrbitWindow
 
 from PySide2.QtWidgets import (
     QApplication,
@@ -30,8 +34,6 @@ from PySide2.QtWidgets import (
     QSizePolicy,
 )
 
-from PySide2.QtGui import QVector3D, QFont, QQuaternion
-
 from PySide2.QtDataVisualization import QtDataVisualization as QtDV
 
 from PySide2.QtCore import Signal, Qt, Slot, QSize
@@ -112,7 +114,7 @@ class CuboidWidget(_BaseWidget):
 
 
 class Form(QDialog):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, trajectory: Trajectory, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.setWindowTitle("My Form")
@@ -131,51 +133,16 @@ class Form(QDialog):
         layout.addWidget(s)
 
 
-        surface = QtDV.Q3DScatter()
-        surface.setFlags(surface.flags() ^ Qt.FramelessWindowHint)
-        surface.activeTheme().setType(QtDV.Q3DTheme.ThemeQt)
-
-        surface.setShadowQuality(QtDV.QAbstract3DGraph.ShadowQualityNone)
-        surface.scene().activeCamera().setCameraPreset(QtDV.Q3DCamera.CameraPresetFront)
-
-        surface.setOrthoProjection(True)
-        surface.activeTheme().setBackgroundEnabled(False)
-
-        surface.scene().activeCamera().setMaxZoomLevel(200.0)
-
-        surface.axisX().setRange(0.0, 1000.0)
-        surface.axisY().setRange(-600.0, 600.0)
-        surface.axisZ().setRange(0.0, 1000.0)
-        surface.axisX().setSegmentCount(5)
-        surface.axisY().setSegmentCount(6)
-        surface.axisZ().setSegmentCount(5)
-        #        // Only allow zooming at the center and limit the zoom to 200% to avoid clipping issues
-#        static_cast<Q3DInputHandler *>(m_graph->activeInputHandler())->setZoomAtTargetEnabled(false);
-
-
-        dataRow1 = [QVector3D(0.0, 0.1, 0.5), QVector3D(1.0, 0.5, 0.5)]
-        dataRow2 = [QVector3D(0.0, 1.8, 1.0), QVector3D(1.0, 1.2, 1.0)]
-        data = [dataRow1, dataRow2]
-
-        series = QtDV.QSurface3DSeries()
-        print("hello")
-        series.dataProxy().resetArray(data)
-        surface.addSeries(series)
-
-        warningLabel = QtDV.QCustom3DLabel(
-            "QCustom3DVolume is not supported with OpenGL ES2",
-            QFont(),
-            QVector3D(0.0, 0.5, 0.0),
-            QVector3D(1.5, 1.5, 0.0),
-            QQuaternion())
-        warningLabel.setPositionAbsolute(True)
-        warningLabel.setFacingCamera(True)
-        surface.addCustomItem(warningLabel)
+        # the orbit samples as one point cloud, uploaded straight from the
+        # numpy arrays: no QVector3D per sample as a Q3DScatter series needs
+        window = OrbitWindow()
+        window.scene.setTrajectory(trajectory)
+        window.scene.addPoints(trajectory.positions32, size=3.0, colors=colormap(trajectory.times))
 
-        self.surface = surface
-        container = QWidget.createWindowContainer(surface)
+        self.orbitWindow = window
+        container = QWidget.createWindowContainer(window)
 
-        screenSize = surface.screen().size()
+        screenSize = window.screen().size()
 
         container.setMinimumSize(QSize(screenSize.width() / 3, screenSize.height() / 3))
         container.setMaximumSize(screenSize)
@@ -230,8 +197,12 @@ class Toto(QDialog):
 if __name__ == '__main__':
     # Create the Qt Application
     app = QApplication(sys.argv)
-    # Create and show the form
-    form = Form()
+    # Create and show the form, of an orbit file or a year of MMS-like samples
+    if len(sys.argv) > 1:
+        trajectory = load_orbit(sys.argv[1])
+    else:
+        trajectory = orbit('mms', '2020-01-01', '2021-01-01')
+    form = Form(trajectory)
     form.show()
 
     # toto = Toto()
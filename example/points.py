@@ -2,13 +2,13 @@
 
 import sys
 
-import struct
-
 import numpy as np
 
+from orbit_viewer.materials import PointSpriteMaterial
+from orbit_viewer.scene import PointCloudRenderer
+
 from PySide2.Qt3DExtras import Qt3DExtras
 from PySide2.Qt3DCore import Qt3DCore
-from PySide2.Qt3DRender import Qt3DRender
 
 from PySide2.QtWidgets import (
     QApplication,
@@ -20,48 +20,6 @@ from PySide2.QtGui import (
 )
 
 
-class PointGeometry(Qt3DRender.QGeometry):
-    def __init__(self, position: QVector3D, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        vertexBuffer = Qt3DRender.QBuffer(self)
-        indexBuffer = Qt3DRender.QBuffer(self)
-        positionAttribute = Qt3DRender.QAttribute(self)
-        indexAttribute = Qt3DRender.QAttribute(self)
-
-        positionAttribute.setName(Qt3DRender.QAttribute.defaultPositionAttributeName())
-        positionAttribute.setVertexBaseType(Qt3DRender.QAttribute.Float)
-        positionAttribute.setVertexSize(3)
-        positionAttribute.setAttributeType(Qt3DRender.QAttribute.VertexAttribute)
-        positionAttribute.setBuffer(vertexBuffer)
-        positionAttribute.setByteStride(0)
-        positionAttribute.setCount(1)
-
-        indexAttribute.setName(Qt3DRender.QAttribute.defaultJointIndicesAttributeName())
-        indexAttribute.setAttributeType(Qt3DRender.QAttribute.IndexAttribute)
-        indexAttribute.setVertexBaseType(Qt3DRender.QAttribute.UnsignedShort)
-        indexAttribute.setBuffer(indexBuffer)
-        indexAttribute.setCount(1)
-
-        data = np.array(position.toTuple(), dtype=np.single)
-        vertexBuffer.setData(data.tobytes())
-
-        index = struct.pack('H', 0)
-        indexBuffer.setData(index)
-
-        self.addAttribute(positionAttribute)
-        self.addAttribute(indexAttribute)
-
-
-class Point(Qt3DRender.QGeometryRenderer):
-    def __init__(self, position: QVector3D, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        geometry = PointGeometry(position, self)
-
-        self.setPrimitiveType(Qt3DRender.QGeometryRenderer.Points)
-        self.setGeometry(geometry)
-
 if __name__ == "__main__":
     app = QApplication(sys.argv)
 
@@ -74,25 +32,16 @@ if __name__ == "__main__":
 
     e = []
 
-    for i in range(10):
-        point = Qt3DCore.QEntity(root)
-        pointMesh = Point(QVector3D(0, i, 0))
-        pointTransform = Qt3DCore.QTransform()
-        pointMaterial = Qt3DExtras.QPhongMaterial()
-        pointMaterial.setDiffuse(QColor(255, 0, 0))
-
-        for t in pointMaterial.effect().techniques():
-            for rp in t.renderPasses():
-                pointSize = Qt3DRender.QPointSize()
-                pointSize.setSizeMode(Qt3DRender.QPointSize.SizeMode.Fixed)
-                pointSize.setValue(4.0)
-                rp.addRenderState(pointSize)
-                e += [pointSize]
-
-        point.addComponent(pointMesh)
-        point.addComponent(pointTransform)
-        point.addComponent(pointMaterial)
-        e += [point, pointMesh, pointTransform, pointMaterial]
+    # ten points in one entity, growing along Y, sized in the vertex shader
+    positions = np.zeros((10, 3))
+    positions[:, 1] = np.arange(10)
+
+    points = Qt3DCore.QEntity(root)
+    pointRenderer = PointCloudRenderer(positions, sizes=np.linspace(4.0, 16.0, 10))
+    pointMaterial = PointSpriteMaterial(QColor(255, 0, 0), vertexSizes=True)
+    points.addComponent(pointRenderer)
+    points.addComponent(pointMaterial)
+    e += [points, pointRenderer, pointMaterial]
 
     for i in range(2):
         plane = Qt3DCore.QEntity(root)
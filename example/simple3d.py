@@ -6,6 +6,9 @@ import numpy as np
 
 # from spwc import sscweb
 
+from orbit_viewer.materials import PointSpriteMaterial
+from orbit_viewer.scene import PointCloudRenderer
+
 from PySide2.Qt3DExtras import Qt3DExtras
 from PySide2.Qt3DCore import Qt3DCore
 from PySide2.Qt3DRender import Qt3DRender
@@ -33,60 +36,6 @@ from PySide2.QtCore import (
     QSize
 )
 
-class PointGeometry(Qt3DRender.QGeometry):
-    def __init__(self, position: QVector3D, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        self.vertexBuffer = Qt3DRender.QBuffer()
-        self.indexBuffer = Qt3DRender.QBuffer()
-        self.positionAttribute = Qt3DRender.QAttribute()
-        self.indexAttribute = Qt3DRender.QAttribute()
-
-        self.positionAttribute.setName(Qt3DRender.QAttribute.defaultPositionAttributeName())
-        self.positionAttribute.setVertexBaseType(Qt3DRender.QAttribute.Float)
-        self.positionAttribute.setVertexSize(3)
-        self.positionAttribute.setAttributeType(Qt3DRender.QAttribute.VertexAttribute)
-        self.positionAttribute.setBuffer(self.vertexBuffer)
-        self.positionAttribute.setByteStride(0)
-        self.positionAttribute.setCount(3)
-
-        self.indexAttribute.setAttributeType(Qt3DRender.QAttribute.IndexAttribute)
-        self.indexAttribute.setVertexBaseType(Qt3DRender.QAttribute.UnsignedShort)
-        self.indexAttribute.setBuffer(self.indexBuffer)
-        self.indexAttribute.setCount(1)
-
-        self.data = PointGeometry.createPointVertexData(position)
-        self.vertexBuffer.setData(self.data)
-
-        self.index = PointGeometry.createPointIndexData()
-        self.vertexBuffer.setData(self.index)
-
-        self.addAttribute(self.positionAttribute)
-        self.addAttribute(self.indexAttribute)
-
-    def createPointVertexData(position: QVector3D):
-        data = np.array((position.x(), position.y(), position.z()), dtype=np.single)
-        assert len(data.tobytes()) == 12
-        print([hex(c) for c in data.tobytes()])
-        return data.tobytes()
-
-    def createPointIndexData():
-        data = np.array([0], dtype=np.uint16)
-        assert len(data.tobytes()) == 2
-        print(data)
-        return data.tobytes()
-
-
-class Point(Qt3DRender.QGeometryRenderer):
-    def __init__(self, position: QVector3D, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        self._geometry = PointGeometry(position)
-        self.setPrimitiveType(Qt3DRender.QGeometryRenderer.Points)
-
-        self.setGeometry(self._geometry)
-
-
 class Plane(Qt3DCore.QEntity):
 
 
@@ -396,44 +345,16 @@ if __name__ == "__main__":
 
     e = []
 
-    for i in range(-5, 6):
-        for j in range(-5, 6):
-            point = Point(QVector3D(i, j, 0))
-
-            e += [point]
-
-            point_transform = Qt3DCore.QTransform()
-            point_transform.setTranslation(QVector3D(0, 0, 0))  # position
-
-            e += [point_transform]
-
-            # // this is my hacky way of setting point size
-            # // the better way to do this is probably to create
-            # // your own shader and then use QPointSize::SizeMode::Programmable
-            # // that's for another journal...
-            point_material = Qt3DExtras.QPhongMaterial()
-            point_material.setAmbient(QColor(255, 0, 0))
-
-            effect = point_material.effect()
-            for t in effect.techniques():
-                for rp in t.renderPasses():
-                    pointSize = Qt3DRender.QPointSize()
-                    pointSize.setSizeMode(Qt3DRender.QPointSize.SizeMode.Fixed)
-                    pointSize.setValue(4.0)
-                    rp.addRenderState(pointSize)
-                    e += [pointSize]
-
-            e += [point_material]
-
-            entity = Qt3DCore.QEntity(root)
-            entity.addComponent(point)
-            entity.addComponent(point_transform)
-            entity.addComponent(point_material)
+    # the 11 x 11 grid as one point cloud: one entity, one material, one draw call
+    grid = np.mgrid[-5:6, -5:6, 0:1].reshape(3, -1).T
 
-            e += [entity]
+    points = Qt3DCore.QEntity(root)
+    pointRenderer = PointCloudRenderer(grid)
+    pointMaterial = PointSpriteMaterial(QColor(255, 0, 0), 4.0)
+    points.addComponent(pointRenderer)
+    points.addComponent(pointMaterial)
 
-            # self.e += [Sphere(self, QVector3D(i, j, 0), 0.1)]
-            # self.e.append(selfSphere(self, QVector3D(i, j, 0), 0.1))
+    e += [points, pointRenderer, pointMaterial]
 
     # Camera
     camera = view.camera()
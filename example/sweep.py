@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import sys
+
+import numpy as np
+
+from orbit_viewer.viewer import OrbitWindow
+
+from PySide2.QtWidgets import (
+    QApplication,
+    QHBoxLayout,
+    QLabel,
+    QSlider,
+    QVBoxLayout,
+    QWidget,
+)
+
+from PySide2.QtGui import (
+    QColor,
+)
+
+from PySide2.QtCore import (
+    QSize,
+    Qt,
+)
+
+
+def shue1997(theta, phi, pressure):
+    """Shue et al. 1997 magnetopause for a solar wind dynamic pressure (nPa), Bz = 0.
+
+    Broadcasts (1, n) angles against (m, 1) pressures.
+    """
+    r0 = 11.4 * pressure ** (-1 / 6.6)
+    alpha = 0.58
+    r = r0 * (2 / (1 + np.cos(theta))) ** alpha
+    return r * np.cos(theta), r * np.sin(theta) * np.cos(phi), r * np.sin(theta) * np.sin(phi)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    pressures = np.linspace(0.5, 10.0, 20)
+
+    # the 20 magnetopauses evaluated in one call, drawn as one geometry
+    window = OrbitWindow()
+    sweep = window.scene.addSweep(shue1997, pressures, QColor.fromRgb(100, 20, 0, 60),
+                                  resolution=QSize(100, 100))
+
+    label = QLabel()
+    slider = QSlider(Qt.Horizontal)
+    slider.setRange(-1, len(pressures) - 1)
+
+    def highlight(member):
+        # a parameter change, nothing is evaluated or uploaded again
+        window.scene.highlightSweep(sweep, member)
+        label.setText('all' if member < 0 else '{:.1f} nPa'.format(pressures[member]))
+
+    slider.valueChanged.connect(highlight)
+    slider.setValue(-1)
+    highlight(-1)
+
+    controls = QHBoxLayout()
+    controls.addWidget(QLabel('Pressure'))
+    controls.addWidget(slider, 1)
+    controls.addWidget(label)
+
+    layout = QVBoxLayout()
+    layout.addWidget(QWidget.createWindowContainer(window), 1)
+    layout.addLayout(controls)
+
+    form = QWidget()
+    form.setLayout(layout)
+    form.resize(1280, 760)
+    form.show()
+
+    sys.exit(app.exec_())
@@ -1,5 +1,80 @@
-"""Top-level package for Orbit Viewer."""
+"""Top-level package for Orbit Viewer.
+
+Importing the package imports nothing else.  The names below are resolved
+on first access, so that the computation APIs (shapes and selection,
+decimation, model evaluation) are usable without ever importing PySide2,
+and the Qt3D modules are only loaded once a rendering class is used.
+"""
 
 __author__ = """Patrick Boettcher"""
 __email__ = 'p@yai.se'
 __version__ = '0.1.0'
+
+_LAZY = {
+    # computation, numpy only
+    'Trajectory': 'trajectory',
+    'Shape': 'shapes',
+    'Sphere': 'shapes',
+    'Cuboid': 'shapes',
+    'InsideModel': 'shapes',
+    'Union': 'shapes',
+    'Intersection': 'shapes',
+    'Not': 'shapes',
+    'region': 'shapes',
+    'parse_shape': 'shapes',
+    'select': 'shapes',
+    'intervals': 'shapes',
+    'LiveSelection': 'selection',
+    'interval_mask': 'selection',
+    'TrajectoryIndex': 'picking',
+    'find_conjunctions': 'conjunctions',
+    'decimate': 'lod',
+    'decimation_indices': 'lod',
+    'model_vertex_data': 'geometry',
+    'plane_vertex_data': 'geometry',
+    'grid_index_data': 'geometry',
+    'sweep_vertex_data': 'geometry',
+    'SurfaceBuilder': 'surfaces',
+    'declutter': 'labels',
+    'TickGenerator': 'ticks',
+    'DepthMode': 'projection',
+
+    # rendering, imports PySide2
+    'ColorMaterial': 'materials',
+    'TextureMaterial': 'materials',
+    'TrajectoryMaterial': 'materials',
+    'PointSpriteMaterial': 'materials',
+    'LabelMaterial': 'materials',
+    'SweepMaterial': 'materials',
+    'DepthFrameGraph': 'framegraph',
+    'OrbitScene': 'scene',
+    'ModelRenderer': 'scene',
+    'SweepRenderer': 'scene',
+    'TrajectoryRenderer': 'scene',
+    'PointCloudRenderer': 'scene',
+    'ShapeGizmo': 'gizmos',
+    'TextureCache': 'textures',
+    'GlyphAtlas': 'annotations',
+    'LabelLayer': 'annotations',
+    'TickLayer': 'annotations',
+    'OrbitWindow': 'viewer',
+    'OffscreenRenderer': 'offscreen',
+}
+
+__all__ = sorted(_LAZY)
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+    # __import__ rather than importlib so that -X importtime accounts for it
+    value = getattr(__import__(__name__ + '.' + module, fromlist=[name]), name)
+    globals()[name] = value  # next access does not come here anymore
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
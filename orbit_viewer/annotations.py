@@ -0,0 +1,329 @@
+"""Text labels at 3D positions, e.g. times along an orbit.
+
+The glyphs of a font are rasterized once into an atlas texture
+(`GlyphAtlas`).  A `LabelLayer` draws all characters of all its labels as
+one instanced quad: per glyph it uploads the anchor of its label and its
+pixel offset, size and atlas rectangle (see `orbit_viewer.labels.layout`),
+the `LabelMaterial` shader keeps the quads facing the camera at their
+pixel size.  Each frame the camera moved, the anchors are projected and
+decluttered (`orbit_viewer.labels.declutter`) and only a visibility byte
+per glyph is uploaded::
+
+    layer = LabelLayer(scene, window.camera())
+    layer.setViewportSize(window.width(), window.height())
+    layer.setLabels(positions, ['{:%H:%M}'.format(t) for t in times])
+
+A `TickLayer` marks times along a trajectory (`orbit_viewer.ticks`): the
+ticks are point sprites of one buffer, labelled by a `LabelLayer`, and
+are made again only when the visible part of the trajectory or the zoom
+needs other ticks.
+
+Both are layers of the `orbit_viewer.scenemodel.SceneModel` of their
+`OrbitScene`, ``'ticks'`` and ``'labels'``: a camera move, a new viewport
+size or new labels mark them dirty and they are brought up to date by
+the next `OrbitScene.sync()`, their uploads and counts along with the
+other changes of the frame.
+"""
+
+import math
+import string
+
+import numpy as np
+
+from PySide2.Qt3DCore import Qt3DCore
+from PySide2.Qt3DRender import Qt3DRender
+
+from PySide2.QtGui import (
+    QColor,
+    QFont,
+    QFontMetricsF,
+    QImage,
+    QPainter,
+)
+
+from PySide2.QtCore import (
+    QPointF,
+    Qt,
+)
+
+from . import labels, profiling
+from .materials import LABEL_ATTRIBUTES, LabelMaterial, PointSpriteMaterial
+from .scene import PointCloudRenderer, _vertexAttribute
+from .textures import PaintedImage
+from .ticks import TickGenerator, tick_labels, visible_range
+from .trajectory import Trajectory
+
+#: characters of the default atlas: printable ASCII
+ASCII = ''.join(sorted(set(string.printable) - set(string.whitespace) | {' '}))
+
+
+class GlyphAtlas:
+    """The glyphs of `characters` in `font` (Sans 10), white on transparent, in rows of an RGBA image.
+
+    Needs a QGuiApplication for the font.
+    """
+
+    #: pixels around each glyph, so that linear filtering does not bleed
+    padding = 1
+
+    def __init__(self, font: QFont = None, characters: str = ASCII, width: int = 512):
+        font = font or QFont('Sans', 10)
+        fm = QFontMetricsF(font)
+        characters = sorted(set(characters) | {labels.FALLBACK})
+        advances = np.array([fm.horizontalAdvance(c) for c in characters])
+        widths = np.ceil(advances).astype(int) + 2 * self.padding
+        height = int(math.ceil(fm.height())) + 2 * self.padding
+
+        # row by row, left to right
+        x, y = 0, 0
+        corners = []
+        for w in widths:
+            if x + w > width:
+                x, y = 0, y + height
+            corners.append((x, y))
+            x += w
+        corners = np.array(corners)
+
+        self.image = QImage(width, y + height, QImage.Format_RGBA8888)
+        self.image.fill(Qt.transparent)
+        painter = QPainter(self.image)
+        painter.setFont(font)
+        painter.setPen(QColor(Qt.white))
+        for c, (x, y) in zip(characters, corners.tolist()):
+            painter.drawText(QPointF(x + self.padding, y + self.padding + fm.ascent()), c)
+        painter.end()
+
+        uv = np.empty((len(characters), 4))
+        uv[:, 0:2] = corners
+        uv[:, 2] = corners[:, 0] + widths
+        uv[:, 3] = corners[:, 1] + height
+        uv /= [self.image.width(), self.image.height()] * 2
+
+        self.metrics = labels.GlyphMetrics(np.array([ord(c) for c in characters], dtype=np.uint32),
+                                           advances, widths, height, self.padding, uv)
+
+    def texture(self, parent) -> Qt3DRender.QAbstractTexture:
+        """A texture of the atlas image, one per layer."""
+        texture = Qt3DRender.QTexture2D(parent)
+        texture.setFormat(Qt3DRender.QAbstractTexture.RGBA8_UNorm)
+        texture.setSize(self.image.width(), self.image.height())
+        texture.setMinificationFilter(Qt3DRender.QAbstractTexture.Linear)
+        texture.setMagnificationFilter(Qt3DRender.QAbstractTexture.Linear)
+        # not mirrored: the rows of the image go down the texture, as the v of `metrics`
+        texture.image = PaintedImage(self.image, texture)
+        texture.addTextureImage(texture.image)
+        return texture
+
+
+# per glyph: anchor (3), offset (2), size (2), uv (4)
+_INSTANCE_FLOATS = 11
+
+
+def _viewProjection(camera) -> np.ndarray:
+    """Row-major 4 x 4 view-projection matrix of a camera, for `orbit_viewer.labels.project`."""
+    return np.array((camera.projectionMatrix() * camera.viewMatrix()).copyDataTo()).reshape(4, 4)
+
+
+def _watchCamera(camera, model, layer: str, key):
+    """Mark `key` of `layer` dirty whenever the camera moves or its lens changes."""
+    def moved(*_):
+        model.markDirty(layer, key)
+
+    camera.viewMatrixChanged.connect(moved)
+    camera.projectionMatrixChanged.connect(moved)
+    return moved
+
+
+class LabelLayer(Qt3DCore.QEntity):
+    """Labels at 3D positions in one draw call, decluttered each frame the camera moves.
+
+    A child of `parent`, by default of the `OrbitScene` whose model
+    updates it.  Labels only show once the viewport size is known
+    (`setViewportSize()`).
+    """
+
+    def __init__(self, scene, camera, atlas: GlyphAtlas = None, color: QColor = QColor.fromRgb(20, 20, 20),
+                 parent=None, *args, **kwargs):
+        super().__init__(parent or scene, *args, **kwargs)
+
+        self.model = scene.model
+        self.camera = camera
+        self.atlas = atlas or GlyphAtlas()
+        self.width = self.height = 0
+
+        self.material = LabelMaterial(self.atlas.texture(self), color, self)
+
+        names = dict(zip(['corner', 'anchor', 'offset', 'size', 'uv', 'visible'], LABEL_ATTRIBUTES))
+        self.labelGeometry = Qt3DRender.QGeometry(self)
+
+        # the quad of a glyph, as triangle strip
+        self.cornerBuffer = Qt3DRender.QBuffer(self.labelGeometry)
+        self.model.upload(self.cornerBuffer, np.array([[0, 0], [1, 0], [0, 1], [1, 1]], dtype=np.single))
+        self.labelGeometry.addAttribute(_vertexAttribute(self.labelGeometry, names['corner'], 2,
+                                                         self.cornerBuffer, 2 * 4, 0, 4))
+
+        self.instanceBuffer = Qt3DRender.QBuffer(self.labelGeometry)
+        self.visibleBuffer = Qt3DRender.QBuffer(self.labelGeometry)
+        self.instanceAttributes = []
+        offset = 0
+        for name, size in [('anchor', 3), ('offset', 2), ('size', 2), ('uv', 4)]:
+            self.instanceAttributes.append(_vertexAttribute(self.labelGeometry, names[name], size,
+                                                            self.instanceBuffer, _INSTANCE_FLOATS * 4,
+                                                            offset * 4, 0))
+            offset += size
+        self.instanceAttributes.append(_vertexAttribute(self.labelGeometry, names['visible'], 1,
+                                                        self.visibleBuffer, 1, 0, 0,
+                                                        Qt3DRender.QAttribute.UnsignedByte))
+        for attribute in self.instanceAttributes:
+            attribute.setDivisor(1)
+            self.labelGeometry.addAttribute(attribute)
+
+        self.renderer = Qt3DRender.QGeometryRenderer(self)
+        self.renderer.setPrimitiveType(Qt3DRender.QGeometryRenderer.TriangleStrip)
+        self.renderer.setGeometry(self.labelGeometry)
+        self.renderer.setVertexCount(4)
+        self.renderer.setEnabled(False)
+
+        self.addComponent(self.renderer)
+        self.addComponent(self.material)
+
+        self.positions = np.empty((0, 3))
+        self.priorities = None
+        self._layout = labels.layout(self.atlas.metrics, [])
+        self._visible = np.zeros(0, dtype=bool)
+        self._view = None  # view-projection matrix and viewport of the visibility
+
+        self._cameraMoved = _watchCamera(camera, self.model, 'labels', self)
+        profiling.count('entities')
+
+    def setLabels(self, positions: np.ndarray, texts, priorities: np.ndarray = None):
+        """Replace the labels: one text per (n, 3) position, higher `priorities` win overlaps."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        assert len(positions) == len(texts)
+
+        self.positions = positions
+        self.priorities = priorities
+        self._layout = labels.layout(self.atlas.metrics, texts)
+        glyphs = self._layout.label
+
+        instances = np.empty((len(glyphs), _INSTANCE_FLOATS), dtype=np.single)
+        instances[:, 0:3] = positions[glyphs]
+        instances[:, 3:5] = self._layout.offsets
+        instances[:, 5:7] = self._layout.sizes
+        instances[:, 7:11] = self._layout.uv
+        self.model.upload(self.instanceBuffer, instances)
+        self.model.upload(self.visibleBuffer, np.zeros(len(glyphs), dtype=np.uint8))
+        for attribute in self.instanceAttributes:
+            self.model.setProperty(attribute, 'setCount', len(glyphs))
+
+        self.model.setProperty(self.renderer, 'setInstanceCount', len(glyphs))
+        self.model.setProperty(self.renderer, 'setEnabled', len(glyphs) > 0)
+        self._visible = np.zeros(len(positions), dtype=bool)
+        self._view = None
+        self.model.markDirty('labels', self)
+
+    def setViewportSize(self, width: int, height: int):
+        self.width, self.height = width, height
+        self.model.markDirty('labels', self)
+
+    def update(self):
+        """Declutter the labels again if the camera or the viewport changed, called by `OrbitScene.sync()`."""
+        if not len(self.positions) or self.width <= 0 or self.height <= 0:
+            return
+
+        matrix = _viewProjection(self.camera)
+        view = matrix, self.width, self.height
+        if self._view is not None and np.array_equal(self._view[0], matrix) and self._view[1:] == view[1:]:
+            return
+        self._view = view
+
+        with profiling.span('labels'):
+            xy, front = labels.project(self.positions, matrix, self.width, self.height)
+            visible = labels.declutter(xy, self._layout.boxes, self.width, self.height, front, self.priorities)
+        if not np.array_equal(visible, self._visible):
+            self._visible = visible
+            self.model.upload(self.visibleBuffer, visible[self._layout.label].view(np.uint8) * np.uint8(255))
+
+    def visible(self) -> np.ndarray:
+        """Mask of the labels shown since the last update."""
+        return self._visible
+
+
+class TickLayer(Qt3DCore.QEntity):
+    """Time ticks along a trajectory with their labels, see `orbit_viewer.ticks`.
+
+    Ticks are `size` pixels, major ticks (day boundaries) `majorSize`.
+    Like a `LabelLayer` it belongs to an `OrbitScene` and needs the
+    viewport size.
+    """
+
+    def __init__(self, scene, camera, trajectory: Trajectory, color: QColor = QColor.fromRgb(20, 20, 20),
+                 size: float = 5.0, majorSize: float = 10.0, atlas: GlyphAtlas = None, spacing: float = 60.0,
+                 maxSamples: int = 4096, *args, **kwargs):
+        super().__init__(scene, *args, **kwargs)
+
+        self.model = scene.model
+        self.camera = camera
+        self.size = size
+        self.majorSize = majorSize
+        self.width = self.height = 0
+
+        self.generator = TickGenerator(trajectory, spacing)
+        self.ticks = None
+        # the visible range is found on a decimated copy of the samples
+        self._samples = trajectory.decimate(maxSamples)
+        self._view = None
+
+        self.markers = Qt3DCore.QEntity(self)
+        self.markers.renderer = PointCloudRenderer(np.empty((0, 3)), np.empty(0), parent=self.markers)
+        self.markers.material = PointSpriteMaterial(color, size, vertexSizes=True, parent=self.markers)
+        self.markers.addComponent(self.markers.renderer)
+        self.markers.addComponent(self.markers.material)
+        profiling.count('entities')
+
+        self.labels = LabelLayer(scene, camera, atlas, color, parent=self)
+        self._cameraMoved = _watchCamera(camera, self.model, 'ticks', self)
+
+    def setViewportSize(self, width: int, height: int):
+        self.width, self.height = width, height
+        self.labels.setViewportSize(width, height)
+        self.model.markDirty('ticks', self)
+
+    def update(self):
+        """Make new ticks if the camera or the viewport changed what is visible of the trajectory.
+
+        Called by `OrbitScene.sync()`, before the labels are decluttered.
+        """
+        if not len(self._samples) or self.width <= 0 or self.height <= 0:
+            return
+
+        matrix = _viewProjection(self.camera)
+        view = matrix, self.width, self.height
+        if self._view is not None and np.array_equal(self._view[0], matrix) and self._view[1:] == view[1:]:
+            return
+        self._view = view
+
+        with profiling.span('ticks'):
+            xy, front = labels.project(self._samples.positions, matrix, self.width, self.height)
+            visible = visible_range(self._samples.times, xy, front, self.width, self.height)
+            if visible is None:
+                self._clear()
+                return
+            ticks = self.generator.ticks(*visible)
+            if ticks is None:
+                return  # the same ticks as shown
+
+        self.ticks = ticks
+        self.markers.renderer.setPositions(ticks.positions, np.where(ticks.major, self.majorSize, self.size),
+                                           self.model)
+        self.labels.setLabels(ticks.positions, tick_labels(ticks.times, ticks.major, ticks.step),
+                              priorities=ticks.major)
+
+    def _clear(self):
+        # nothing of the trajectory on screen: no ticks, rather than those of the last view
+        if self.ticks is None:
+            return
+        self.ticks = None
+        self.generator.reset()
+        self.markers.renderer.setPositions(np.empty((0, 3)), np.empty(0), self.model)
+        self.labels.setLabels(np.empty((0, 3)), [])
@@ -0,0 +1,123 @@
+"""Parallel batch rendering of orbit quick-looks.
+
+A manifest lists jobs, one JSON object per line (or a JSON array)::
+
+    {"spacecraft": "mms1", "start": "2020-10-10", "stop": "2020-10-11",
+     "camera": "xy", "output": "mms1-20201010.png"}
+
+The jobs are spread over a process pool.  Every worker creates its own
+headless Qt application and `OffscreenRenderer` once, in the pool
+initializer, and then renders job after job into the same scene.  Results
+(including failures) are streamed back to the parent as soon as they are
+done; when a worker could not be set up, each of its jobs fails with the
+traceback of the initializer.  Without the space package the images have
+no boundary models.
+
+This module does not import Qt itself, only the workers do.
+"""
+
+import json
+import logging
+import multiprocessing
+import time
+import traceback
+
+from collections import namedtuple
+from typing import Iterable, List
+
+log = logging.getLogger(__name__)
+
+Job = namedtuple('Job', ['spacecraft', 'start', 'stop', 'camera', 'output'])
+
+JobResult = namedtuple('JobResult', ['job', 'ok', 'load_seconds', 'render_seconds', 'error'])
+
+
+def read_manifest(path: str) -> List[Job]:
+    """Read the jobs of a JSON-lines (or JSON array) manifest."""
+    with open(path) as f:
+        text = f.read()
+
+    if text.lstrip().startswith('['):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    jobs = []
+    for i, entry in enumerate(entries):
+        try:
+            jobs.append(Job(spacecraft=entry['spacecraft'],
+                            start=entry['start'],
+                            stop=entry['stop'],
+                            camera=entry.get('camera', 'oblique'),
+                            output=entry['output']))
+        except KeyError as e:
+            raise ValueError('{}: entry {} is missing {}'.format(path, i + 1, e))
+    return jobs
+
+
+# per-process renderer, created by _init_worker, or the traceback of its failure:
+# an initializer which raises makes the pool respawn workers forever
+_renderer = None
+_init_error = None
+
+
+def _init_worker(width: int, height: int):
+    global _renderer, _init_error
+
+    try:
+        from .offscreen import application, OffscreenRenderer
+
+        from PySide2.QtCore import QSize
+
+        application()
+        _renderer = OffscreenRenderer(QSize(width, height))
+        _addModels(_renderer.scene)
+    except Exception:
+        _init_error = traceback.format_exc()
+
+
+def _addModels(scene):
+    try:
+        from space.models.planetary import mp_formisano1979, bs_formisano1979
+    except ImportError:
+        log.warning('no boundary models without the space package')
+        return
+
+    from PySide2.QtGui import QColor
+
+    scene.addModel(mp_formisano1979, QColor.fromRgb(100, 20, 0, 150))
+    scene.addModel(bs_formisano1979, QColor.fromRgb(20, 100, 0, 150), lines=True)
+
+
+def _run_job(job: Job) -> JobResult:
+    from .orbits import get_orbit
+
+    if _init_error is not None:
+        return JobResult(job, False, 0.0, 0.0, _init_error)
+
+    load_seconds = 0.0
+    try:
+        start = time.perf_counter()
+        trajectory = get_orbit(job.spacecraft, job.start, job.stop)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _renderer.setCameraPreset(job.camera)
+        _renderer.render(trajectory, job.output)
+        render_seconds = time.perf_counter() - start
+    except Exception:
+        return JobResult(job, False, load_seconds, 0.0, traceback.format_exc())
+
+    return JobResult(job, True, load_seconds, render_seconds, None)
+
+
+def render_batch(jobs: Iterable[Job], processes: int = None, width: int = 1024, height: int = 768):
+    """Render all jobs on a pool of `processes` workers, yield a JobResult per job as it finishes.
+
+    Workers are started with the 'spawn' method so that none of them
+    inherits Qt state from the parent.
+    """
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes, initializer=_init_worker, initargs=(width, height)) as pool:
+        for result in pool.imap_unordered(_run_job, jobs):
+            yield result
@@ -1,19 +1,243 @@
-"""Console script for orbit_viewer."""
+"""Console script for orbit_viewer.
+
+Only the standard library is imported at module level; numpy, the data
+access and especially PySide2/Qt3D are imported by the subcommands which
+need them, so that non-GUI commands start quickly.
+"""
 import argparse
+import os
 import sys
+import time
 
 
-def main():
-    """Console script for orbit_viewer."""
-    parser = argparse.ArgumentParser()
-    parser.add_argument('_', nargs='*')
-    args = parser.parse_args()
+def _size(text: str):
+    try:
+        width, height = (int(v) for v in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected WIDTHxHEIGHT, got {!r}'.format(text))
+    return width, height
+
+
+def _shape(text: str):
+    from .shapes import parse_shape
+
+    try:
+        return parse_shape(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _plane(text: str):
+    from .slicing import parse_plane
+
+    try:
+        return parse_plane(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _load(args):
+    from .io import save_orbit
+    from .orbits import get_orbit
+
+    trajectory = get_orbit(args.spacecraft, args.start, args.stop, args.coordinate_system)
+    save_orbit(args.output, trajectory)
+    print('{} samples of {} written to {}'.format(len(trajectory), args.spacecraft, args.output))
+    return 0
+
+
+def _synthetic(args):
+    import numpy as np
+
+    from .io import save_orbit
+    from .synthetic import orbit
+
+    trajectory = orbit(args.orbit, args.start, args.stop, np.timedelta64(int(args.cadence * 1e9), 'ns'))
+    save_orbit(args.output, trajectory)
+    print('{} samples of a synthetic {} orbit written to {}'.format(len(trajectory), args.orbit, args.output))
+    return 0
+
+
+def _selection(args):
+    from .io import load_orbit
+    from .shapes import Union, intervals, region
+
+    expression = Union(*args.shape) if args.shape else None
+    if args.region:
+        expression = region(args.region) if expression is None else expression & region(args.region)
+    if expression is None:
+        raise SystemExit('orbit_viewer {}: at least one --shape or a --region is needed'.format(args.command))
+    if args.exclude:
+        expression = expression - Union(*args.exclude)
+
+    trajectory = load_orbit(args.orbit)
+    mask = expression.compile().contains(trajectory.positions)
+    return trajectory, mask, intervals(trajectory.datetimes, mask)
+
+
+def _select(args):
+    import numpy as np
+
+    _, _, selected = _selection(args)
+    for start, stop in np.datetime_as_string(selected).tolist():
+        print('{} {}'.format(start, stop))
+    return 0
+
+
+def _export(args):
+    from .io import save_intervals, save_selection
+
+    trajectory, mask, selected = _selection(args)
+    if args.output.lower().endswith(('.ovc', '.npz')):
+        save_selection(args.output, trajectory, mask, selected)
+    else:
+        save_intervals(args.output, selected)
+    print('{} intervals written to {}'.format(len(selected), args.output))
+    return 0
 
-    print("Arguments: " + str(args._))
-    print("Replace this message by putting your code into "
-          "orbit_viewer.cli.main")
+
+def _conjunctions(args):
+    import numpy as np
+
+    from .conjunctions import find_conjunctions
+    from .io import load_orbit, save_conjunctions
+
+    trajectories = {os.path.splitext(os.path.basename(path))[0]: load_orbit(path) for path in args.orbits}
+    found = find_conjunctions(trajectories, args.distance, np.timedelta64(args.step, 's'))
+
+    for c in found:
+        print('{} {} {} {} {:.3f}'.format(c.first, c.second, c.start, c.stop, c.min_distance))
+    if args.output:
+        save_conjunctions(args.output, found)
     return 0
 
 
+def _view(args):
+    from .io import load_orbit
+    from .viewer import run
+
+    names = [os.path.splitext(os.path.basename(path))[0] for path in args.orbit]
+    return run([load_orbit(path) for path in args.orbit], args.shape, models=not args.no_models,
+               slices=args.slice, ticks=args.ticks, conjunctions=args.conjunctions, names=names)
+
+
+def _render_batch(args):
+    from .batch import read_manifest, render_batch
+
+    jobs = read_manifest(args.manifest)
+    width, height = args.size
+
+    failed = 0
+    start = time.perf_counter()
+    for result in render_batch(jobs, args.processes, width, height):
+        if result.ok:
+            print('ok    load {:7.3f}s  render {:7.3f}s  {}'.format(
+                result.load_seconds, result.render_seconds, result.job.output))
+        else:
+            failed += 1
+            print('FAIL  {}\n{}'.format(result.job.output, result.error), file=sys.stderr)
+        sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+
+    rendered = len(jobs) - failed
+    print('{} images in {:.1f}s ({:.2f} images/s), {} failed'.format(
+        rendered, elapsed, rendered / elapsed if elapsed > 0 else 0.0, failed))
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    """Console script for orbit_viewer."""
+    parser = argparse.ArgumentParser(prog='orbit_viewer')
+    parser.add_argument('--profile', action='store_true',
+                        help='time the pipeline stages and print a report to stderr at the end')
+    subparsers = parser.add_subparsers(dest='command')
+
+    load = subparsers.add_parser('load', help='fetch an orbit from SSCWeb into a cache file')
+    load.add_argument('spacecraft', help='SSCWeb product name, e.g. mms1')
+    load.add_argument('start', help='start time, e.g. 2020-10-10')
+    load.add_argument('stop', help='stop time')
+    load.add_argument('-o', '--output', required=True, help='cache file (.npz or .ovc)')
+    load.add_argument('--coordinate-system', default='gse', help='(default: %(default)s)')
+    load.set_defaults(func=_load)
+
+    synthetic = subparsers.add_parser('synthetic', help='write a synthetic Keplerian orbit to a cache file')
+    synthetic.add_argument('orbit', choices=['leo', 'geo', 'heo', 'mms'])
+    synthetic.add_argument('start', help='start time, e.g. 2020-10-10')
+    synthetic.add_argument('stop', help='stop time')
+    synthetic.add_argument('-o', '--output', required=True, help='cache file (.npz or .ovc)')
+    synthetic.add_argument('--cadence', type=float, default=60.0, help='in seconds (default: %(default)s)')
+    synthetic.set_defaults(func=_synthetic)
+
+    shape_help = "selection shape, 'sphere:X,Y,Z,D' or 'cuboid:X,Y,Z,W,H,D' in Earth radii, repeatable"
+
+    def add_selection_arguments(subparser):
+        subparser.add_argument('orbit', help='orbit cache (.npz, .ovc) or CSV file')
+        subparser.add_argument('-s', '--shape', type=_shape, action='append', default=[], help=shape_help)
+        subparser.add_argument('-x', '--exclude', type=_shape, action='append', default=[],
+                               help='shape to exclude from the selection, same syntax, repeatable')
+        subparser.add_argument('-r', '--region', choices=['magnetosphere', 'magnetosheath', 'solar-wind'],
+                               help='only within this region (Formisano 1979 models)')
+
+    select = subparsers.add_parser('select', help='print the intervals an orbit spends inside the shapes')
+    add_selection_arguments(select)
+    select.set_defaults(func=_select)
+
+    export = subparsers.add_parser('export', help='write the selected intervals (.ovc, .npz: and samples) to a file')
+    add_selection_arguments(export)
+    export.add_argument('-o', '--output', required=True,
+                        help='interval file (.csv or .json) or selection with samples (.ovc or .npz)')
+    export.set_defaults(func=_export)
+
+    conjunctions = subparsers.add_parser('conjunctions',
+                                         help='print when spacecraft were within a distance of each other')
+    conjunctions.add_argument('orbits', nargs='+',
+                              help='orbit caches (.npz, .ovc) or CSV files, named after the file')
+    conjunctions.add_argument('-d', '--distance', type=float, required=True, help='in Earth radii')
+    conjunctions.add_argument('--step', type=float, default=60.0,
+                              help='common time grid step in seconds (default: %(default)s)')
+    conjunctions.add_argument('-o', '--output', help='conjunction file (.csv or .json)')
+    conjunctions.set_defaults(func=_conjunctions)
+
+    view = subparsers.add_parser('view', help='open the 3D viewer')
+    view.add_argument('orbit', nargs='+', help='orbit caches (.npz, .ovc) or CSV files')
+    view.add_argument('-s', '--shape', type=_shape, action='append', default=[], help=shape_help)
+    view.add_argument('--no-models', action='store_true', help='do not show magnetopause and bow shock')
+    view.add_argument('--slice', type=_plane, action='append', default=[],
+                      help='cut models and orbits with a plane: xy, xz or yz, optionally offset as xz:2.5 '
+                           '(page up/down move it)')
+    view.add_argument('--ticks', action='store_true', help='time ticks along the first orbit')
+    view.add_argument('--conjunctions', type=float, metavar='DISTANCE',
+                      help='select when the spacecraft were within DISTANCE Earth radii of each other '
+                           '(n/p step through them)')
+    view.set_defaults(func=_view)
+
+    render_batch = subparsers.add_parser('render-batch',
+                                         help='render the jobs of a manifest to image files, headless')
+    render_batch.add_argument('manifest', help='JSON-lines file of {spacecraft, start, stop, camera, output}')
+    render_batch.add_argument('-j', '--processes', type=int, default=os.cpu_count(),
+                              help='number of worker processes (default: %(default)s)')
+    render_batch.add_argument('--size', type=_size, default=(1024, 768),
+                              help='image size as WIDTHxHEIGHT (default: 1024x768)')
+    render_batch.set_defaults(func=_render_batch)
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 1
+
+    if not args.profile:
+        return args.func(args)
+
+    from . import profiling
+
+    profiling.enable()
+    try:
+        return args.func(args)
+    finally:
+        print(profiling.profiler.report(), file=sys.stderr)
+        profiling.disable()
+
+
 if __name__ == "__main__":
     sys.exit(main())  # pragma: no cover
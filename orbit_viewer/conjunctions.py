@@ -0,0 +1,127 @@
+"""Multi-spacecraft conjunction search.
+
+"When were MMS1 and Cluster within 2 Re of each other?"  All trajectories
+are interpolated onto one common time grid, then pairwise distances are
+computed chunk by chunk so that memory stays bounded by the chunk size,
+whatever the length of the time range.
+
+Within a chunk, the grid is cut into short blocks (`block_size` samples,
+half an hour at the default step) and the bounding box of each spacecraft
+over each block is computed at once for all blocks.  Distances are only
+computed in the blocks where the boxes of a pair are at most the distance
+apart: over half an hour a spacecraft covers a small part of its orbit, so
+for distances small against the orbits nearly all blocks are pruned, and
+pairs without any close block are skipped entirely.  The ``distance_samples``
+profiling counter gives the number of distances computed.
+"""
+
+from collections import namedtuple
+from typing import Dict, List
+
+import numpy as np
+
+from . import profiling
+from .profiling import profiled
+from .trajectory import Trajectory, to_nanoseconds
+
+Conjunction = namedtuple('Conjunction', ['first', 'second', 'start', 'stop', 'min_distance'])
+
+
+def common_grid(trajectories: List[Trajectory], step) -> np.ndarray:
+    """int64 ns times every `step` (timedelta64 or ns) over the range all trajectories cover."""
+    step = int(np.timedelta64(step, 'ns').astype(np.int64))
+    start = max(int(t.times[0]) for t in trajectories)
+    stop = min(int(t.times[-1]) for t in trajectories)
+    if stop < start:
+        return np.empty(0, dtype=np.int64)
+    return np.arange(start, stop + 1, step, dtype=np.int64)
+
+
+@profiled('transform')
+def resample(trajectory: Trajectory, times: np.ndarray) -> np.ndarray:
+    """Positions of `trajectory` linearly interpolated at `times`, (n, 3) float64."""
+    times = to_nanoseconds(times)
+    # relative to the first sample, float64 keeps ns resolution over ~100 days
+    # and sub-ms resolution over decades
+    t0 = trajectory.times[0]
+    x = (times - t0).astype(np.float64)
+    xp = (trajectory.times - t0).astype(np.float64)
+
+    out = np.empty((len(times), 3), dtype=np.float64)
+    for axis in range(3):
+        out[:, axis] = np.interp(x, xp, trajectory.positions[:, axis])
+    return out
+
+
+def _block_boxes(positions: np.ndarray, block_size: int):
+    """(k, b, 3) lower and upper corners of the boxes of (k, n, 3) positions over blocks of samples."""
+    k, n, _ = positions.shape
+    blocks = -(-n // block_size)
+    # pad with the last sample, it does not grow the box of the last block
+    padded = np.concatenate([positions, np.repeat(positions[:, -1:], blocks * block_size - n, axis=1)], axis=1)
+    padded = padded.reshape(k, blocks, block_size, 3)
+    return padded.min(axis=2), padded.max(axis=2)
+
+
+def _boxes_near(lo: np.ndarray, hi: np.ndarray, i: int, j: int, distance: float) -> np.ndarray:
+    """Mask of the blocks in which the boxes of spacecraft `i` and `j` are at most `distance` apart."""
+    gap = np.maximum(lo[i] - hi[j], lo[j] - hi[i])
+    return ~(gap > distance).any(axis=1)
+
+
+def find_conjunctions(trajectories: Dict[str, Trajectory], distance: float,
+                      step=np.timedelta64(60, 's'), chunk_size: int = 65536,
+                      block_size: int = 32) -> List[Conjunction]:
+    """All intervals during which two spacecraft are within `distance` (same units as positions).
+
+    Returns `Conjunction`s sorted by start time with datetime64 start/stop
+    (grid times) and the smallest distance reached in the interval.
+    """
+    names = sorted(trajectories)
+    times = common_grid([trajectories[name] for name in names], step)
+    if len(names) < 2 or not len(times):
+        return []
+
+    distance2 = distance * distance
+    pairs = [(i, j) for i in range(len(names)) for j in range(i + 1, len(names))]
+    runs = {pair: [] for pair in pairs}  # [start index, stop index, min squared distance]
+
+    for begin in range(0, len(times), chunk_size):
+        chunk = times[begin:begin + chunk_size]
+        positions = np.stack([resample(trajectories[name], chunk) for name in names])
+        lo, hi = _block_boxes(positions, block_size)
+
+        for i, j in pairs:
+            near = _boxes_near(lo, hi, i, j, distance)
+            if not near.any():
+                continue
+
+            # distances of the samples of the near blocks only, infinite elsewhere
+            candidates = np.flatnonzero(np.repeat(near, block_size)[:len(chunk)])
+            profiling.count('distance_samples', len(candidates))
+            delta = positions[i, candidates] - positions[j, candidates]
+            d2 = np.full(len(chunk), np.inf)
+            d2[candidates] = np.einsum('ij,ij->i', delta, delta)
+            close = d2 <= distance2
+            if not close.any():
+                continue
+
+            padded = np.concatenate([[False], close, [False]])
+            edges = np.flatnonzero(padded[1:] != padded[:-1])
+            starts, stops = edges[0::2], edges[1::2]
+            # reduce over [start, stop) and [stop, next start) alternately, keep the former
+            bounds = np.column_stack([starts, stops]).ravel()
+            minima = np.minimum.reduceat(np.append(d2, np.inf), bounds)[0::2]
+
+            pair_runs = runs[(i, j)]
+            for a, b, m in zip(starts + begin, stops + begin - 1, minima):
+                if pair_runs and pair_runs[-1][1] + 1 == a:  # continues over the chunk border
+                    pair_runs[-1][1] = b
+                    pair_runs[-1][2] = min(pair_runs[-1][2], m)
+                else:
+                    pair_runs.append([a, b, m])
+
+    datetimes = times.view('datetime64[ns]')
+    conjunctions = [Conjunction(names[i], names[j], datetimes[a], datetimes[b], float(np.sqrt(m)))
+                    for (i, j), pair_runs in runs.items() for a, b, m in pair_runs]
+    return sorted(conjunctions, key=lambda c: (c.start, c.first, c.second))
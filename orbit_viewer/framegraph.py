@@ -0,0 +1,148 @@
+"""Frame graph with a selectable depth-buffer layout.
+
+Orbits span from low Earth orbit to beyond the bow shock (and to lunar
+distances), far more than a 24-bit depth buffer resolves with a standard
+perspective projection.  ``DepthFrameGraph`` covers that range in a single
+pass with either a reversed infinite projection or a logarithmic depth.
+"""
+
+from PySide2.Qt3DRender import Qt3DRender
+
+from PySide2.QtGui import (
+    QColor,
+    QMatrix4x4,
+)
+
+from PySide2.QtCore import (
+    QRectF,
+)
+
+from .materials import LOG_DEPTH_FILTER_KEY, LOG_DEPTH_PARAMETER
+from .projection import DepthMode, reverse_z_projection, log_depth_coefficient
+
+
+class DepthFrameGraph(Qt3DRender.QRenderSurfaceSelector):
+    """Surface -> [render target] -> viewport -> camera -> clear -> no-culling states -> filter.
+
+    In `ReverseZ` mode the camera lens gets a custom projection which is
+    recomputed whenever field of view, aspect ratio or near plane change,
+    and whenever the lens computes a projection of its own again, e.g. after
+    a `setPerspectiveProjection()` once the frame graph is built.
+    Without ``glClipControl`` (not exposed by Qt3D) OpenGL still maps depth
+    through [-1, 1], so the precision gain is smaller than on D3D/Vulkan, but
+    the far plane is gone entirely.
+
+    In `Logarithmic` mode the projection is left untouched, the technique
+    filter selects the logarithmic depth techniques of the materials of
+    `orbit_viewer.materials` and provides their `logDepthCoefficient`
+    parameter.  Materials without such a technique are not drawn.
+
+    With a `renderTarget` (offscreen rendering) a render-target selector is
+    inserted right below the surface selector.  Additional frame graph nodes
+    like a `QRenderCapture` are attached below `leaf()`.
+    """
+
+    def __init__(self, surface, camera, depthMode: DepthMode = DepthMode.Standard,
+                 clearColor: QColor = QColor('white'),
+                 renderTarget: Qt3DRender.QRenderTarget = None,
+                 *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.setSurface(surface)
+        self._camera = camera
+        self._depthMode = None
+        self._updating = False  # setting the projection emits the signals we listen to
+
+        parent = self
+        if renderTarget is not None:
+            parent = Qt3DRender.QRenderTargetSelector(self)
+            parent.setTarget(renderTarget)
+
+        viewport = Qt3DRender.QViewport(parent)
+        viewport.setNormalizedRect(QRectF(0, 0, 1.0, 1.0))
+
+        cameraSelector = Qt3DRender.QCameraSelector(viewport)
+        cameraSelector.setCamera(camera)
+
+        self._clearBuffers = Qt3DRender.QClearBuffers(cameraSelector)
+        self._clearBuffers.setBuffers(Qt3DRender.QClearBuffers.ColorDepthBuffer)
+        self._clearBuffers.setClearColor(clearColor)
+
+        renderStateSet = Qt3DRender.QRenderStateSet(self._clearBuffers)
+        cullFace = Qt3DRender.QCullFace(renderStateSet)
+        cullFace.setMode(Qt3DRender.QCullFace.NoCulling)
+        renderStateSet.addRenderState(cullFace)
+
+        self._depthTest = Qt3DRender.QDepthTest(renderStateSet)
+        renderStateSet.addRenderState(self._depthTest)
+
+        # no filter keys but in Logarithmic mode: every technique passes, the
+        # first (standard depth) one of our materials is used
+        self._techniqueFilter = Qt3DRender.QTechniqueFilter(renderStateSet)
+        self._logDepth = Qt3DRender.QParameter(LOG_DEPTH_PARAMETER, 0.0, self._techniqueFilter)
+        self._techniqueFilter.addParameter(self._logDepth)
+        self._logDepthKey = Qt3DRender.QFilterKey(self._techniqueFilter)
+        self._logDepthKey.setName(LOG_DEPTH_FILTER_KEY[0])
+        self._logDepthKey.setValue(LOG_DEPTH_FILTER_KEY[1])
+
+        lens = camera.lens()
+        lens.fieldOfViewChanged.connect(self._updateProjection)
+        lens.aspectRatioChanged.connect(self._updateProjection)
+        lens.nearPlaneChanged.connect(self._updateProjection)
+        lens.farPlaneChanged.connect(self._updateProjection)
+        lens.projectionTypeChanged.connect(self._updateProjection)
+        lens.projectionMatrixChanged.connect(self._updateProjection)
+
+        self.setDepthMode(depthMode)
+
+    def leaf(self):
+        return self._techniqueFilter
+
+    def depthMode(self):
+        return self._depthMode
+
+    def setDepthMode(self, depthMode: DepthMode):
+        if depthMode == self._depthMode:
+            return
+
+        previous = self._depthMode
+        self._depthMode = depthMode
+
+        if depthMode == DepthMode.ReverseZ:
+            self._clearBuffers.setClearDepthValue(0.0)
+            self._depthTest.setDepthFunction(Qt3DRender.QDepthTest.Greater)
+        else:
+            self._clearBuffers.setClearDepthValue(1.0)
+            self._depthTest.setDepthFunction(Qt3DRender.QDepthTest.Less)
+
+        if depthMode == DepthMode.Logarithmic:
+            self._techniqueFilter.addMatch(self._logDepthKey)
+        elif previous == DepthMode.Logarithmic:
+            self._techniqueFilter.removeMatch(self._logDepthKey)
+
+        if previous == DepthMode.ReverseZ:
+            # give the lens its own perspective projection back
+            lens = self._camera.lens()
+            lens.setPerspectiveProjection(lens.fieldOfView(), lens.aspectRatio(),
+                                          lens.nearPlane(), lens.farPlane())
+
+        self._updateProjection()
+
+    def _updateProjection(self, *args):
+        if self._updating:
+            return
+
+        lens = self._camera.lens()
+
+        if self._depthMode == DepthMode.ReverseZ:
+            m = reverse_z_projection(lens.fieldOfView(), lens.aspectRatio(), lens.nearPlane())
+            self._updating = True
+            try:
+                lens.setProjectionMatrix(QMatrix4x4(*m.flatten().tolist()))
+            finally:
+                self._updating = False
+
+        if self._depthMode == DepthMode.Logarithmic:
+            self._logDepth.setValue(float(log_depth_coefficient(lens.farPlane())))
+        else:
+            self._logDepth.setValue(0.0)
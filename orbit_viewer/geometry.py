@@ -0,0 +1,208 @@
+"""Vertex and index buffer builders.
+
+Pure numpy, no Qt: the functions return arrays which the Qt3D geometries
+upload with ``QBuffer.setData(array.tobytes())``.
+
+Vertices are interleaved as vec3 position, vec2 texCoord, vec3 normal and
+vec4 tangent, all float32 (`ELEMENT_SIZE` floats, `STRIDE` bytes).
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from .profiling import profiled
+
+ELEMENT_SIZE = 3 + 2 + 3 + 4
+STRIDE = ELEMENT_SIZE * 4  # sizeof(float)
+
+POSITION_OFFSET = 0 * 4
+TEXCOORD_OFFSET = 3 * 4
+NORMAL_OFFSET = 5 * 4
+TANGENT_OFFSET = 8 * 4
+
+
+def _fill_texture_and_tangent(data: np.ndarray, width: int, height: int, mirrored: bool):
+    # texture coordinates
+    data[:, 3] = np.tile(np.linspace(0.0, 1.0, width), height)
+
+    if mirrored:
+        nv = np.linspace(1.0, 0.0, height)
+    else:
+        nv = np.linspace(0.0, 1.0, height)
+    data[:, 4] = np.repeat(nv, width)
+
+    # tangent
+    data[:, 8] = 1.0
+    data[:, 9] = 0.0
+    data[:, 10] = 0.0
+    data[:, 11] = 1.0
+
+
+@profiled('buffers.model')
+def model_vertex_data(theta: float, phi: float, model: Callable, width: int, height: int):
+    """Evaluate a boundary model on a (theta, phi) grid.
+
+    `model(theta, phi)` is called once with flat arrays and returns x, y, z
+    (e.g. `space.models.planetary.mp_formisano1979`).  Returns a
+    (width * height, ELEMENT_SIZE) float32 array.
+    """
+    assert width > 1
+    assert height > 1
+
+    data = np.empty((width * height, ELEMENT_SIZE), dtype=np.single)
+    model_vertex_rows(data, theta, phi, model, width, height)
+    return data
+
+
+def model_vertex_rows(out: np.ndarray, theta: float, phi: float, model: Callable, width: int, height: int,
+                      begin: int = 0):
+    """Write the vertices begin... of `model_vertex_data()` into `out`, one tile of the surface.
+
+    The model is evaluated for these vertices only, so that tiles can be
+    built independently (see `orbit_viewer.surfaces`).
+    """
+    k = np.arange(begin, begin + len(out))
+    th, ph = _grid_angles(theta, phi, width, height, k)
+    _fill_model_vertices(out, model(th, ph), k, width, height)
+
+
+def _grid_angles(theta: float, phi: float, width: int, height: int, k: np.ndarray):
+    # theta-major grid, as numpy.meshgrid(..., indexing='ij')
+    return np.linspace(0, theta, width)[k // height], np.linspace(0, phi, height)[k % height]
+
+
+def _fill_model_vertices(out: np.ndarray, xyz, k: np.ndarray, width: int, height: int):
+    """Vertices k of model surfaces, `out` and x, y, z may have leading dimensions (surfaces)."""
+    x, y, z = xyz
+    out[..., 0] = x
+    out[..., 1] = y
+    out[..., 2] = z
+
+    # texture coordinates, mirrored
+    out[..., 3] = np.linspace(0.0, 1.0, width)[k % width]
+    out[..., 4] = np.linspace(1.0, 0.0, height)[k // width]
+
+    # normal: position scaled by its largest component
+    out[..., 5:8] = out[..., 0:3] / np.abs(out[..., 0:3]).max(axis=-1)[..., np.newaxis]
+
+    # tangent
+    out[..., 8] = 1.0
+    out[..., 9] = 0.0
+    out[..., 10] = 0.0
+    out[..., 11] = 1.0
+
+
+@profiled('buffers.model')
+def sweep_vertex_data(theta: float, phi: float, model: Callable, width: int, height: int, parameters):
+    """Evaluate a boundary model for each of `parameters` on the same (theta, phi) grid.
+
+    `model(theta, phi, parameter)` is called once, with (1, width *
+    height) angles and (m, 1) parameters, and must broadcast them to (m,
+    width * height) x, y, z (as numpy ufuncs do).  Returns the m surfaces
+    of `model_vertex_data()` one after the other, (m * width * height,
+    ELEMENT_SIZE) float32.
+    """
+    assert width > 1
+    assert height > 1
+
+    parameters = np.asarray(parameters, dtype=np.float64).reshape(-1, 1)
+    k = np.arange(width * height)
+    th, ph = _grid_angles(theta, phi, width, height, k)
+
+    data = np.empty((len(parameters), width * height, ELEMENT_SIZE), dtype=np.single)
+    xyz = [np.broadcast_to(c, data.shape[:2]) for c in model(th[np.newaxis], ph[np.newaxis], parameters)]
+    _fill_model_vertices(data, xyz, k, width, height)
+    return data.reshape(-1, ELEMENT_SIZE)
+
+
+def sweep_members(width: int, height: int, members: int) -> np.ndarray:
+    """float32 index of the surface of each vertex of `sweep_vertex_data()`."""
+    return np.repeat(np.arange(members, dtype=np.single), width * height)
+
+
+@profiled('buffers.indices')
+def sweep_index_data(width: int, height: int, members: int):
+    """Triangle indices of the `members` surfaces of `sweep_vertex_data()`, as `grid_index_data()` each."""
+    grid = grid_index_rows(width, 0, height - 1, np.int64)
+    offsets = np.arange(members, dtype=np.int64)[:, np.newaxis] * (width * height)
+    return (grid[np.newaxis] + offsets).astype(grid_index_dtype(width, height * members)).ravel()
+
+
+def plane_vertex_data(w: float, h: float, width: int, height: int, mirrored: bool = False):
+    """A w x h plane in XZ, facing +Y, with width x height vertices."""
+    assert width > 1
+    assert height > 1
+
+    data = np.empty((width * height, ELEMENT_SIZE), dtype=np.single)
+
+    # x, y, z
+    data[:, 0] = np.tile(np.linspace(-w / 2.0, w / 2.0, width), height)
+    data[:, 1] = 0.0
+    data[:, 2] = np.repeat(np.linspace(-h / 2.0, h / 2.0, height), width)
+
+    _fill_texture_and_tangent(data, width, height, mirrored)
+
+    # normal
+    data[:, 5] = 0.0
+    data[:, 6] = 1.0
+    data[:, 7] = 0.0
+
+    return data
+
+
+@profiled('buffers.indices')
+def grid_index_data(width: int, height: int):
+    """Triangle indices for a width x height vertex grid, 2 triangles per quad.
+
+    The dtype is uint16 when all indices fit, uint32 otherwise.
+    """
+    return grid_index_rows(width, 0, height - 1, grid_index_dtype(width, height))
+
+
+def grid_index_dtype(width: int, height: int):
+    return np.uint16 if width * height <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+
+def grid_index_rows(width: int, first: int, stop: int, dtype) -> np.ndarray:
+    """The indices of the quad rows [first, stop) of `grid_index_data()`, 6 * (width - 1) per row."""
+    row = (np.arange(first, stop, dtype=np.int64) * width)[:, np.newaxis]
+    nextRow = row + width
+    i = np.arange(width - 1, dtype=np.int64)[np.newaxis, :]
+
+    # split quad into two triangles
+    quads = np.stack([row + i, nextRow + i, row + i + 1,
+                      nextRow + i, nextRow + i + 1, row + i + 1], axis=-1)
+
+    return quads.astype(dtype).ravel()
+
+
+def rgba8(colors) -> np.ndarray:
+    """(n, 4) uint8 RGBA of (n, 3) or (n, 4) colors, floats in [0, 1] or uint8; alpha defaults to opaque."""
+    colors = np.asarray(colors)
+    if colors.dtype.kind == 'f':
+        colors = np.clip(np.rint(colors * 255.0), 0, 255)
+    colors = colors.astype(np.uint8)
+    if colors.shape[1] == 3:
+        colors = np.concatenate([colors, np.full((len(colors), 1), 255, dtype=np.uint8)], axis=1)
+    return np.ascontiguousarray(colors)
+
+
+#: blue - cyan - yellow - red, the default `colormap()` gradient
+GRADIENT = ((0.0, 0.0, 0.8), (0.0, 0.8, 0.9), (1.0, 0.9, 0.0), (0.8, 0.0, 0.0))
+
+
+def colormap(values, lo: float = None, hi: float = None, gradient=GRADIENT) -> np.ndarray:
+    """(n, 4) uint8 RGBA of scalar values, linear along the colors of `gradient` from `lo` to `hi`.
+
+    `lo` and `hi` default to the range of the values, values outside are
+    clipped.  E.g. the times of a trajectory as point colors.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    lo = values.min() if lo is None else lo
+    hi = values.max() if hi is None else hi
+    t = np.clip((values - lo) / ((hi - lo) or 1.0), 0.0, 1.0)
+
+    gradient = np.asarray(gradient, dtype=np.float64)
+    stops = np.linspace(0.0, 1.0, len(gradient))
+    return rgba8(np.column_stack([np.interp(t, stops, gradient[:, i]) for i in range(gradient.shape[1])]))
@@ -0,0 +1,77 @@
+"""Draggable handles of the selection shapes.
+
+The handles of a shape (`orbit_viewer.shapes.Shape.handles`, e.g. the
+center and a point on the surface of a sphere) are drawn as small spheres.
+The viewer hits them with the same camera rays as the trajectory picking
+and moves a dragged handle in the plane through its start position facing
+the camera; the shape, its mesh and the highlighted selection follow the
+mouse moves, once per frame (`OrbitScene.updateShape`).
+"""
+
+import numpy as np
+
+from PySide2.Qt3DExtras import Qt3DExtras
+from PySide2.Qt3DCore import Qt3DCore
+
+from PySide2.QtGui import (
+    QColor,
+    QVector3D,
+)
+
+from . import profiling
+from .materials import ColorMaterial
+from .picking import ray_point_distances
+
+
+class ShapeGizmo(Qt3DCore.QEntity):
+    """Handles of the shape of an `OrbitScene.addShape()` entity."""
+
+    def __init__(self, scene, shapeEntity, radius: float = 0.3, color: QColor = QColor.fromRgb(250, 250, 250),
+                 *args, **kwargs):
+        super().__init__(scene, *args, **kwargs)
+
+        self.scene = scene
+        self.shapeEntity = shapeEntity
+        self.radius = radius
+
+        # referenced from Python, see OrbitScene
+        self.handles = {}
+        for name in shapeEntity.shape.handles():
+            entity = Qt3DCore.QEntity(self)
+            mesh = Qt3DExtras.QSphereMesh(entity)
+            mesh.setRadius(radius)
+            entity.transform = Qt3DCore.QTransform(entity)
+            material = ColorMaterial(color, translucent=False, parent=entity)
+            entity.addComponent(mesh)
+            entity.addComponent(entity.transform)
+            entity.addComponent(material)
+            profiling.count('entities')
+            self.handles[name] = entity
+
+        self.update()
+
+    def update(self):
+        """Move the handles to the current shape, at the next `OrbitScene.sync()`."""
+        for name, position in self.shapeEntity.shape.handles().items():
+            self.scene.model.setProperty(self.handles[name].transform, 'setTranslation', QVector3D(*position))
+
+    def hit(self, origin, direction, tolerance: float):
+        """(name, distance to the ray) of the handle closest to a ray, None if none is within reach.
+
+        A handle is in reach within `tolerance` or its radius.
+        """
+        names, positions = zip(*self.shapeEntity.shape.handles().items())
+        distances = ray_point_distances(origin, direction, np.array(positions))
+        best = int(np.argmin(distances))
+        if distances[best] > max(tolerance, self.radius):
+            return None
+        return names[best], float(distances[best])
+
+    def position(self, name: str) -> np.ndarray:
+        return self.shapeEntity.shape.handles()[name]
+
+    def drag(self, name: str, position):
+        """Move handle `name` to `position` and update shape, mesh and selection."""
+        self.shapeEntity.shape.move_handle(name, position)
+        self.scene.updateShape(self.shapeEntity)
+        self.update()
@@ -0,0 +1,269 @@
+"""Reading and writing orbits, interval lists and selections.
+
+Orbits (`Trajectory`) are cached as ``.npz``, one array per column, or in
+our columnar ``.ovc`` format, or read from ``.csv`` files with ISO times
+and x, y, z columns.  Intervals are written as ``.csv`` or ``.json`` (for
+small lists) or ``.ovc``, selections (the selected samples and their
+intervals) as ``.ovc`` or ``.npz``.
+
+The ``.ovc`` format is a magic, a JSON header describing the columns and
+the raw column data, each column aligned to 64 bytes::
+
+    b'ORBVIEW1' | uint64 header size | JSON header | pad | column | pad | column ...
+
+It is read through a memory map: the arrays of a loaded trajectory are
+views on the mapped file, nothing is parsed or copied and pages are only
+read when touched.  Only the shapes and types in the header are checked
+on loading, not the data.
+"""
+
+import csv
+import json
+import os
+import struct
+
+import numpy as np
+
+from .profiling import profiled
+from .trajectory import Trajectory
+
+_MAGIC = b'ORBVIEW1'
+_ALIGNMENT = 64
+
+
+def _suffix(path: str):
+    return os.path.splitext(path)[1].lower()
+
+
+def _aligned(offset: int):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_columns(path: str, kind: str, columns: dict):
+    """Write named arrays to an .ovc file."""
+    columns = {name: np.ascontiguousarray(array) for name, array in columns.items()}
+
+    # the header holds the offsets, which depend on the header size: lay out
+    # with a generous guess and grow it until it fits
+    reserved = 1024
+    while True:
+        offset = _aligned(len(_MAGIC) + 8 + reserved)
+        entries = []
+        for name, array in columns.items():
+            entries.append({'name': name, 'dtype': array.dtype.str, 'shape': array.shape, 'offset': offset})
+            offset = _aligned(offset + array.nbytes)
+
+        header = json.dumps({'kind': kind, 'columns': entries}).encode()
+        if len(header) <= reserved:
+            break
+        reserved = len(header)
+
+    with open(path, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for entry, array in zip(entries, columns.values()):
+            f.seek(entry['offset'])
+            f.write(array.data)
+        f.truncate(offset)
+
+
+def read_columns(path: str, kind: str = None):
+    """Map an .ovc file, return {name: array} of read-only views on the mapping."""
+    with open(path, 'rb') as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError('{} is not an .ovc file'.format(path))
+        size, = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(size).decode())
+
+    if kind is not None and header['kind'] != kind:
+        raise ValueError('{} contains a {}, expected a {}'.format(path, header['kind'], kind))
+
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    return {entry['name']: np.ndarray(shape=tuple(entry['shape']), dtype=np.dtype(entry['dtype']),
+                                      buffer=mapped, offset=entry['offset'])
+            for entry in header['columns']}
+
+
+def _trajectory_columns(trajectory: Trajectory):
+    columns = {'times': trajectory.times, 'positions': trajectory.positions}
+    if trajectory.velocities is not None:
+        columns['velocities'] = trajectory.velocities
+    for name, column in trajectory.columns.items():
+        columns['column.' + name] = column
+    return columns
+
+
+def _columns_trajectory(path: str, columns: dict):
+    for name in ['times', 'positions']:
+        if name not in columns:
+            raise ValueError('{} has no {} column'.format(path, name))
+    extra = {name[len('column.'):]: column for name, column in columns.items() if name.startswith('column.')}
+
+    # wrap the mapped arrays as they are, checking only shapes and types:
+    # testing the order of the times would read the whole file
+    trajectory = Trajectory._wrap(columns['times'], columns['positions'], columns.get('velocities'), extra)
+    try:
+        trajectory._check(check_sorted=False)
+    except ValueError as error:
+        raise ValueError('{}: {}'.format(path, error)) from None
+    return trajectory
+
+
+def _npz_arrays(trajectory: Trajectory):
+    arrays = {'times': trajectory.times, 'positions': trajectory.positions}
+    if trajectory.velocities is not None:
+        arrays['velocities'] = trajectory.velocities
+    for name, column in trajectory.columns.items():
+        arrays['column_' + name] = column
+    return arrays
+
+
+def _npz_trajectory(f):
+    columns = {name[len('column_'):]: f[name] for name in f.files if name.startswith('column_')}
+    velocities = f['velocities'] if 'velocities' in f.files else None
+    return Trajectory(f['times'], f['positions'], velocities, columns)
+
+
+def save_orbit(path: str, trajectory: Trajectory):
+    if _suffix(path) == '.ovc':
+        write_columns(path, 'trajectory', _trajectory_columns(trajectory))
+        return
+
+    np.savez(path, **_npz_arrays(trajectory))
+
+
+@profiled('load')
+def load_orbit(path: str) -> Trajectory:
+    """Read an orbit cache (.npz or .ovc) or CSV file."""
+    suffix = _suffix(path)
+
+    if suffix == '.ovc':
+        return _columns_trajectory(path, read_columns(path, 'trajectory'))
+
+    if suffix == '.npz':
+        with np.load(path) as f:
+            return _npz_trajectory(f)
+
+    if suffix == '.csv':
+        with open(path, newline='') as f:
+            rows = [row for row in csv.reader(f) if row and not row[0].startswith('#')]
+        if rows and not _is_number(rows[0][1]):
+            rows = rows[1:]  # header
+        times = np.array([row[0] for row in rows], dtype='datetime64[ns]')
+        positions = np.array([row[1:4] for row in rows], dtype=np.float64).reshape(-1, 3)
+        return Trajectory(times, positions)
+
+    raise ValueError('unsupported orbit file {}, expected .npz, .ovc or .csv'.format(path))
+
+
+def _is_number(text: str):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def save_intervals(path: str, intervals: np.ndarray):
+    """Write (n, 2) datetime64 [start, stop] pairs as CSV, JSON or .ovc."""
+    intervals = np.asarray(intervals, dtype='datetime64[ns]').reshape(-1, 2)
+    suffix = _suffix(path)
+
+    if suffix == '.ovc':
+        write_columns(path, 'intervals', {'intervals': intervals.view(np.int64)})
+        return
+
+    iso = np.datetime_as_string(intervals)
+
+    if suffix == '.csv':
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['start', 'stop'])
+            writer.writerows(iso.tolist())
+    elif suffix == '.json':
+        with open(path, 'w') as f:
+            json.dump([{'start': start, 'stop': stop} for start, stop in iso.tolist()], f, indent=1)
+    else:
+        raise ValueError('unsupported interval file {}, expected .csv, .json or .ovc'.format(path))
+
+
+def load_intervals(path: str) -> np.ndarray:
+    """Read intervals from CSV, JSON or .ovc (intervals or selection)."""
+    suffix = _suffix(path)
+
+    if suffix == '.ovc':
+        columns = read_columns(path)
+        if 'intervals' not in columns:
+            raise ValueError('{} has no intervals'.format(path))
+        return columns['intervals'].view('datetime64[ns]')
+
+    if suffix == '.csv':
+        with open(path, newline='') as f:
+            rows = list(csv.reader(f))[1:]
+    elif suffix == '.json':
+        with open(path) as f:
+            rows = [(i['start'], i['stop']) for i in json.load(f)]
+    else:
+        raise ValueError('unsupported interval file {}, expected .csv, .json or .ovc'.format(path))
+
+    return np.array(rows, dtype='datetime64[ns]').reshape(-1, 2)
+
+
+def save_conjunctions(path: str, conjunctions):
+    """Write `orbit_viewer.conjunctions.Conjunction`s as CSV or JSON."""
+    rows = [(c.first, c.second, str(c.start), str(c.stop), c.min_distance) for c in conjunctions]
+    suffix = _suffix(path)
+
+    if suffix == '.csv':
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['first', 'second', 'start', 'stop', 'min_distance'])
+            writer.writerows(rows)
+    elif suffix == '.json':
+        with open(path, 'w') as f:
+            json.dump([dict(zip(['first', 'second', 'start', 'stop', 'min_distance'], row)) for row in rows],
+                      f, indent=1)
+    else:
+        raise ValueError('unsupported conjunction file {}, expected .csv or .json'.format(path))
+
+
+def save_selection(path: str, trajectory: Trajectory, mask: np.ndarray, intervals: np.ndarray):
+    """Write the selected samples and their intervals to one .ovc or .npz file."""
+    intervals = np.asarray(intervals, dtype='datetime64[ns]').reshape(-1, 2).view(np.int64)
+    suffix = _suffix(path)
+
+    if suffix == '.ovc':
+        columns = _trajectory_columns(trajectory[mask])
+        columns['intervals'] = intervals
+        write_columns(path, 'selection', columns)
+    elif suffix == '.npz':
+        np.savez(path, intervals=intervals, **_npz_arrays(trajectory[mask]))
+    else:
+        raise ValueError('unsupported selection file {}, expected .ovc or .npz'.format(path))
+
+
+def _selection_intervals(path: str, intervals):
+    if intervals is None:
+        raise ValueError('{} has no intervals'.format(path))
+    if intervals.ndim != 2 or intervals.shape[1:] != (2,) or intervals.dtype != np.int64:
+        raise ValueError('{}: intervals must be (n, 2) int64, got {} {}'.format(path, intervals.shape,
+                                                                               intervals.dtype))
+    return intervals.view('datetime64[ns]')
+
+
+def load_selection(path: str):
+    """Return (trajectory, intervals) of a selection written by `save_selection`, memory mapped from .ovc."""
+    suffix = _suffix(path)
+
+    if suffix == '.ovc':
+        columns = read_columns(path, 'selection')
+        intervals = _selection_intervals(path, columns.pop('intervals', None))
+        return _columns_trajectory(path, columns), intervals
+
+    if suffix == '.npz':
+        with np.load(path) as f:
+            intervals = _selection_intervals(path, f['intervals'] if 'intervals' in f.files else None)
+            return _npz_trajectory(f), intervals
+
+    raise ValueError('unsupported selection file {}, expected .ovc or .npz'.format(path))
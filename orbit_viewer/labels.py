@@ -0,0 +1,143 @@
+"""Layout and decluttering of text labels on screen.
+
+Labels are drawn from a glyph atlas (`orbit_viewer.annotations`): each
+character is a quad of its glyph, placed in pixels relative to the
+projected 3D anchor of its label.  `layout()` turns the texts of all labels
+into per-glyph offsets, sizes and atlas coordinates at once; only the
+`GlyphMetrics` of the atlas are needed, so this module is numpy only.
+
+`declutter()` decides per frame which labels are shown: labels whose
+anchor is behind the camera or whose box is off screen are culled, then
+the labels are taken in priority order and a label is dropped when its
+box overlaps one already taken.  So that this stays cheap for thousands of
+labels, at most one label per screen cell the size of the largest box is
+considered (the first in priority order); the overlap test then only
+looks at the neighbouring cells.
+"""
+
+from collections import namedtuple
+from typing import Sequence
+
+import numpy as np
+
+#: of the glyphs of an atlas, sorted by code point: advances, quad widths
+#: and the common quad height in pixels, the padding of the quads left of
+#: the pen position and their (u0, v0, u1, v1) atlas coordinates, v down
+GlyphMetrics = namedtuple('GlyphMetrics', ['codes', 'advances', 'widths', 'height', 'padding', 'uv'])
+
+#: per glyph: label index, (x, y) pixel offset of the top left corner from
+#: the label anchor (y down), (width, height) and uv; per label: (width,
+#: height) of the box
+Layout = namedtuple('Layout', ['label', 'offsets', 'sizes', 'uv', 'boxes'])
+
+#: pixels between the anchor and the text, which is vertically centered on it
+MARGIN = 6.0
+
+FALLBACK = '?'
+
+
+def glyph_indices(metrics: GlyphMetrics, codes: np.ndarray) -> np.ndarray:
+    """Indices in `metrics` of code points, the `FALLBACK` glyph (or the first) for missing ones."""
+    index = np.minimum(np.searchsorted(metrics.codes, codes), len(metrics.codes) - 1)
+    missing = metrics.codes[index] != codes
+    if missing.any():
+        fallback = np.searchsorted(metrics.codes, ord(FALLBACK))
+        if fallback >= len(metrics.codes) or metrics.codes[fallback] != ord(FALLBACK):
+            fallback = 0
+        index[missing] = fallback
+    return index
+
+
+def layout(metrics: GlyphMetrics, texts: Sequence[str], margin: float = MARGIN) -> Layout:
+    """Glyph quads of single line texts, left aligned `margin` pixels right of their anchors."""
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype='<u4')
+    glyphs = glyph_indices(metrics, codes)
+
+    label = np.repeat(np.arange(len(texts)), lengths)
+    advances = metrics.advances[glyphs].astype(np.float64)
+
+    # pen position: advances of the glyphs before, in the same label
+    pen = np.concatenate([[0.0], np.cumsum(advances)])
+    firsts = np.cumsum(lengths) - lengths
+    x = pen[:-1] - pen[firsts][label]
+
+    offsets = np.empty((len(glyphs), 2), dtype=np.float32)
+    offsets[:, 0] = margin + x - metrics.padding
+    offsets[:, 1] = -metrics.height / 2.0
+
+    sizes = np.empty((len(glyphs), 2), dtype=np.float32)
+    sizes[:, 0] = metrics.widths[glyphs]
+    sizes[:, 1] = metrics.height
+
+    boxes = np.empty((len(texts), 2))
+    boxes[:, 0] = pen[firsts + lengths] - pen[firsts]
+    boxes[:, 1] = metrics.height
+    return Layout(label, offsets, sizes, metrics.uv[glyphs].astype(np.float32), boxes)
+
+
+def project(points: np.ndarray, matrix: np.ndarray, width: int, height: int):
+    """(pixel positions, y down, and mask of the points in front of the camera) of (n, 3) points.
+
+    `matrix` is the 4 x 4 view-projection matrix (row-major, for column
+    vectors).
+    """
+    clip = points @ matrix[:3, :3].T + matrix[:3, 3]
+    w = points @ matrix[3, :3] + matrix[3, 3]
+    front = w > 1e-9
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ndc = clip[:, 0:2] / w[:, np.newaxis]
+    xy = np.empty((len(points), 2))
+    xy[:, 0] = (ndc[:, 0] + 1.0) * 0.5 * width
+    xy[:, 1] = (1.0 - ndc[:, 1]) * 0.5 * height
+    return xy, front
+
+
+def declutter(xy: np.ndarray, boxes: np.ndarray, width: int, height: int, front: np.ndarray = None,
+              priorities: np.ndarray = None, margin: float = MARGIN) -> np.ndarray:
+    """Mask of the labels shown: on screen and not overlapping a label of higher priority.
+
+    `xy` are the anchors in pixels, `boxes` the (width, height) of the
+    labels as placed by `layout()`.  Without `priorities` earlier labels
+    win.
+    """
+    n = len(xy)
+    shown = np.zeros(n, dtype=bool)
+    if not n:
+        return shown
+
+    lo = np.column_stack([xy[:, 0] + margin, xy[:, 1] - boxes[:, 1] / 2.0])
+    hi = lo + boxes
+
+    onScreen = (hi[:, 0] > 0) & (hi[:, 1] > 0) & (lo[:, 0] < width) & (lo[:, 1] < height)
+    if front is not None:
+        onScreen &= front
+    candidates = np.flatnonzero(onScreen)
+    if priorities is not None:
+        candidates = candidates[np.argsort(-np.asarray(priorities, dtype=np.float64)[candidates], kind='stable')]
+
+    # first label of each cell, a box never spans more than two cells per axis
+    cell = np.maximum(boxes.max(axis=0), 1.0)
+    cells = np.floor(lo[candidates] / cell).astype(np.int64)
+    rows = int(np.ceil(height / cell[1])) + 2  # on screen, cells start at -1
+    _, first = np.unique((cells[:, 0] + 1) * rows + cells[:, 1] + 1, return_index=True)
+    keep = np.sort(first)
+    candidates, cells = candidates[keep], cells[keep]
+
+    # exact greedy test against the labels taken in the neighbouring cells
+    taken = {}
+    lo, hi = lo[candidates].tolist(), hi[candidates].tolist()
+    for k, (cx, cy) in enumerate(cells.tolist()):
+        (x0, y0), (x1, y1) = lo[k], hi[k]
+        clear = True
+        for key in ((cx - 1, cy - 1), (cx, cy - 1), (cx + 1, cy - 1),
+                    (cx - 1, cy), (cx + 1, cy),
+                    (cx - 1, cy + 1), (cx, cy + 1), (cx + 1, cy + 1)):
+            j = taken.get(key)
+            if j is not None and x0 < hi[j][0] and lo[j][0] < x1 and y0 < hi[j][1] and lo[j][1] < y1:
+                clear = False
+                break
+        if clear:
+            taken[cx, cy] = k
+    shown[candidates[list(taken.values())]] = True
+    return shown
@@ -0,0 +1,29 @@
+"""Level of detail: decimation of trajectories for display."""
+
+import numpy as np
+
+from .profiling import profiled
+
+
+def decimation_indices(count: int, max_samples: int) -> np.ndarray:
+    """Indices of at most `max_samples` evenly strided samples out of `count`.
+
+    The first and the last sample are always kept, so a decimated orbit
+    still starts and ends where the data does.
+    """
+    assert max_samples >= 2
+
+    if count <= max_samples:
+        return np.arange(count)
+
+    step = -(-(count - 1) // (max_samples - 1))  # ceil
+    indices = np.arange(0, count, step)
+    if indices[-1] != count - 1:
+        indices = np.append(indices, count - 1)
+    return indices
+
+
+@profiled('decimate')
+def decimate(positions: np.ndarray, max_samples: int) -> np.ndarray:
+    """`positions` reduced to at most `max_samples` rows, see `decimation_indices`."""
+    return positions[decimation_indices(len(positions), max_samples)]
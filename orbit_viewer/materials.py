@@ -0,0 +1,547 @@
+"""Shader based materials used by the orbit viewer.
+
+All materials here are OpenGL 3.3 core techniques tagged with the forward
+rendering-style key, so that they work with the default ``Qt3DWindow`` frame
+graph as well as with our own ``DepthFrameGraph``.  Each effect has a second
+technique, tagged with the `LOG_DEPTH_FILTER_KEY` as well, whose fragment
+shader writes a logarithmic depth from the ``logDepthCoefficient`` parameter.
+The frame graph only selects it in logarithmic depth mode; the first
+technique leaves the depth alone, so that early depth tests keep working.
+
+In logarithmic mode materials without that technique (e.g. the ones of
+``Qt3DExtras``) are not drawn at all, all entities of `OrbitScene` use the
+materials of this module.
+"""
+
+from PySide2.Qt3DRender import Qt3DRender
+
+from PySide2.QtGui import (
+    QColor,
+)
+
+from PySide2.QtCore import (
+    QByteArray,
+)
+
+LOG_DEPTH_PARAMETER = 'logDepthCoefficient'
+
+#: (name, value) of the filter key of the logarithmic depth techniques
+LOG_DEPTH_FILTER_KEY = ('depth', 'logarithmic')
+
+# shared GLSL snippet, `logZ` is `1.0 + gl_Position.w` from the vertex shader;
+# without LOG_DEPTH gl_FragDepth is not written at all
+_LOG_DEPTH_GLSL = """
+#ifdef LOG_DEPTH
+uniform float logDepthCoefficient;
+#endif
+
+void writeDepth(float logZ)
+{
+#ifdef LOG_DEPTH
+    gl_FragDepth = log2(logZ) * 0.5 * logDepthCoefficient;
+#endif
+}
+"""
+
+_COLOR_VERTEX_SHADER = """#version 330 core
+
+in vec3 vertexPosition;
+in vec3 vertexNormal;
+
+out vec3 normal;
+out float logZ;
+
+uniform mat4 mvp;
+uniform mat3 modelViewNormal;
+
+void main()
+{
+    normal = normalize(modelViewNormal * vertexNormal);
+    gl_Position = mvp * vec4(vertexPosition, 1.0);
+    logZ = 1.0 + gl_Position.w;
+}
+"""
+
+_COLOR_FRAGMENT_SHADER = """#version 330 core
+
+in vec3 normal;
+in float logZ;
+
+out vec4 fragColor;
+
+uniform vec4 color;
+""" + _LOG_DEPTH_GLSL + """
+void main()
+{
+    float shade = 0.6 + 0.4 * abs(normal.z);
+    fragColor = vec4(color.rgb * shade, color.a);
+    writeDepth(logZ);
+}
+"""
+
+_TEXTURE_VERTEX_SHADER = """#version 330 core
+
+in vec3 vertexPosition;
+in vec2 vertexTexCoord;
+
+out vec2 texCoord;
+out float logZ;
+
+uniform mat4 mvp;
+
+void main()
+{
+    texCoord = vertexTexCoord;
+    gl_Position = mvp * vec4(vertexPosition, 1.0);
+    logZ = 1.0 + gl_Position.w;
+}
+"""
+
+_TEXTURE_FRAGMENT_SHADER = """#version 330 core
+
+in vec2 texCoord;
+in float logZ;
+
+out vec4 fragColor;
+
+uniform sampler2D diffuseTexture;
+""" + _LOG_DEPTH_GLSL + """
+void main()
+{
+    fragColor = texture(diffuseTexture, texCoord);
+    writeDepth(logZ);
+}
+"""
+
+_SWEEP_VERTEX_SHADER = """#version 330 core
+
+in vec3 vertexPosition;
+in vec3 vertexNormal;
+in float vertexMember;
+
+out vec3 normal;
+flat out float member;
+out float logZ;
+
+uniform mat4 mvp;
+uniform mat3 modelViewNormal;
+
+void main()
+{
+    normal = normalize(modelViewNormal * vertexNormal);
+    member = vertexMember;
+    gl_Position = mvp * vec4(vertexPosition, 1.0);
+    logZ = 1.0 + gl_Position.w;
+}
+"""
+
+# the highlighted member in its color, the others in `color` faded by `othersAlpha`
+_SWEEP_FRAGMENT_SHADER = """#version 330 core
+
+in vec3 normal;
+flat in float member;
+in float logZ;
+
+out vec4 fragColor;
+
+uniform vec4 color;
+uniform vec4 highlightColor;
+uniform float highlighted;
+uniform float othersAlpha;
+""" + _LOG_DEPTH_GLSL + """
+void main()
+{
+    float shade = 0.6 + 0.4 * abs(normal.z);
+    bool isHighlighted = abs(member - highlighted) < 0.5;
+    vec4 c = isHighlighted ? highlightColor : vec4(color.rgb, color.a * othersAlpha);
+    if (c.a <= 0.0)
+        discard;
+    fragColor = vec4(c.rgb * shade, c.a);
+    writeDepth(logZ);
+}
+"""
+
+#: name of the per-vertex attribute of `SweepMaterial`: index of the surface of a parameter sweep
+SWEEP_MEMBER_ATTRIBUTE = 'vertexMember'
+
+_TRAJECTORY_VERTEX_SHADER = """#version 330 core
+
+in vec3 vertexPosition;
+in float vertexSelected;
+
+out float selected;
+out float logZ;
+
+uniform mat4 mvp;
+
+void main()
+{
+    // 0 or 1, whether Qt3D hands the byte (0 or 255) over normalized or not
+    selected = min(vertexSelected, 1.0);
+    gl_Position = mvp * vec4(vertexPosition, 1.0);
+    logZ = 1.0 + gl_Position.w;
+}
+"""
+
+# a segment between a selected and an unselected sample is split halfway
+_TRAJECTORY_FRAGMENT_SHADER = """#version 330 core
+
+in float selected;
+in float logZ;
+
+out vec4 fragColor;
+
+uniform vec4 color;
+uniform vec4 selectedColor;
+""" + _LOG_DEPTH_GLSL + """
+void main()
+{
+    fragColor = selected > 0.5 ? selectedColor : color;
+    writeDepth(logZ);
+}
+"""
+
+#: name of the per-vertex selection attribute of `TrajectoryMaterial`
+SELECTION_ATTRIBUTE = 'vertexSelected'
+
+_POINT_VERTEX_SHADER = """#version 330 core
+
+in vec3 vertexPosition;
+#ifdef VERTEX_COLORS
+in vec4 vertexColor;
+#endif
+#ifdef VERTEX_SIZES
+in float vertexSize;
+#endif
+
+out vec4 pointColor;
+out float logZ;
+
+uniform mat4 modelView;
+uniform mat4 projectionMatrix;
+uniform vec4 color;
+uniform float pointSize;
+uniform float attenuation;
+uniform float maxPointSize;
+
+void main()
+{
+    vec4 eye = modelView * vec4(vertexPosition, 1.0);
+    gl_Position = projectionMatrix * eye;
+    logZ = 1.0 + gl_Position.w;
+
+#ifdef VERTEX_COLORS
+    pointColor = vertexColor;
+#else
+    pointColor = color;
+#endif
+
+#ifdef VERTEX_SIZES
+    float size = vertexSize;
+#else
+    float size = pointSize;
+#endif
+    // nominal size at the eye distance `attenuation`, larger when closer
+    if (attenuation > 0.0)
+        size *= attenuation / max(-eye.z, 1e-6);
+    gl_PointSize = clamp(size, 1.0, maxPointSize);
+}
+"""
+
+# round sprites with an antialiased rim
+_POINT_FRAGMENT_SHADER = """#version 330 core
+
+in vec4 pointColor;
+in float logZ;
+
+out vec4 fragColor;
+""" + _LOG_DEPTH_GLSL + """
+void main()
+{
+    vec2 p = 2.0 * gl_PointCoord - 1.0;
+    float r2 = dot(p, p);
+    if (r2 > 1.0)
+        discard;
+    fragColor = vec4(pointColor.rgb, pointColor.a * (1.0 - smoothstep(0.7, 1.0, r2)));
+    writeDepth(logZ);
+}
+"""
+
+#: name of the per-vertex size attribute (float, pixels) of `PointSpriteMaterial`
+POINT_SIZE_ATTRIBUTE = 'vertexSize'
+
+
+_LABEL_VERTEX_SHADER = """#version 330 core
+
+in vec2 vertexCorner;
+in vec3 labelAnchor;
+in vec2 glyphOffset;
+in vec2 glyphSize;
+in vec4 glyphUV;
+in float glyphVisible;
+
+out vec2 texCoord;
+out float logZ;
+
+uniform mat4 mvp;
+uniform mat4 inverseViewportMatrix;
+
+void main()
+{
+    vec4 anchor = mvp * vec4(labelAnchor, 1.0);
+    vec2 ndcPerPixel = abs(vec2(inverseViewportMatrix[0][0], inverseViewportMatrix[1][1]));
+
+    // billboard: pixel offsets from the projected anchor, y down, times w
+    // so that they stay pixels after the perspective division
+    vec2 pixel = glyphOffset + vertexCorner * glyphSize;
+    gl_Position = anchor + vec4(pixel.x * ndcPerPixel.x, -pixel.y * ndcPerPixel.y, 0.0, 0.0) * anchor.w;
+    if (glyphVisible == 0.0)
+        gl_Position = vec4(2.0, 2.0, 2.0, 1.0);  // outside of the clip volume
+
+    texCoord = mix(glyphUV.xy, glyphUV.zw, vertexCorner);
+    logZ = 1.0 + anchor.w;
+}
+"""
+
+_LABEL_FRAGMENT_SHADER = """#version 330 core
+
+in vec2 texCoord;
+in float logZ;
+
+out vec4 fragColor;
+
+uniform sampler2D atlas;
+uniform vec4 color;
+""" + _LOG_DEPTH_GLSL + """
+void main()
+{
+    float coverage = texture(atlas, texCoord).a;
+    if (coverage < 0.02)
+        discard;
+    fragColor = vec4(color.rgb, color.a * coverage);
+    writeDepth(logZ);
+}
+"""
+
+#: names of the attributes of `LabelMaterial`: per vertex the corner (0 or 1,
+#: 0 or 1) of a glyph quad, per instance (glyph) the 3D anchor of its label,
+#: its pixel offset from the anchor, size, atlas rectangle (u0, v0, u1, v1)
+#: and whether it is shown (a byte)
+LABEL_ATTRIBUTES = ('vertexCorner', 'labelAnchor', 'glyphOffset', 'glyphSize', 'glyphUV', 'glyphVisible')
+
+
+def _filterKey(name: str, value: str, parent) -> Qt3DRender.QFilterKey:
+    filterKey = Qt3DRender.QFilterKey(parent)
+    filterKey.setName(name)
+    filterKey.setValue(value)
+    return filterKey
+
+
+def _createEffect(vertex: str, fragment: str, parent, renderStates=()):
+    """Build a single-pass GL 3.3 forward effect from shader sources.
+
+    Its second technique is the same with ``LOG_DEPTH`` defined, see the
+    module documentation.  Of several matching techniques Qt3D uses the
+    first one, the standard technique is thus added first.
+    """
+    effect = Qt3DRender.QEffect(parent)
+    forward = _filterKey('renderingStyle', 'forward', effect)
+    logDepth = _filterKey(*LOG_DEPTH_FILTER_KEY, effect)
+
+    for filterKeys, defines in [([forward], []), ([forward, logDepth], ['LOG_DEPTH'])]:
+        program = Qt3DRender.QShaderProgram(effect)
+        program.setVertexShaderCode(QByteArray(vertex.encode()))
+        program.setFragmentShaderCode(QByteArray(_withDefines(fragment, *defines).encode()))
+
+        renderPass = Qt3DRender.QRenderPass(effect)
+        renderPass.setShaderProgram(program)
+        for state in renderStates:
+            renderPass.addRenderState(state)
+
+        technique = Qt3DRender.QTechnique(effect)
+        technique.graphicsApiFilter().setApi(Qt3DRender.QGraphicsApiFilter.OpenGL)
+        technique.graphicsApiFilter().setProfile(Qt3DRender.QGraphicsApiFilter.CoreProfile)
+        technique.graphicsApiFilter().setMajorVersion(3)
+        technique.graphicsApiFilter().setMinorVersion(3)
+        for filterKey in filterKeys:
+            technique.addFilterKey(filterKey)
+        technique.addRenderPass(renderPass)
+
+        effect.addTechnique(technique)
+    return effect
+
+
+def _withDefines(source: str, *names: str) -> str:
+    """`source` with a ``#define`` of each name after its ``#version`` line."""
+    version, _, rest = source.partition('\n')
+    return '\n'.join([version] + ['#define ' + name for name in names] + [rest])
+
+
+def _alphaBlendStates(parent):
+    blendArguments = Qt3DRender.QBlendEquationArguments(parent)
+    blendArguments.setSourceRgba(Qt3DRender.QBlendEquationArguments.SourceAlpha)
+    blendArguments.setDestinationRgba(Qt3DRender.QBlendEquationArguments.OneMinusSourceAlpha)
+
+    blendEquation = Qt3DRender.QBlendEquation(parent)
+    blendEquation.setBlendFunction(Qt3DRender.QBlendEquation.Add)
+
+    return [blendArguments, blendEquation]
+
+
+class ColorMaterial(Qt3DRender.QMaterial):
+    """Flat color with a simple view-facing shade.
+
+    A `translucent` material is alpha-blended and does not write the depth
+    buffer, like a ``QPhongAlphaMaterial``.
+    """
+
+    def __init__(self, color: QColor, translucent: bool = True, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._color = Qt3DRender.QParameter('color', color, self)
+        self.addParameter(self._color)
+
+        renderStates = []
+        if translucent:
+            renderStates = [Qt3DRender.QNoDepthMask(self)] + _alphaBlendStates(self)
+
+        self.setEffect(_createEffect(_COLOR_VERTEX_SHADER, _COLOR_FRAGMENT_SHADER, self, renderStates))
+
+    def setColor(self, color: QColor):
+        self._color.setValue(color)
+
+    def color(self):
+        return self._color.value()
+
+
+class TextureMaterial(Qt3DRender.QMaterial):
+    """Unlit texture, for the Earth map and textured planes."""
+
+    def __init__(self, texture: Qt3DRender.QAbstractTexture = None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._texture = Qt3DRender.QParameter('diffuseTexture', texture, self)
+        self.addParameter(self._texture)
+
+        self.setEffect(_createEffect(_TEXTURE_VERTEX_SHADER, _TEXTURE_FRAGMENT_SHADER, self))
+
+    def setTexture(self, texture: Qt3DRender.QAbstractTexture):
+        self._texture.setValue(texture)
+
+    def texture(self):
+        return self._texture.value()
+
+
+class SweepMaterial(Qt3DRender.QMaterial):
+    """`ColorMaterial` for the surfaces of a parameter sweep, one of them highlighted.
+
+    The surface of each vertex is its `SWEEP_MEMBER_ATTRIBUTE`; the others
+    are drawn with `othersAlpha` times the alpha of `color` (0 hides them).
+    Changing the highlighted surface only sets a parameter.
+    """
+
+    def __init__(self, color: QColor, highlightColor: QColor = QColor.fromRgb(255, 190, 0),
+                 highlighted: int = -1, othersAlpha: float = 1.0, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._color = Qt3DRender.QParameter('color', color, self)
+        self._highlightColor = Qt3DRender.QParameter('highlightColor', highlightColor, self)
+        self._highlighted = Qt3DRender.QParameter('highlighted', float(highlighted), self)
+        self._othersAlpha = Qt3DRender.QParameter('othersAlpha', float(othersAlpha), self)
+        for parameter in [self._color, self._highlightColor, self._highlighted, self._othersAlpha]:
+            self.addParameter(parameter)
+
+        self.setEffect(_createEffect(_SWEEP_VERTEX_SHADER, _SWEEP_FRAGMENT_SHADER, self,
+                                     _alphaBlendStates(self)))
+
+    def setColor(self, color: QColor):
+        self._color.setValue(color)
+
+    def setHighlighted(self, member: int, othersAlpha: float = None):
+        """Highlight surface `member` (-1: none), optionally fading the others."""
+        self._highlighted.setValue(float(member))
+        if othersAlpha is not None:
+            self._othersAlpha.setValue(float(othersAlpha))
+
+
+class TrajectoryMaterial(Qt3DRender.QMaterial):
+    """Unlit line color, `selectedColor` where the `SELECTION_ATTRIBUTE` of the vertices is 1."""
+
+    def __init__(self, color: QColor, selectedColor: QColor = QColor.fromRgb(255, 190, 0), *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._color = Qt3DRender.QParameter('color', color, self)
+        self.addParameter(self._color)
+        self._selectedColor = Qt3DRender.QParameter('selectedColor', selectedColor, self)
+        self.addParameter(self._selectedColor)
+
+        self.setEffect(_createEffect(_TRAJECTORY_VERTEX_SHADER, _TRAJECTORY_FRAGMENT_SHADER, self))
+
+    def setColor(self, color: QColor):
+        self._color.setValue(color)
+
+    def setSelectedColor(self, color: QColor):
+        self._selectedColor.setValue(color)
+
+
+class PointSpriteMaterial(Qt3DRender.QMaterial):
+    """Round, alpha-blended point sprites with a size computed in the vertex shader.
+
+    `size` is in pixels.  With `attenuation`, an eye distance, points have
+    `size` at that distance and shrink farther away.  With `vertexSizes` or
+    `vertexColors` each point has its own size (`POINT_SIZE_ATTRIBUTE`) or
+    RGBA color (the default color attribute) instead, so that a whole
+    cloud is one geometry drawn with one material in one call.
+    """
+
+    def __init__(self, color: QColor = QColor.fromRgb(200, 0, 0), size: float = 4.0, attenuation: float = 0.0,
+                 vertexSizes: bool = False, vertexColors: bool = False, maxSize: float = 64.0,
+                 *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._color = Qt3DRender.QParameter('color', color, self)
+        self._size = Qt3DRender.QParameter('pointSize', float(size), self)
+        self._attenuation = Qt3DRender.QParameter('attenuation', float(attenuation), self)
+        self._maxSize = Qt3DRender.QParameter('maxPointSize', float(maxSize), self)
+        for parameter in [self._color, self._size, self._attenuation, self._maxSize]:
+            self.addParameter(parameter)
+
+        defines = [name for name, enabled in [('VERTEX_SIZES', vertexSizes), ('VERTEX_COLORS', vertexColors)]
+                   if enabled]
+
+        # gl_PointSize is only used with a programmable QPointSize
+        pointSize = Qt3DRender.QPointSize(self)
+        pointSize.setSizeMode(Qt3DRender.QPointSize.Programmable)
+
+        self.setEffect(_createEffect(_withDefines(_POINT_VERTEX_SHADER, *defines), _POINT_FRAGMENT_SHADER, self,
+                                     [pointSize] + _alphaBlendStates(self)))
+
+    def setColor(self, color: QColor):
+        self._color.setValue(color)
+
+    def setSize(self, size: float):
+        self._size.setValue(float(size))
+
+    def setAttenuation(self, distance: float):
+        self._attenuation.setValue(float(distance))
+
+
+class LabelMaterial(Qt3DRender.QMaterial):
+    """Screen aligned text of a glyph atlas texture, see `orbit_viewer.annotations`.
+
+    Glyphs keep their pixel size at any distance.
+    """
+
+    def __init__(self, atlas: Qt3DRender.QAbstractTexture, color: QColor = QColor.fromRgb(20, 20, 20),
+                 *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._atlas = Qt3DRender.QParameter('atlas', atlas, self)
+        self._color = Qt3DRender.QParameter('color', color, self)
+        self.addParameter(self._atlas)
+        self.addParameter(self._color)
+
+        self.setEffect(_createEffect(_LABEL_VERTEX_SHADER, _LABEL_FRAGMENT_SHADER, self, _alphaBlendStates(self)))
+
+    def setColor(self, color: QColor):
+        self._color.setValue(color)
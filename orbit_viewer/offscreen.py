@@ -0,0 +1,183 @@
+"""Headless rendering of orbit plots to image files.
+
+One `OffscreenRenderer` builds the scene once and then only swaps the
+trajectory buffer between frames, so that in a batch the cost per image is
+the rendering itself and not the scene setup.
+
+Rendering goes through the ``offscreen`` Qt platform plugin and software
+OpenGL (Mesa llvmpipe); no display or GPU is needed.  Call
+`setupHeadlessEnvironment()` (or `application()`) before any Qt
+application object is created.
+"""
+
+import os
+import time
+
+from typing import Iterable, Tuple
+
+from PySide2.Qt3DExtras import Qt3DExtras
+from PySide2.Qt3DCore import Qt3DCore
+from PySide2.Qt3DRender import Qt3DRender
+
+from PySide2.QtGui import (
+    QGuiApplication,
+    QOffscreenSurface,
+    QVector3D,
+    QColor,
+    QImage,
+)
+
+from PySide2.QtCore import (
+    QCoreApplication,
+    QObject,
+    QEventLoop,
+    QTimer,
+    QSize,
+    Qt,
+)
+
+from .framegraph import DepthFrameGraph
+from .projection import DepthMode
+from .scene import OrbitScene
+from .trajectory import Trajectory
+
+
+# camera position and up vector looking at the origin, in Earth radii
+CAMERA_PRESETS = {
+    'xy': ((0, 0, 60), (0, 1, 0)),
+    'xz': ((0, -60, 0), (0, 0, 1)),
+    'yz': ((60, 0, 0), (0, 0, 1)),
+    'oblique': ((40, -40, 30), (0, 0, 1)),
+}
+
+
+def setupHeadlessEnvironment():
+    """Select the offscreen platform and software OpenGL unless the user chose otherwise."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    os.environ.setdefault('LIBGL_ALWAYS_SOFTWARE', '1')
+    QCoreApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
+
+
+def application():
+    """The running QGuiApplication, created headless if there is none yet."""
+    app = QGuiApplication.instance()
+    if app is None:
+        setupHeadlessEnvironment()
+        app = QGuiApplication([])
+    return app
+
+
+def _renderTarget(size: QSize, parent=None):
+    target = Qt3DRender.QRenderTarget(parent)
+
+    for attachment, format in [(Qt3DRender.QRenderTargetOutput.Color0, Qt3DRender.QAbstractTexture.RGBA8_UNorm),
+                               (Qt3DRender.QRenderTargetOutput.Depth, Qt3DRender.QAbstractTexture.D24)]:
+        output = Qt3DRender.QRenderTargetOutput(target)
+        output.setAttachmentPoint(attachment)
+
+        texture = Qt3DRender.QTexture2D(output)
+        texture.setSize(size.width(), size.height())
+        texture.setFormat(format)
+        texture.setMinificationFilter(Qt3DRender.QAbstractTexture.Linear)
+        texture.setMagnificationFilter(Qt3DRender.QAbstractTexture.Linear)
+
+        output.setTexture(texture)
+        target.addOutput(output)
+
+    return target
+
+
+class OffscreenRenderer(QObject):
+    """Render the `OrbitScene` into images without a visible window.
+
+    A `Qt3DWindow` still drives the aspect engine, but it lives on the
+    offscreen platform and the frame graph renders into a texture of the
+    requested size through a `QOffscreenSurface`.
+    """
+
+    def __init__(self, size: QSize = QSize(1024, 768),
+                 depthMode: DepthMode = DepthMode.ReverseZ,
+                 clearColor: QColor = QColor('white'),
+                 timeout: int = 10000,
+                 *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._size = size
+        self._timeout = timeout
+
+        self.view = Qt3DExtras.Qt3DWindow()
+        self.view.resize(size)
+
+        self.surface = QOffscreenSurface()
+        self.surface.setFormat(self.view.format())
+        self.surface.create()
+
+        self.root = Qt3DCore.QEntity()
+        self.scene = OrbitScene(self.root)
+
+        camera = self.view.camera()
+        camera.lens().setPerspectiveProjection(45.0, size.width() / size.height(), 0.1, 1000.0)
+        self.setCameraPreset('oblique')
+
+        self.light = Qt3DCore.QEntity(camera)
+        pointLight = Qt3DRender.QPointLight(self.light)
+        pointLight.setColor('white')
+        pointLight.setIntensity(1)
+        self.light.addComponent(pointLight)
+
+        self.frameGraph = DepthFrameGraph(self.surface, camera, depthMode, clearColor,
+                                          _renderTarget(size))
+        self.frameGraph.setExternalRenderTargetSize(size)
+        self._capture = Qt3DRender.QRenderCapture(self.frameGraph.leaf())
+
+        self.view.setActiveFrameGraph(self.frameGraph)
+        self.view.setRootEntity(self.root)
+        # on the offscreen platform this only starts the aspect engine
+        self.view.show()
+
+    def setCamera(self, position: QVector3D, viewCenter: QVector3D, upVector: QVector3D = QVector3D(0, 0, 1)):
+        camera = self.view.camera()
+        camera.setPosition(position)
+        camera.setUpVector(upVector)
+        camera.setViewCenter(viewCenter)
+
+    def setCameraPreset(self, name: str):
+        """Use one of `CAMERA_PRESETS`."""
+        try:
+            position, up = CAMERA_PRESETS[name]
+        except KeyError:
+            raise ValueError('unknown camera preset {!r}, expected one of {}'.format(
+                name, ', '.join(sorted(CAMERA_PRESETS))))
+        self.setCamera(QVector3D(*position), QVector3D(0, 0, 0), QVector3D(*up))
+
+    def renderImage(self) -> QImage:
+        """Render one frame of the current scene and return it."""
+        self.scene.sync()
+        reply = self._capture.requestCapture()
+
+        loop = QEventLoop()
+        reply.completed.connect(loop.quit)
+        QTimer.singleShot(self._timeout, loop.quit)
+        loop.exec_()
+
+        if not reply.isComplete():
+            reply.deleteLater()
+            raise RuntimeError('offscreen render did not complete within {} ms'.format(self._timeout))
+
+        image = reply.image()
+        reply.deleteLater()
+        return image
+
+    def render(self, trajectory: Trajectory, path: str):
+        """Show `trajectory` and save the frame to `path` (format from suffix)."""
+        self.scene.setTrajectory(trajectory)
+        image = self.renderImage()
+        if not image.save(path):
+            raise IOError('could not write image {}'.format(path))
+
+    def renderBatch(self, jobs: Iterable[Tuple[Trajectory, str]]):
+        """Render (trajectory, path) jobs one after the other, yield (path, seconds) for each."""
+        for trajectory, path in jobs:
+            start = time.perf_counter()
+            self.render(trajectory, path)
+            yield path, time.perf_counter() - start
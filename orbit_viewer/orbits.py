@@ -0,0 +1,37 @@
+"""Access to spacecraft orbits.
+
+Orbits come from SSCWeb through `spwc`, which is imported on first use
+only, and are returned as `Trajectory` in Earth radii.
+"""
+
+import numpy as np
+
+from . import profiling
+from .trajectory import Trajectory
+
+EARTH_RADIUS_KM = 6371.2
+
+
+def _to_datetime64(time):
+    time = np.asarray(time)
+    if np.issubdtype(time.dtype, np.datetime64):
+        return time.astype('datetime64[ns]')
+    # spwc variables carry POSIX timestamps in seconds
+    return (time.astype(np.float64) * 1e9).astype('datetime64[ns]')
+
+
+def get_orbit(spacecraft: str, start, stop, coordinate_system: str = 'gse'):
+    """Fetch the orbit of `spacecraft` between `start` and `stop` from SSCWeb."""
+    from spwc import sscweb
+
+    with profiling.span('load'):
+        sv = sscweb.SscWeb().get_orbit(product=spacecraft,
+                                       start_time=str(start),
+                                       stop_time=str(stop),
+                                       coordinate_system=coordinate_system)
+    if sv is None:
+        raise LookupError('no orbit for {} between {} and {}'.format(spacecraft, start, stop))
+
+    with profiling.span('transform'):
+        positions = np.asarray(sv.data[:, 0:3], dtype=np.float64) / EARTH_RADIUS_KM
+        return Trajectory(_to_datetime64(sv.time), positions)
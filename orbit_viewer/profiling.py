@@ -0,0 +1,136 @@
+"""Pipeline instrumentation: named timing spans and counters.
+
+The stages of the pipeline are wrapped in spans::
+
+    with profiling.span('select'):
+        mask = ...
+
+and uploaded bytes or created entities are counted with `count()`.  The
+spans used by the package are ``load``, ``transform``, ``decimate``,
+``select``, ``pick``, ``drag``, ``slice``, ``labels``, ``ticks``,
+``sync``, ``buffers.model``, ``buffers.indices`` and ``upload``, the
+counters ``uploaded_bytes``, ``entities`` and ``merged_updates``.
+
+Profiling is off by default.  Disabled, `span()` returns one shared no-op
+context manager and `count()` returns after testing a flag, so the
+instrumentation stays in place in the hot paths.  Enable it with
+`enable()`, the ``ORBIT_VIEWER_PROFILE`` environment variable,
+``orbit_viewer --profile ...`` or F3 in the viewer.
+"""
+
+import functools
+import os
+import time
+
+from collections import namedtuple
+
+SpanStats = namedtuple('SpanStats', ['calls', 'total', 'last', 'max'])
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """Accumulates span timings (seconds) and counters while enabled."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.spans = {}  # name: [calls, total, last, max]
+        self.counters = {}
+
+    def span(self, name: str):
+        """Context manager timing the enclosed code as `name`."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, seconds: float):
+        stats = self.spans.get(name)
+        if stats is None:
+            self.spans[name] = [1, seconds, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = seconds
+            stats[3] = max(stats[3], seconds)
+
+    def count(self, name: str, value: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def stats(self, name: str) -> SpanStats:
+        return SpanStats(*self.spans.get(name, (0, 0.0, 0.0, 0.0)))
+
+    def reset(self):
+        self.spans.clear()
+        self.counters.clear()
+
+    def report(self) -> str:
+        """Table of all spans and counters, for logs."""
+        lines = ['{:<20} {:>7} {:>11} {:>11} {:>11}'.format('span', 'calls', 'total ms', 'last ms', 'max ms')]
+        for name, (calls, total, last, longest) in sorted(self.spans.items()):
+            lines.append('{:<20} {:>7} {:>11.3f} {:>11.3f} {:>11.3f}'.format(
+                name, calls, total * 1e3, last * 1e3, longest * 1e3))
+        for name, value in sorted(self.counters.items()):
+            lines.append('{:<20} {:>7}'.format(name, value))
+        return '\n'.join(lines)
+
+    def summary(self) -> str:
+        """One line with the last time of each span and the counters, for the viewer overlay."""
+        parts = ['{} {:.1f} ms'.format(name, stats[2] * 1e3) for name, stats in sorted(self.spans.items())]
+        parts += ['{} {}'.format(name, value) for name, value in sorted(self.counters.items())]
+        return ' | '.join(parts)
+
+
+#: the profiler the package reports to
+profiler = Profiler(enabled=bool(os.environ.get('ORBIT_VIEWER_PROFILE')))
+
+span = profiler.span
+count = profiler.count
+
+
+def enable(enabled: bool = True):
+    profiler.enabled = enabled
+
+
+def disable():
+    profiler.enabled = False
+
+
+def profiled(name: str):
+    """Decorator running each call of a function in `span(name)`."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            with _Span(profiler, name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
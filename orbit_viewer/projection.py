@@ -0,0 +1,68 @@
+"""Projection matrices and depth-range helpers.
+
+Kept free of any Qt import so that the math can be used (and tested) without
+a rendering backend.  Matrices are returned row-major as 4x4 numpy arrays,
+ready to be handed to ``QMatrix4x4(*m.flatten())``.
+"""
+
+import enum
+
+import numpy as np
+
+
+class DepthMode(enum.Enum):
+    """How the depth buffer is laid out over the near/far range."""
+
+    #: classic OpenGL perspective, depth test `Less`
+    Standard = 'standard'
+    #: reversed, infinite far plane, depth test `Greater`, depth cleared to 0
+    ReverseZ = 'reverse-z'
+    #: logarithmic depth written by the fragment shader of our materials
+    Logarithmic = 'logarithmic'
+
+
+def perspective_projection(fov: float, aspect: float, near: float, far: float):
+    """Standard OpenGL perspective projection (fov in degrees)."""
+    assert near > 0.0
+    assert far > near
+
+    f = 1.0 / np.tan(np.radians(fov) / 2.0)
+
+    m = np.zeros((4, 4), dtype=np.float64)
+    m[0, 0] = f / aspect
+    m[1, 1] = f
+    m[2, 2] = (far + near) / (near - far)
+    m[2, 3] = 2.0 * far * near / (near - far)
+    m[3, 2] = -1.0
+    return m
+
+
+def reverse_z_projection(fov: float, aspect: float, near: float):
+    """Reversed-depth perspective projection with an infinite far plane.
+
+    The near plane maps to NDC z = +1 and infinity to NDC z = -1, so the
+    depth test has to be `Greater` and the depth buffer cleared to 0.
+    Nothing is ever clipped at the far end which is what we want when
+    showing Earth and the bow shock (or the Moon) in the same view.
+    """
+    assert near > 0.0
+
+    f = 1.0 / np.tan(np.radians(fov) / 2.0)
+
+    m = np.zeros((4, 4), dtype=np.float64)
+    m[0, 0] = f / aspect
+    m[1, 1] = f
+    m[2, 2] = 1.0
+    m[2, 3] = 2.0 * near
+    m[3, 2] = -1.0
+    return m
+
+
+def log_depth_coefficient(far: float):
+    """Coefficient for the logarithmic depth written by our shaders.
+
+    Fragment shaders write ``gl_FragDepth = log2(1 + w) * 0.5 * coefficient``
+    which maps the range [0, far] of the eye-space distance onto [0, 1].
+    """
+    assert far > 0.0
+    return 2.0 / np.log2(far + 1.0)
@@ -0,0 +1,752 @@
+"""Qt3D scene graph of the orbit viewer.
+
+Geometries for boundary models and trajectories and the `OrbitScene`
+entity which puts Earth, models and the trajectory together.  The same
+scene is used by the interactive viewer and by the offscreen renderer.
+
+The samples of the main trajectory inside the selection shapes are
+highlighted by its `TrajectoryMaterial`, from a per-vertex selection byte
+in a buffer of its own: a changed selection uploads the bytes of the
+changed samples only, the trajectory stays a single entity and draw call
+however many intervals are selected.
+
+Slice planes (`OrbitScene.addSlice`) show where they cut the models and
+where the trajectories cross them, cut again whenever a plane is moved.
+
+Changes of shapes and slices are recorded in the scene's
+`orbit_viewer.scenemodel.SceneModel` and applied once per frame by
+`OrbitScene.sync()`: dragging a shape over several mouse events of a frame
+places it, selects and uploads the selection once.  Replaced buffers and
+the vertex counts of their attributes and renderers are set in the same
+`sync()`, a frame never draws more vertices than a buffer holds.
+"""
+
+from typing import Callable, Hashable
+
+import numpy as np
+
+from PySide2.Qt3DExtras import Qt3DExtras
+from PySide2.Qt3DCore import Qt3DCore
+from PySide2.Qt3DLogic import Qt3DLogic
+from PySide2.Qt3DRender import Qt3DRender
+
+from PySide2.QtGui import (
+    QColor,
+    QQuaternion,
+    QVector3D,
+)
+
+from PySide2.QtCore import (
+    QSize,
+    QTimer,
+    Signal,
+)
+
+from . import geometry, profiling
+from .materials import (
+    POINT_SIZE_ATTRIBUTE, SELECTION_ATTRIBUTE, SWEEP_MEMBER_ATTRIBUTE, ColorMaterial, PointSpriteMaterial,
+    SweepMaterial, TrajectoryMaterial,
+)
+from .picking import TrajectoryIndex
+from .scenemodel import SceneModel
+from .selection import LiveSelection, interval_mask
+from .shapes import Shape, Sphere, Cuboid
+from .slicing import MeshSlicer, TrajectorySlicer
+from .surfaces import SharedSurface, SurfaceBuilder
+from .textures import TextureCache
+from .trajectory import Trajectory
+
+
+def _vertexAttribute(parent, name: str, size: int, buffer, stride: int, offset: int, count: int,
+                     baseType=Qt3DRender.QAttribute.Float):
+    attribute = Qt3DRender.QAttribute(parent)
+    attribute.setName(name)
+    attribute.setVertexBaseType(baseType)
+    attribute.setVertexSize(size)
+    attribute.setAttributeType(Qt3DRender.QAttribute.VertexAttribute)
+    attribute.setBuffer(buffer)
+    attribute.setByteStride(stride)
+    attribute.setByteOffset(offset)
+    attribute.setCount(count)
+    return attribute
+
+
+def _upload(buffer, array: np.ndarray, offset: int = None):
+    """Replace the data of `buffer`, or update it from byte `offset` on."""
+    # measures the copy into the QBuffer, the GPU upload is done by the render thread
+    with profiling.span('upload'):
+        data = array.tobytes()
+        if offset is None:
+            buffer.setData(data)
+        else:
+            buffer.updateData(offset, data)
+    profiling.count('uploaded_bytes', len(data))
+
+
+class _Immediate:
+    """Applies the changes of geometries used without a `SceneModel` right away, with its interface."""
+
+    @staticmethod
+    def upload(buffer, array: np.ndarray, offset: int = None):
+        _upload(buffer, array, offset)
+
+    @staticmethod
+    def setProperty(target, setter: str, *args):
+        getattr(target, setter)(*args)
+
+
+_IMMEDIATE = _Immediate()
+
+
+def _indexAttribute(parent, buffer, indices: np.ndarray):
+    attribute = Qt3DRender.QAttribute(parent)
+    attribute.setAttributeType(Qt3DRender.QAttribute.IndexAttribute)
+    if indices.dtype == np.uint16:
+        attribute.setVertexBaseType(Qt3DRender.QAttribute.UnsignedShort)
+    else:
+        attribute.setVertexBaseType(Qt3DRender.QAttribute.UnsignedInt)
+    attribute.setBuffer(buffer)
+    attribute.setCount(len(indices))
+    return attribute
+
+
+class GridGeometry(Qt3DRender.QGeometry):
+    """Interleaved grid vertices (see `orbit_viewer.geometry`) plus triangle indices.
+
+    `positions` and `triangles` keep the mesh for `orbit_viewer.slicing`.
+    """
+
+    def __init__(self, vertices: np.ndarray, resolution: QSize, *args, indices: np.ndarray = None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.vertexBuffer = Qt3DRender.QBuffer(self)
+        self.indexBuffer = Qt3DRender.QBuffer(self)
+
+        nVerts = resolution.width() * resolution.height()
+        if indices is None:
+            indices = geometry.grid_index_data(resolution.width(), resolution.height())
+
+        self.addAttribute(_vertexAttribute(self, Qt3DRender.QAttribute.defaultPositionAttributeName(), 3,
+                                           self.vertexBuffer, geometry.STRIDE, geometry.POSITION_OFFSET,
+                                           nVerts))
+        self.addAttribute(_vertexAttribute(self, Qt3DRender.QAttribute.defaultTextureCoordinateAttributeName(),
+                                           2, self.vertexBuffer, geometry.STRIDE, geometry.TEXCOORD_OFFSET,
+                                           nVerts))
+        self.addAttribute(_vertexAttribute(self, Qt3DRender.QAttribute.defaultNormalAttributeName(), 3,
+                                           self.vertexBuffer, geometry.STRIDE, geometry.NORMAL_OFFSET,
+                                           nVerts))
+        self.addAttribute(_vertexAttribute(self, Qt3DRender.QAttribute.defaultTangentAttributeName(), 4,
+                                           self.vertexBuffer, geometry.STRIDE, geometry.TANGENT_OFFSET,
+                                           nVerts))
+        self.addAttribute(_indexAttribute(self, self.indexBuffer, indices))
+
+        _upload(self.vertexBuffer, vertices)
+        _upload(self.indexBuffer, indices)
+
+        self.positions = np.ascontiguousarray(vertices[:, 0:3])
+        self.triangles = indices.reshape(-1, 3)
+
+
+class ModelGeometry(GridGeometry):
+    def __init__(self, theta: float, phi: float, model: Callable, resolution: QSize, *args, **kwargs):
+        vertices = geometry.model_vertex_data(theta, phi, model, resolution.width(), resolution.height())
+        super().__init__(vertices, resolution, *args, **kwargs)
+
+
+class PlaneGeometry(GridGeometry):
+    def __init__(self, w: float, h: float, resolution: QSize, mirrored: bool = False, *args, **kwargs):
+        vertices = geometry.plane_vertex_data(w, h, resolution.width(), resolution.height(), mirrored)
+        super().__init__(vertices, resolution, *args, **kwargs)
+
+
+class ModelRenderer(Qt3DRender.QGeometryRenderer):
+    def __init__(self, theta: float, phi: float, model: Callable, resolution: QSize,
+                 lines=False,
+                 *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if lines:
+            self.setPrimitiveType(Qt3DRender.QGeometryRenderer.LineStrip)
+        self.modelGeometry = ModelGeometry(theta, phi, model, resolution, self)
+        self.setGeometry(self.modelGeometry)
+
+
+class SweepGeometry(GridGeometry):
+    """The surfaces of a model for each of `parameters`, with their index as per-vertex attribute.
+
+    See `geometry.sweep_vertex_data()` for the model.
+    """
+
+    def __init__(self, theta: float, phi: float, model: Callable, resolution: QSize, parameters,
+                 *args, **kwargs):
+        width, height = resolution.width(), resolution.height()
+        self.parameters = np.asarray(parameters, dtype=np.float64).ravel()
+        members = len(self.parameters)
+
+        vertices = geometry.sweep_vertex_data(theta, phi, model, width, height, self.parameters)
+        super().__init__(vertices, QSize(width, height * members), *args,
+                         indices=geometry.sweep_index_data(width, height, members), **kwargs)
+
+        self.memberBuffer = Qt3DRender.QBuffer(self)
+        self.addAttribute(_vertexAttribute(self, SWEEP_MEMBER_ATTRIBUTE, 1, self.memberBuffer, 4, 0,
+                                           len(vertices)))
+        _upload(self.memberBuffer, geometry.sweep_members(width, height, members))
+
+
+class SweepRenderer(Qt3DRender.QGeometryRenderer):
+    """All surfaces of a parameter sweep in one geometry and one draw call."""
+
+    def __init__(self, theta: float, phi: float, model: Callable, resolution: QSize, parameters,
+                 lines=False, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if lines:
+            self.setPrimitiveType(Qt3DRender.QGeometryRenderer.LineStrip)
+        self.modelGeometry = SweepGeometry(theta, phi, model, resolution, parameters, self)
+        self.setGeometry(self.modelGeometry)
+
+
+class SurfaceRenderer(Qt3DRender.QGeometryRenderer):
+    """A model surface built by a `orbit_viewer.surfaces.SurfaceBuilder`.
+
+    The arrays are copied, the shared memory can be released afterwards.
+    """
+
+    def __init__(self, surface: SharedSurface, lines=False, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if lines:
+            self.setPrimitiveType(Qt3DRender.QGeometryRenderer.LineStrip)
+        self.modelGeometry = GridGeometry(surface.vertices, QSize(surface.width, surface.height), self,
+                                          indices=surface.indices.copy())
+        self.setGeometry(self.modelGeometry)
+
+
+class TrajectoryGeometry(Qt3DRender.QGeometry):
+    """Positions of a trajectory as a float32 vertex buffer, selection flags as a byte buffer.
+
+    The buffers are replaced in place by `setPositions()` so that one
+    geometry can show many trajectories one after the other.  The
+    selection byte per vertex (0 or 255, the `SELECTION_ATTRIBUTE` of
+    `TrajectoryMaterial`) is updated by `setSelection()`.
+
+    With a `SceneModel` the buffers and their counts are set together by
+    its next `sync()`, otherwise right away.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.vertexBuffer = Qt3DRender.QBuffer(self)
+        self.positionAttribute = _vertexAttribute(self, Qt3DRender.QAttribute.defaultPositionAttributeName(), 3,
+                                                  self.vertexBuffer, 3 * 4, 0, 0)
+        self.addAttribute(self.positionAttribute)
+
+        self.selectionBuffer = Qt3DRender.QBuffer(self)
+        self.selectionAttribute = _vertexAttribute(self, SELECTION_ATTRIBUTE, 1, self.selectionBuffer, 1, 0, 0,
+                                                   Qt3DRender.QAttribute.UnsignedByte)
+        self.addAttribute(self.selectionAttribute)
+
+    def setPositions(self, positions: np.ndarray, model: SceneModel = _IMMEDIATE):
+        positions = np.ascontiguousarray(positions, dtype=np.single)
+        assert positions.ndim == 2 and positions.shape[1] == 3
+
+        model.upload(self.vertexBuffer, positions)
+        model.setProperty(self.positionAttribute, 'setCount', len(positions))
+
+        model.upload(self.selectionBuffer, np.zeros(len(positions), dtype=np.uint8))
+        model.setProperty(self.selectionAttribute, 'setCount', len(positions))
+
+    def setSelection(self, mask: np.ndarray, changed: slice = slice(None), model: SceneModel = _IMMEDIATE):
+        """Selection flags of the vertices, only the `changed` part of `mask` is uploaded."""
+        start, stop, _ = changed.indices(len(mask))
+        if stop > start:
+            model.upload(self.selectionBuffer, mask[start:stop].view(np.uint8) * np.uint8(255), start)
+
+
+class TrajectoryRenderer(Qt3DRender.QGeometryRenderer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.trajectoryGeometry = TrajectoryGeometry(self)
+        self.setPrimitiveType(Qt3DRender.QGeometryRenderer.LineStrip)
+        self.setGeometry(self.trajectoryGeometry)
+        self.setVertexCount(0)
+
+    def setPositions(self, positions: np.ndarray, model: SceneModel = _IMMEDIATE):
+        self.trajectoryGeometry.setPositions(positions, model)
+        model.setProperty(self, 'setVertexCount', len(positions))
+
+    def setSelection(self, mask: np.ndarray, changed: slice = slice(None), model: SceneModel = _IMMEDIATE):
+        self.trajectoryGeometry.setSelection(mask, changed, model)
+
+
+class SegmentRenderer(TrajectoryRenderer):
+    """Separate line segments, e.g. the cuts of a `orbit_viewer.slicing.MeshSlicer`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.setPrimitiveType(Qt3DRender.QGeometryRenderer.Lines)
+
+    def setSegments(self, segments: np.ndarray, model: SceneModel = _IMMEDIATE):
+        """(k, 2, 3) segment end points."""
+        self.setPositions(np.reshape(segments, (-1, 3)), model)
+
+
+class PointCloudGeometry(Qt3DRender.QGeometry):
+    """Point positions with optional sizes (pixels) and colors per point, for `PointSpriteMaterial`.
+
+    Colors are anything `orbit_viewer.geometry.rgba8` takes and uploaded
+    as normalized RGBA bytes.
+    """
+
+    def __init__(self, positions: np.ndarray, sizes: np.ndarray = None, colors: np.ndarray = None,
+                 *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        positions = np.ascontiguousarray(positions, dtype=np.single)
+        assert positions.ndim == 2 and positions.shape[1] == 3
+        n = len(positions)
+
+        self.vertexBuffer = Qt3DRender.QBuffer(self)
+        self.positionAttribute = _vertexAttribute(self, Qt3DRender.QAttribute.defaultPositionAttributeName(), 3,
+                                                  self.vertexBuffer, 3 * 4, 0, n)
+        self.addAttribute(self.positionAttribute)
+        _upload(self.vertexBuffer, positions)
+
+        self.sizeAttribute = self.colorAttribute = None
+        if sizes is not None:
+            self.sizeBuffer = Qt3DRender.QBuffer(self)
+            self.sizeAttribute = _vertexAttribute(self, POINT_SIZE_ATTRIBUTE, 1, self.sizeBuffer, 4, 0, n)
+            self.addAttribute(self.sizeAttribute)
+            _upload(self.sizeBuffer, np.ascontiguousarray(sizes, dtype=np.single))
+
+        if colors is not None:
+            self.colorBuffer = Qt3DRender.QBuffer(self)
+            self.colorAttribute = _vertexAttribute(self, Qt3DRender.QAttribute.defaultColorAttributeName(), 4,
+                                                   self.colorBuffer, 4, 0, n, Qt3DRender.QAttribute.UnsignedByte)
+            self.addAttribute(self.colorAttribute)
+            _upload(self.colorBuffer, geometry.rgba8(colors))
+
+    def setPositions(self, positions: np.ndarray, sizes: np.ndarray = None, model: SceneModel = _IMMEDIATE):
+        """Replace the points of a cloud without colors per point, with their sizes if it has sizes.
+
+        Through `model` like `TrajectoryGeometry.setPositions()`.
+        """
+        assert self.colorAttribute is None
+        assert (sizes is None) == (self.sizeAttribute is None)
+        positions = np.ascontiguousarray(positions, dtype=np.single)
+        model.upload(self.vertexBuffer, positions)
+        model.setProperty(self.positionAttribute, 'setCount', len(positions))
+        if sizes is not None:
+            model.upload(self.sizeBuffer, np.ascontiguousarray(sizes, dtype=np.single))
+            model.setProperty(self.sizeAttribute, 'setCount', len(positions))
+
+
+class PointCloudRenderer(Qt3DRender.QGeometryRenderer):
+    """All points of a cloud in one draw call."""
+
+    def __init__(self, positions: np.ndarray, sizes: np.ndarray = None, colors: np.ndarray = None,
+                 *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.setPrimitiveType(Qt3DRender.QGeometryRenderer.Points)
+        self.cloudGeometry = PointCloudGeometry(positions, sizes, colors, self)
+        self.setGeometry(self.cloudGeometry)
+        self.setVertexCount(len(positions))
+
+    def setPositions(self, positions: np.ndarray, sizes: np.ndarray = None, model: SceneModel = _IMMEDIATE):
+        self.cloudGeometry.setPositions(positions, sizes, model)
+        model.setProperty(self, 'setVertexCount', len(positions))
+
+
+class OrbitScene(Qt3DCore.QEntity):
+    """Earth, boundary models and one trajectory, all in Earth radii."""
+
+    #: emitted at the end of each `sync()`, once the recorded changes are applied
+    synced = Signal()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.earth = Qt3DCore.QEntity(self)
+        earthMesh = Qt3DExtras.QSphereMesh(self.earth)
+        earthMesh.setRadius(1.0)
+        self.earth.material = ColorMaterial(QColor.fromRgb(40, 90, 200), translucent=False, parent=self.earth)
+        self.earth.addComponent(earthMesh)
+        self.earth.addComponent(self.earth.material)
+        profiling.count('entities')
+
+        # each image file decoded and uploaded once, see setEarthTexture()
+        self.textures = TextureCache(self)
+
+        # entities with components must stay referenced from Python, PySide2
+        # deletes them with their last wrapper otherwise
+        self.models = []
+        self.shapes = []
+        self.pointClouds = []
+        self.slices = []
+
+        # (entity, PendingSurface, lines) of the models still being built
+        self._pendingModels = []
+        self._pendingTimer = QTimer(self)
+        self._pendingTimer.setInterval(15)
+        self._pendingTimer.timeout.connect(self._attachReadyModels)
+
+        self.trajectories = []
+        self.trajectory = self._trajectoryEntity(QColor.fromRgb(200, 0, 0))
+        self.trajectoryRenderer = self.trajectory.renderer
+
+        # selected samples of the main trajectory, `LiveSelection` of the shapes
+        self.selection = None
+
+        # changes of shapes and slices, applied once per frame
+        self.model = SceneModel(_upload)
+        self.model.addLayer('shapes', self._syncShapes)
+        self.model.addLayer('slices', self._syncSlices)
+        # LabelLayer and TickLayer of orbit_viewer.annotations, ticks label themselves
+        self.model.addLayer('ticks', self._syncAnnotations)
+        self.model.addLayer('labels', self._syncAnnotations)
+        self.frameAction = Qt3DLogic.QFrameAction(self)
+        self.frameAction.triggered.connect(self.sync)
+        self.addComponent(self.frameAction)
+
+    def sync(self, *_):
+        """Apply the changes recorded in `model`; called each frame, and before offscreen captures."""
+        self.model.sync()
+        self.synced.emit()
+
+    def _syncAnnotations(self, layers):
+        for layer in layers:
+            layer.update()
+
+    def setEarthTexture(self, path: str):
+        """Show an image (e.g. a day map in equirectangular projection) on the Earth sphere."""
+        self.earth.removeComponent(self.earth.material)
+        self.earth.material = self.textures.material(path)
+        self.earth.addComponent(self.earth.material)
+
+    def _trajectoryEntity(self, color: QColor):
+        entity = Qt3DCore.QEntity(self)
+        entity.data = None
+        entity.index = None
+        entity.renderer = TrajectoryRenderer(entity)
+        entity.material = TrajectoryMaterial(color, parent=entity)
+        entity.addComponent(entity.renderer)
+        entity.addComponent(entity.material)
+        profiling.count('entities')
+        return entity
+
+    def addModel(self, model: Callable, color: QColor,
+                 theta: float = np.pi * 0.75, phi: float = 2 * np.pi,
+                 resolution: QSize = QSize(10, 10), lines: bool = False,
+                 builder: SurfaceBuilder = None):
+        """Show a boundary model, see `geometry.model_vertex_data()`.
+
+        With a `builder` the surface is built in its worker processes and the
+        entity gets its mesh once all tiles are done, from the event loop or
+        from `finishModels()`.
+        """
+        entity = Qt3DCore.QEntity(self)
+        material = ColorMaterial(color, parent=entity)
+        entity.addComponent(material)
+        profiling.count('entities')
+
+        if builder is None:
+            entity.renderer = ModelRenderer(theta, phi, model, resolution, lines, entity)
+            entity.addComponent(entity.renderer)
+        else:
+            entity.renderer = None
+            pending = builder.submit(model, resolution.width(), resolution.height(), theta, phi)
+            self._pendingModels.append((entity, pending, lines))
+            self._pendingTimer.start()
+
+        self.models.append(entity)
+        self._sliceAll()
+        return entity
+
+    def addSweep(self, model: Callable, parameters, color: QColor,
+                 highlightColor: QColor = QColor.fromRgb(255, 190, 0),
+                 theta: float = np.pi * 0.75, phi: float = 2 * np.pi,
+                 resolution: QSize = QSize(50, 50), lines: bool = False):
+        """Show a boundary model for a range of parameters, e.g. solar wind pressures.
+
+        `model(theta, phi, parameter)` is evaluated once for all parameters
+        (see `geometry.sweep_vertex_data()`) and the surfaces form one
+        geometry; `highlightSweep()` picks one of them without evaluating
+        the model again.
+        """
+        entity = Qt3DCore.QEntity(self)
+        entity.renderer = SweepRenderer(theta, phi, model, resolution, parameters, lines, entity)
+        entity.material = SweepMaterial(color, highlightColor, parent=entity)
+        entity.parameters = entity.renderer.modelGeometry.parameters
+        entity.addComponent(entity.renderer)
+        entity.addComponent(entity.material)
+        profiling.count('entities')
+
+        self.models.append(entity)
+        self._sliceAll()
+        return entity
+
+    def highlightSweep(self, entity, member: int, othersAlpha: float = None):
+        """Highlight the surface of `entity.parameters[member]` of an `addSweep()` entity, -1 for none.
+
+        With `othersAlpha` the other surfaces are faded (0 hides them).
+        """
+        entity.material.setHighlighted(member, othersAlpha)
+
+    def finishModels(self, timeout: float = None):
+        """Wait for the models still being built and show them.
+
+        On a timeout (or a failed build) that model is dropped, the ones
+        after it keep being built.
+        """
+        while self._pendingModels:
+            entity, surface, lines = self._pendingModels.pop(0)
+            self._attachModel(entity, surface.result(timeout), lines)
+        self._pendingTimer.stop()
+
+    def _attachReadyModels(self):
+        ready, waiting = [], []
+        for item in self._pendingModels:
+            (ready if item[1].ready() else waiting).append(item)
+        self._pendingModels = waiting
+        if not waiting:
+            self._pendingTimer.stop()
+        for entity, surface, lines in ready:
+            self._attachModel(entity, surface.result(), lines)
+
+    def _attachModel(self, entity, surface: SharedSurface, lines: bool):
+        try:
+            entity.renderer = SurfaceRenderer(surface, lines, entity)
+        finally:
+            surface.release()
+        entity.addComponent(entity.renderer)
+        self._sliceAll()
+
+    def addPoints(self, positions: np.ndarray, color: QColor = QColor.fromRgb(200, 0, 0), size: float = 4.0,
+                  sizes: np.ndarray = None, colors: np.ndarray = None, attenuation: float = 0.0):
+        """Show (n, 3) positions as round points, see `PointSpriteMaterial` for the arguments."""
+        entity = Qt3DCore.QEntity(self)
+        entity.renderer = PointCloudRenderer(positions, sizes, colors, entity)
+        entity.material = PointSpriteMaterial(color, size, attenuation, sizes is not None, colors is not None,
+                                              parent=entity)
+        entity.addComponent(entity.renderer)
+        entity.addComponent(entity.material)
+        profiling.count('entities')
+
+        self.pointClouds.append(entity)
+        return entity
+
+    def setTrajectory(self, trajectory: Trajectory):
+        """Show `trajectory` as the main trajectory, replacing the previous one."""
+        # through the model: selection updates still pending are dropped
+        self.trajectoryRenderer.setPositions(trajectory.positions32, self.model)
+        self.trajectory.data = trajectory
+        self.trajectory.index = None
+
+        self.selection = None
+        for entity in self.shapes:
+            self.model.markDirty('shapes', entity)
+        self._sliceAll()
+
+    def addTrajectory(self, trajectory: Trajectory, color: QColor):
+        """Show an additional trajectory, e.g. of another spacecraft."""
+        entity = self._trajectoryEntity(color)
+        entity.renderer.setPositions(trajectory.positions32, self.model)
+        entity.data = trajectory
+        self.trajectories.append(entity)
+        self._sliceAll()
+        return entity
+
+    def pick(self, origin, direction, tolerance: float):
+        """(trajectory, `orbit_viewer.picking.Pick`) of the trajectory closest to a ray, None if none is in reach.
+
+        The picking index of a trajectory is built on its first pick.
+        """
+        best = None
+        with profiling.span('pick'):
+            for entity in [self.trajectory] + self.trajectories:
+                if entity.data is None:
+                    continue
+                pick = self._index(entity).pick(origin, direction, tolerance)
+                if pick is not None and (best is None or pick.distance < best[1].distance):
+                    best = entity.data, pick
+        return best
+
+    def _index(self, entity) -> TrajectoryIndex:
+        if entity.index is None:
+            entity.index = TrajectoryIndex(entity.data)
+        return entity.index
+
+    def addShape(self, shape: Shape, color: QColor = QColor.fromRgb(20, 20, 200, 80)):
+        """Show a selection shape and highlight the samples of the main trajectory inside it."""
+        entity = Qt3DCore.QEntity(self)
+        entity.shape = shape
+        entity.transform = Qt3DCore.QTransform(entity)
+
+        if isinstance(shape, Sphere):
+            entity.mesh = Qt3DExtras.QSphereMesh(entity)
+            entity.mesh.setRings(32)
+            entity.mesh.setSlices(32)
+        elif isinstance(shape, Cuboid):
+            entity.mesh = Qt3DExtras.QCuboidMesh(entity)
+        else:
+            raise TypeError('cannot display {!r}'.format(shape))
+        self._placeShape(entity)
+
+        material = ColorMaterial(color, parent=entity)
+
+        entity.addComponent(entity.mesh)
+        entity.addComponent(entity.transform)
+        entity.addComponent(material)
+        profiling.count('entities')
+
+        self.shapes.append(entity)
+        self._select(entity)
+        return entity
+
+    def updateShape(self, entity):
+        """Apply a change of `entity.shape` (e.g. a dragged handle) to its mesh and to the selection.
+
+        Done by the next `sync()`, once however often the shape changed.
+        """
+        self.model.markDirty('shapes', entity)
+
+    def _syncShapes(self, entities):
+        for entity in entities:
+            self._placeShape(entity)
+            self._select(entity)
+
+    def _placeShape(self, entity):
+        shape = entity.shape
+        setProperty = self.model.setProperty
+        if isinstance(shape, Sphere):
+            setProperty(entity.mesh, 'setRadius', shape.diameter / 2.0)
+            setProperty(entity.transform, 'setTranslation', QVector3D(*shape.center))
+        else:
+            setProperty(entity.mesh, 'setXExtent', shape.size[0])
+            setProperty(entity.mesh, 'setYExtent', shape.size[1])
+            setProperty(entity.mesh, 'setZExtent', shape.size[2])
+            setProperty(entity.transform, 'setTranslation', QVector3D(*(shape.p0 + shape.size / 2.0)))
+
+    def _select(self, entity):
+        # only the changed shape is tested again, only changed samples are uploaded
+        if self.trajectory.data is None:
+            return
+        if self.selection is None:
+            self.selection = LiveSelection(self._index(self.trajectory))
+        changed = self.selection.set_shape(entity, entity.shape)
+        self.trajectoryRenderer.setSelection(self.selection.mask, changed, self.model)
+
+    def selectIntervals(self, selected, key: Hashable = 'intervals', entity=None):
+        """Highlight the samples of a trajectory within [start, stop] intervals, e.g. of conjunctions.
+
+        On the main trajectory (`entity` None) the intervals join the shapes
+        in `selection`, as `key`; on an `addTrajectory()` entity they are
+        all it highlights.  Replaces the intervals of a previous call.
+        """
+        entity = self.trajectory if entity is None else entity
+        if entity.data is None:
+            return
+        mask = interval_mask(entity.data.times, selected)
+
+        if entity is self.trajectory:
+            if self.selection is None:
+                self.selection = LiveSelection(self._index(self.trajectory))
+            changed = self.selection.set_mask(key, mask)
+            self.trajectoryRenderer.setSelection(self.selection.mask, changed, self.model)
+        else:
+            entity.renderer.setSelection(mask, slice(None), self.model)
+
+    def addSlice(self, normal, offset: float = 0.0, color: QColor = QColor.fromRgb(30, 30, 30),
+                 size: float = 60.0):
+        """Show a plane with its cuts of the models and the crossings of the trajectories.
+
+        The plane holds the points p with p . normal = offset (see
+        `orbit_viewer.slicing`), it is drawn as a translucent size x size
+        square.  `moveSlice()` moves it.
+        """
+        entity = Qt3DCore.QEntity(self)
+        entity.normal = None
+        entity.offset = offset
+        # slicer of the current normal by model or trajectory entity
+        entity.slicers = {}
+
+        entity.plane = Qt3DCore.QEntity(entity)
+        mesh = Qt3DExtras.QPlaneMesh(entity.plane)
+        mesh.setWidth(size)
+        mesh.setHeight(size)
+        entity.transform = Qt3DCore.QTransform(entity.plane)
+        planeColor = QColor(color)
+        planeColor.setAlphaF(0.15)
+        material = ColorMaterial(planeColor, parent=entity.plane)
+        entity.plane.addComponent(mesh)
+        entity.plane.addComponent(entity.transform)
+        entity.plane.addComponent(material)
+
+        entity.cuts = Qt3DCore.QEntity(entity)
+        entity.cuts.renderer = SegmentRenderer(entity.cuts)
+        entity.cuts.material = TrajectoryMaterial(color, parent=entity.cuts)
+        entity.cuts.addComponent(entity.cuts.renderer)
+        entity.cuts.addComponent(entity.cuts.material)
+
+        entity.crossings = Qt3DCore.QEntity(entity)
+        entity.crossings.renderer = PointCloudRenderer(np.empty((0, 3)), parent=entity.crossings)
+        entity.crossings.material = PointSpriteMaterial(color, 8.0, parent=entity.crossings)
+        entity.crossings.addComponent(entity.crossings.renderer)
+        entity.crossings.addComponent(entity.crossings.material)
+        profiling.count('entities', 3)
+
+        self.slices.append(entity)
+        self.moveSlice(entity, normal, offset)
+        return entity
+
+    def moveSlice(self, entity, normal=None, offset: float = None):
+        """Move an `addSlice()` plane and cut again, at the next `sync()`.
+
+        Along its normal only the triangles and samples near the plane are
+        looked at, a new normal sorts them again.
+        """
+        if normal is not None:
+            normal = np.asarray(normal, dtype=np.float64)
+            entity.normal = normal / np.linalg.norm(normal)
+            entity.slicers = {}
+            self.model.setProperty(entity.transform, 'setRotation',
+                                   QQuaternion.rotationTo(QVector3D(0, 1, 0), QVector3D(*entity.normal)))
+        if offset is not None:
+            entity.offset = offset
+        self.model.setProperty(entity.transform, 'setTranslation', QVector3D(*(entity.normal * entity.offset)))
+        self.model.markDirty('slices', entity)
+
+    def _sliceAll(self):
+        for entity in self.slices:
+            self.model.markDirty('slices', entity)
+
+    def _syncSlices(self, entities):
+        for entity in entities:
+            self._slice(entity)
+
+    def _slice(self, entity):
+        segments = [np.empty((0, 2, 3))]
+        for model in self.models:
+            if model.renderer is None:
+                continue  # still being built
+            slicer = entity.slicers.get(model)
+            if slicer is None:
+                mesh = model.renderer.modelGeometry
+                slicer = entity.slicers[model] = MeshSlicer(mesh.positions, mesh.triangles, entity.normal)
+            segments.append(slicer.slice(entity.offset))
+
+        crossings = [np.empty((0, 3))]
+        for trajectory in [self.trajectory] + self.trajectories:
+            if trajectory.data is None:
+                continue
+            slicer = entity.slicers.get(trajectory)
+            if slicer is None or slicer.trajectory is not trajectory.data:
+                slicer = entity.slicers[trajectory] = TrajectorySlicer(trajectory.data, entity.normal)
+            crossings.append(slicer.slice(entity.offset).position)
+
+        entity.cuts.renderer.setSegments(np.concatenate(segments), self.model)
+        entity.crossings.renderer.setPositions(np.concatenate(crossings), model=self.model)
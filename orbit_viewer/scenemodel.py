@@ -0,0 +1,132 @@
+"""Scene changes recorded as they happen and applied once per frame.
+
+A single user action, e.g. dragging a shape handle, changes the shape's
+mesh and transform, the selection highlight, the handles and the slice
+cuts, and mouse or key events come faster than frames.  Instead of
+setting Qt3D node properties and uploading buffers right away, the scene
+records its changes in a `SceneModel`:
+
+- `markDirty(layer, key)`: an object of a layer (a shape of ``'shapes'``,
+  a plane of ``'slices'``) needs to be brought up to date; the layer's
+  sync function gets each dirty key once.
+- `setProperty(target, setter, *args)`: ``getattr(target, setter)(*args)``,
+  only the last value per target and setter is applied.
+- `upload(buffer, array, offset)`: a buffer replaced or updated from a
+  byte offset; a replacement drops the updates before it, later updates
+  are patched into it and updates covered by a later one are dropped.
+
+`sync()`, called once per frame (a `QFrameAction` of `OrbitScene`), runs
+the sync functions of the dirty layers in registration order, then sets
+the properties and uploads the buffers.  A layer's sync function may
+record properties and uploads and mark later layers dirty.
+
+This module does not import Qt: uploads go through the function given to
+the model, property setters are looked up by name.
+"""
+
+from typing import Callable, Hashable
+
+import numpy as np
+
+from . import profiling
+
+
+class _PendingUpload:
+    __slots__ = ('buffer', 'data', 'owned', 'ranges')
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.data = None  # bytes replacing the whole buffer
+        self.owned = False  # whether `data` is a copy, which updates may patch
+        self.ranges = []  # (offset, bytes) updates after `data`
+
+    def add(self, data: np.ndarray, offset: int = None) -> int:
+        """Record an upload, return how many recorded uploads it made redundant."""
+        if offset is None:
+            merged = (self.data is not None) + len(self.ranges)
+            self.data, self.owned, self.ranges = data, False, []
+            return merged
+
+        end = offset + len(data)
+        if self.data is not None and end <= len(self.data):
+            if not self.owned:
+                self.data, self.owned = self.data.copy(), True
+            self.data[offset:end] = data
+            return 1
+
+        kept = [(o, d) for o, d in self.ranges if not (offset <= o and o + len(d) <= end)]
+        merged = len(self.ranges) - len(kept)
+        kept.append((offset, data))
+        self.ranges = kept
+        return merged
+
+
+def _bytes(array) -> np.ndarray:
+    return np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+
+
+class SceneModel:
+    """Dirty flags per layer, pending property sets and buffer uploads, see the module documentation.
+
+    `upload(buffer, array, offset=None)` applies an upload, arrays are
+    uint8; the arrays recorded must not be changed until the next `sync()`.
+    """
+
+    def __init__(self, upload: Callable):
+        self._upload = upload
+        self._layers = {}  # name: sync function, in registration order
+        self._dirty = {}  # name: {key: None}, ordered
+        self._properties = {}  # (id(target), setter): (target, setter, args)
+        self._uploads = {}  # id(buffer): _PendingUpload
+
+    def addLayer(self, name: str, sync: Callable):
+        """Register a layer, `sync(keys)` brings the dirty objects of the layer up to date."""
+        assert name not in self._layers
+        self._layers[name] = sync
+
+    def markDirty(self, layer: str, key: Hashable):
+        keys = self._dirty.setdefault(layer, {})
+        if key in keys:
+            profiling.count('merged_updates')
+        keys[key] = None
+
+    def isDirty(self, layer: str = None) -> bool:
+        """Whether anything, or anything of `layer`, waits for the next `sync()`."""
+        if layer is not None:
+            return bool(self._dirty.get(layer))
+        return bool(self._dirty or self._properties or self._uploads)
+
+    def setProperty(self, target, setter: str, *args):
+        key = id(target), setter
+        if key in self._properties:
+            profiling.count('merged_updates')
+            del self._properties[key]  # applied in the order of the last change
+        self._properties[key] = target, setter, args
+
+    def upload(self, buffer, array: np.ndarray, offset: int = None):
+        """Replace the data of `buffer` with `array`, or update it from byte `offset` on."""
+        pending = self._uploads.get(id(buffer))
+        if pending is None:
+            pending = self._uploads[id(buffer)] = _PendingUpload(buffer)
+        merged = pending.add(_bytes(array), offset)
+        if merged:
+            profiling.count('merged_updates', merged)
+
+    def sync(self):
+        """Bring the dirty layers up to date and apply the recorded properties and uploads."""
+        with profiling.span('sync'):
+            for name, sync in self._layers.items():
+                keys = self._dirty.pop(name, None)
+                if keys:
+                    sync(list(keys))
+
+            properties, self._properties = self._properties, {}
+            for target, setter, args in properties.values():
+                getattr(target, setter)(*args)
+
+            uploads, self._uploads = self._uploads, {}
+            for pending in uploads.values():
+                if pending.data is not None:
+                    self._upload(pending.buffer, pending.data)
+                for offset, data in pending.ranges:
+                    self._upload(pending.buffer, data, offset)
@@ -0,0 +1,95 @@
+"""Selection of a trajectory by a set of shapes which change one at a time.
+
+`LiveSelection` keeps the mask of each shape separately: when one shape
+is moved or resized only that shape is tested again, through the box
+hierarchy of a `orbit_viewer.picking.TrajectoryIndex`, and the union is
+rebuilt from the stored masks where that shape's mask changed.  The
+returned slice of changed samples is all the viewer uploads to the
+per-vertex selection buffer of the trajectory while a shape is dragged::
+
+    selection = LiveSelection(TrajectoryIndex(trajectory))
+    selection.set_shape('a', sphere)
+    sphere.move_handle('center', (12, 0, 0))
+    changed = selection.set_shape('a', sphere)
+    upload(selection.mask[changed])
+
+Masks not made by a shape, e.g. the `interval_mask()` of conjunction
+intervals, join the selection by `set_mask()`.
+"""
+
+from typing import Hashable, Iterable
+
+import numpy as np
+
+from . import profiling
+from .picking import TrajectoryIndex
+from .shapes import Shape, intervals
+from .trajectory import to_nanoseconds
+
+
+def changed_slice(previous: np.ndarray, mask: np.ndarray) -> slice:
+    """Smallest slice outside of which two masks agree, None stands for nothing selected."""
+    if previous is None:
+        difference = mask
+    elif mask is None:
+        difference = previous
+    else:
+        difference = previous != mask
+    if not difference.any():
+        return slice(0, 0)
+    return slice(int(difference.argmax()), len(difference) - int(difference[::-1].argmax()))
+
+
+def interval_mask(times: np.ndarray, selected: Iterable) -> np.ndarray:
+    """Mask of the `times` within any of the [start, stop] `selected` intervals (datetime64 or ns)."""
+    selected = to_nanoseconds(np.asarray(selected)).reshape(-1, 2)
+    starts = np.searchsorted(times, selected[:, 0], 'left')
+    stops = np.searchsorted(times, selected[:, 1], 'right')
+
+    # +1 where an interval begins, -1 after it ends
+    steps = np.zeros(len(times) + 1, dtype=np.int64)
+    np.add.at(steps, starts, 1)
+    np.add.at(steps, stops, -1)
+    return np.cumsum(steps[:-1]) > 0
+
+
+class LiveSelection:
+    """Union of the samples inside any of the shapes, by key."""
+
+    def __init__(self, index: TrajectoryIndex):
+        self.index = index
+        self.trajectory = index.trajectory
+        self.masks = {}
+        self.mask = np.zeros(len(self.trajectory), dtype=bool)
+
+    def set_shape(self, key: Hashable, shape: Shape) -> slice:
+        """Add the shape `key` or re-test it after a change, returns the slice of `mask` which may have changed."""
+        with profiling.span('select'):
+            return self.set_mask(key, self.index.select(shape))
+
+    def set_mask(self, key: Hashable, mask: np.ndarray) -> slice:
+        """Add or replace the samples selected as `key` by a mask, returns the slice of `mask` which may have changed."""
+        changed = changed_slice(self.masks.get(key), mask)
+        self.masks[key] = mask
+        self._combine(changed)
+        return changed
+
+    def remove(self, key: Hashable) -> slice:
+        changed = changed_slice(self.masks.pop(key), None)
+        self._combine(changed)
+        return changed
+
+    def _combine(self, changed: slice):
+        # in place, `mask` stays the same array
+        part = self.mask[changed]
+        masks = list(self.masks.values())
+        if not masks:
+            part[:] = False
+            return
+        part[:] = masks[0][changed]
+        for mask in masks[1:]:
+            part |= mask[changed]
+
+    def intervals(self) -> np.ndarray:
+        """(n, 2) [first, last] int64 ns times of the selected runs."""
+        return intervals(self.trajectory.times, self.mask)
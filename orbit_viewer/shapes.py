@@ -0,0 +1,445 @@
+"""Selection shapes and the orbit intervals they select.
+
+Shapes are tested against (n, 3) position arrays in one vectorized call.
+Their parameters follow the shape widgets of the viewer: a sphere has a
+center and a diameter, a cuboid a corner P0 and its extent along X, Y, Z.
+
+Shapes combine into expressions with ``|`` (union), ``&`` (intersection),
+``-`` (difference) and ``~`` (negation), also with model regions::
+
+    selection = (Sphere(10, 0, 0, 8) - Cuboid(0, -2, -2, 4, 4, 4)) & region('magnetosheath')
+
+`compile()` turns an expression into a `CompiledShape` which evaluates
+it chunk by chunk: a chunk is first classified by its bounding box
+(entirely inside/outside a primitive) and only undecided chunks are tested
+sample by sample.  Intersections and unions test their cheapest operand
+first and the later ones only on the remaining candidates.
+
+The same bounding box decisions, vectorized over many boxes
+(`Shape.classify()`), let `orbit_viewer.picking.TrajectoryIndex` select
+through its box hierarchy, which is fast enough to re-select while a shape
+is dragged by one of its `handles()` in the viewer.
+"""
+
+from typing import List
+
+import numpy as np
+
+from .profiling import profiled
+
+# decision of a node for a whole chunk, from bounding boxes
+_INSIDE, _OUTSIDE, _UNDECIDED = True, False, None
+
+#: smallest diameter or extent (Earth radii) a handle can shrink a shape to
+MIN_SIZE = 0.01
+
+
+class Shape:
+    #: relative cost of testing one sample, used to order operands
+    cost = 1
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        """Boolean mask of the positions inside the shape."""
+        raise NotImplementedError
+
+    def bounds(self):
+        """(lo, hi) corners of an axis-aligned box containing the shape, None if unbounded."""
+        return None
+
+    def _decide(self, lo: np.ndarray, hi: np.ndarray):
+        """Whether the whole box [lo, hi] is inside, outside or undecided."""
+        return _UNDECIDED
+
+    def classify(self, lo: np.ndarray, hi: np.ndarray):
+        """(inside, outside) masks of the (m, 3) boxes [lo, hi] entirely inside or outside the shape."""
+        undecided = np.zeros(len(lo), dtype=bool)
+        return undecided, undecided.copy()
+
+    def handles(self):
+        """Points (name: position) by which the shape is dragged in the viewer."""
+        return {}
+
+    def move_handle(self, name: str, position):
+        """Change the shape in place so that handle `name` is at `position`."""
+        raise KeyError(name)
+
+    def compile(self, chunk_size: int = 65536) -> 'CompiledShape':
+        return CompiledShape(self, chunk_size)
+
+    def __or__(self, other: 'Shape'):
+        return Union(self, other)
+
+    def __and__(self, other: 'Shape'):
+        return Intersection(self, other)
+
+    def __sub__(self, other: 'Shape'):
+        return Intersection(self, Not(other))
+
+    def __invert__(self):
+        return Not(self)
+
+
+class Sphere(Shape):
+    def __init__(self, x: float, y: float, z: float, d: float):
+        self.center = np.array([x, y, z], dtype=np.float64)
+        self.diameter = float(d)
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        delta = positions - self.center
+        return np.einsum('ij,ij->i', delta, delta) <= (self.diameter / 2.0) ** 2
+
+    def bounds(self):
+        r = self.diameter / 2.0
+        return self.center - r, self.center + r
+
+    def _decide(self, lo, hi):
+        r2 = (self.diameter / 2.0) ** 2
+        nearest = np.clip(self.center, lo, hi) - self.center
+        if nearest @ nearest > r2:
+            return _OUTSIDE
+        farthest = np.maximum(np.abs(lo - self.center), np.abs(hi - self.center))
+        if farthest @ farthest <= r2:
+            return _INSIDE
+        return _UNDECIDED
+
+    def classify(self, lo, hi):
+        nearest = np.zeros(len(lo))
+        farthest = np.zeros(len(lo))
+        for axis, c in enumerate(self.center):
+            nearest += np.square(np.clip(c, lo[:, axis], hi[:, axis]) - c)
+            farthest += np.square(np.maximum(np.abs(lo[:, axis] - c), np.abs(hi[:, axis] - c)))
+        r2 = (self.diameter / 2.0) ** 2
+        return farthest <= r2, nearest > r2
+
+    def handles(self):
+        return {'center': self.center.copy(), 'radius': self.center + [self.diameter / 2.0, 0.0, 0.0]}
+
+    def move_handle(self, name, position):
+        position = np.asarray(position, dtype=np.float64)
+        if name == 'center':
+            self.center = position.copy()
+        elif name == 'radius':
+            self.diameter = max(2.0 * float(np.linalg.norm(position - self.center)), MIN_SIZE)
+        else:
+            raise KeyError(name)
+
+    def __repr__(self):
+        return 'Sphere({}, {}, {}, {})'.format(*self.center, self.diameter)
+
+
+class Cuboid(Shape):
+    def __init__(self, x: float, y: float, z: float, w: float, h: float, d: float):
+        self.p0 = np.array([x, y, z], dtype=np.float64)
+        self.size = np.array([w, h, d], dtype=np.float64)
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        # column by column, reductions along the short axis of (n, 3) are slow
+        p1 = self.p0 + self.size
+        inside = positions[:, 0] >= self.p0[0]
+        for axis in range(3):
+            column = positions[:, axis]
+            if axis:
+                inside &= column >= self.p0[axis]
+            inside &= column <= p1[axis]
+        return inside
+
+    def bounds(self):
+        return self.p0, self.p0 + self.size
+
+    def _decide(self, lo, hi):
+        p1 = self.p0 + self.size
+        if np.any(hi < self.p0) or np.any(lo > p1):
+            return _OUTSIDE
+        if np.all(lo >= self.p0) and np.all(hi <= p1):
+            return _INSIDE
+        return _UNDECIDED
+
+    def classify(self, lo, hi):
+        p1 = self.p0 + self.size
+        inside = np.ones(len(lo), dtype=bool)
+        outside = np.zeros(len(lo), dtype=bool)
+        for axis in range(3):
+            inside &= (lo[:, axis] >= self.p0[axis]) & (hi[:, axis] <= p1[axis])
+            outside |= (hi[:, axis] < self.p0[axis]) | (lo[:, axis] > p1[axis])
+        return inside, outside
+
+    def handles(self):
+        return {'center': self.p0 + self.size / 2.0, 'corner': self.p0 + self.size}
+
+    def move_handle(self, name, position):
+        position = np.asarray(position, dtype=np.float64)
+        if name == 'center':
+            self.p0 = position - self.size / 2.0
+        elif name == 'corner':
+            self.size = np.maximum(position - self.p0, MIN_SIZE)
+        else:
+            raise KeyError(name)
+
+    def __repr__(self):
+        return 'Cuboid({}, {}, {}, {}, {}, {})'.format(*self.p0, *self.size)
+
+
+class InsideModel(Shape):
+    """Everything inside a boundary model surface like the magnetopause.
+
+    `model(theta, phi)` returns x, y, z of the boundary (e.g.
+    `space.models.planetary.mp_formisano1979`) with theta the angle to +X
+    and phi the angle around X, from +Y towards +Z.  A position is inside
+    when it is closer to the origin than the boundary in its direction.
+    """
+
+    cost = 20
+
+    def __init__(self, model, name: str = None):
+        self.model = model
+        self.name = name or getattr(model, '__name__', 'model')
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        r = np.linalg.norm(positions, axis=1)
+        theta = np.arccos(np.clip(positions[:, 0] / np.where(r > 0, r, 1.0), -1.0, 1.0))
+        phi = np.mod(np.arctan2(positions[:, 2], positions[:, 1]), 2 * np.pi)
+
+        x, y, z = self.model(theta, phi)
+        return r * r <= np.square(x) + np.square(y) + np.square(z)
+
+    def __repr__(self):
+        return 'InsideModel({})'.format(self.name)
+
+
+class Not(Shape):
+    def __init__(self, shape: Shape):
+        self.shape = shape
+        self.cost = shape.cost
+
+    def contains(self, positions):
+        return ~self.shape.contains(positions)
+
+    def _decide(self, lo, hi):
+        decision = self.shape._decide(lo, hi)
+        return _UNDECIDED if decision is _UNDECIDED else not decision
+
+    def classify(self, lo, hi):
+        inside, outside = self.shape.classify(lo, hi)
+        return outside, inside
+
+    def __invert__(self):
+        return self.shape
+
+    def __repr__(self):
+        return '~{!r}'.format(self.shape)
+
+
+class _Operator(Shape):
+    symbol = None
+
+    def __init__(self, *shapes: Shape):
+        # flatten nested operators of the same kind: a | (b | c) -> (a | b | c)
+        self.shapes = []
+        for shape in shapes:
+            self.shapes.extend(shape.shapes if type(shape) is type(self) else [shape])
+        self.cost = sum(shape.cost for shape in self.shapes)
+
+    def __repr__(self):
+        return '(' + ' {} '.format(self.symbol).join(repr(shape) for shape in self.shapes) + ')'
+
+
+class Union(_Operator):
+    symbol = '|'
+
+    def contains(self, positions):
+        mask = np.zeros(len(positions), dtype=bool)
+        for shape in self.shapes:
+            mask |= shape.contains(positions)
+        return mask
+
+    def bounds(self):
+        boxes = [shape.bounds() for shape in self.shapes]
+        if not boxes or any(box is None for box in boxes):
+            return None
+        return np.min([box[0] for box in boxes], axis=0), np.max([box[1] for box in boxes], axis=0)
+
+    def _decide(self, lo, hi):
+        decisions = [shape._decide(lo, hi) for shape in self.shapes]
+        if _INSIDE in decisions:
+            return _INSIDE
+        if all(decision is _OUTSIDE for decision in decisions):
+            return _OUTSIDE
+        return _UNDECIDED
+
+    def classify(self, lo, hi):
+        inside, outside = self.shapes[0].classify(lo, hi)
+        for shape in self.shapes[1:]:
+            i, o = shape.classify(lo, hi)
+            inside |= i
+            outside &= o
+        return inside, outside
+
+
+class Intersection(_Operator):
+    symbol = '&'
+
+    def contains(self, positions):
+        mask = np.ones(len(positions), dtype=bool)
+        for shape in self.shapes:
+            mask &= shape.contains(positions)
+        return mask
+
+    def bounds(self):
+        boxes = [box for box in (shape.bounds() for shape in self.shapes) if box is not None]
+        if not boxes:
+            return None
+        return np.max([box[0] for box in boxes], axis=0), np.min([box[1] for box in boxes], axis=0)
+
+    def _decide(self, lo, hi):
+        decisions = [shape._decide(lo, hi) for shape in self.shapes]
+        if _OUTSIDE in decisions:
+            return _OUTSIDE
+        if all(decision is _INSIDE for decision in decisions):
+            return _INSIDE
+        return _UNDECIDED
+
+    def classify(self, lo, hi):
+        inside, outside = self.shapes[0].classify(lo, hi)
+        for shape in self.shapes[1:]:
+            i, o = shape.classify(lo, hi)
+            inside &= i
+            outside |= o
+        return inside, outside
+
+
+class CompiledShape:
+    """A shape expression prepared for fast evaluation over long trajectories.
+
+    Per chunk of samples, operands whose result the chunk's bounding box
+    already decides are dropped; the remaining ones are evaluated cheapest
+    first, each only on the samples still undecided when these are a
+    small part of the chunk.
+    """
+
+    def __init__(self, shape: Shape, chunk_size: int = 65536):
+        self.shape = shape
+        self.chunk_size = chunk_size
+
+        box = shape.bounds()
+        self._bounds = None if box is None else (np.asarray(box[0]), np.asarray(box[1]))
+
+    @profiled('select')
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        mask = np.zeros(len(positions), dtype=bool)
+        for begin in range(0, len(positions), self.chunk_size):
+            chunk = positions[begin:begin + self.chunk_size]
+            mask[begin:begin + len(chunk)] = self._contains(self.shape, chunk, *self._box(chunk))
+        return mask
+
+    def _box(self, chunk):
+        # per column: chunk.min(axis=0) is several times slower on (n, 3)
+        columns = [chunk[:, axis] for axis in range(3)]
+        return np.array([c.min() for c in columns]), np.array([c.max() for c in columns])
+
+    def _contains(self, shape: Shape, positions: np.ndarray, lo, hi):
+        decision = shape._decide(lo, hi)
+        if decision is not _UNDECIDED:
+            return np.full(len(positions), decision, dtype=bool)
+
+        if isinstance(shape, Not):
+            return ~self._contains(shape.shape, positions, lo, hi)
+
+        if isinstance(shape, _Operator):
+            union = isinstance(shape, Union)
+            # operands this box decides do not change the result, drop them
+            operands = sorted((s for s in shape.shapes if s._decide(lo, hi) is _UNDECIDED),
+                              key=lambda s: s.cost)
+
+            mask = self._contains(operands[0], positions, lo, hi)
+            for operand in operands[1:]:
+                # still to decide: in a union what is outside so far, in an
+                # intersection what is inside so far
+                candidates = np.flatnonzero(~mask if union else mask)
+                if not len(candidates):
+                    break
+                if len(candidates) > len(positions) // 4:
+                    # gathering most of the chunk costs more than testing all of it
+                    if union:
+                        mask |= self._contains(operand, positions, lo, hi)
+                    else:
+                        mask &= self._contains(operand, positions, lo, hi)
+                    continue
+                sub = positions[candidates]
+                mask[candidates] = self._contains(operand, sub, *self._box(sub))
+            return mask
+
+        return shape.contains(positions)
+
+    def __repr__(self):
+        return 'CompiledShape({!r})'.format(self.shape)
+
+
+REGIONS = ('magnetosphere', 'magnetosheath', 'solar-wind')
+
+
+def region(name: str) -> Shape:
+    """Magnetospheric region from the Formisano 1979 magnetopause and bow shock models.
+
+    One of `REGIONS`.
+    """
+    from space.models.planetary import mp_formisano1979, bs_formisano1979
+
+    magnetopause = InsideModel(mp_formisano1979, 'magnetopause')
+    bow_shock = InsideModel(bs_formisano1979, 'bow-shock')
+
+    regions = {
+        'magnetosphere': magnetopause,
+        'magnetosheath': bow_shock - magnetopause,
+        'solar-wind': ~bow_shock,
+    }
+    try:
+        return regions[name]
+    except KeyError:
+        raise ValueError('unknown region {!r}, expected one of {}'.format(name, ', '.join(sorted(regions))))
+
+
+def region_name(position) -> str:
+    """The region of `REGIONS` containing one position."""
+    position = np.reshape(np.asarray(position, dtype=np.float64), (1, 3))
+    for name in REGIONS:
+        if region(name).contains(position)[0]:
+            return name
+
+
+_SHAPES = {
+    'sphere': (Sphere, 4),
+    'cuboid': (Cuboid, 6),
+}
+
+
+def parse_shape(text: str) -> Shape:
+    """Parse 'sphere:X,Y,Z,D' or 'cuboid:X,Y,Z,W,H,D' (Earth radii)."""
+    name, _, values = text.partition(':')
+    try:
+        cls, count = _SHAPES[name.strip().lower()]
+    except KeyError:
+        raise ValueError('unknown shape {!r}, expected one of {}'.format(name, ', '.join(sorted(_SHAPES))))
+
+    try:
+        args = [float(v) for v in values.split(',')]
+    except ValueError:
+        raise ValueError('invalid parameters in shape {!r}'.format(text))
+    if len(args) != count:
+        raise ValueError('{} needs {} parameters, got {}'.format(name, count, len(args)))
+
+    return cls(*args)
+
+
+def select(positions: np.ndarray, shapes: List[Shape]) -> np.ndarray:
+    """Mask of the positions inside any of the shapes."""
+    if not shapes:
+        return np.zeros(len(positions), dtype=bool)
+    return Union(*shapes).compile().contains(positions)
+
+
+def intervals(times: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Turn a sample mask into (n, 2) [first, last] time pairs of contiguous runs."""
+    padded = np.concatenate([[False], mask, [False]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, stops = edges[0::2], edges[1::2] - 1
+    return np.stack([times[starts], times[stops]], axis=1)
@@ -0,0 +1,165 @@
+"""Cross-sections of boundary models and trajectories with a plane.
+
+A plane is given by its unit normal and its offset along it (the plane
+holds the points p with p . normal = offset), e.g. the XZ GSE plane is
+((0, 1, 0), 0).  `MeshSlicer` cuts the triangles of a model surface into
+line segments, `TrajectorySlicer` finds where an orbit crosses the plane::
+
+    slicer = MeshSlicer(positions, triangles, (0, 1, 0))
+    segments = slicer.slice(0.0)            # (k, 2, 3)
+    crossings = TrajectorySlicer(trajectory, (0, 1, 0)).slice(0.0)
+
+Both sort their primitives (triangles, segments between samples) once by
+their lowest point along the normal.  A primitive is never taller than the
+tallest one, so the primitives which may reach a plane are a contiguous
+run of that order, found by two binary searches: moving the plane along
+its normal costs in proportion to what it cuts, not to the size of the
+mesh.  Only a new normal sorts again.
+"""
+
+from collections import namedtuple
+from typing import Tuple
+
+import numpy as np
+
+from . import profiling
+from .trajectory import Trajectory
+
+#: unit normals of the coordinate planes
+PLANES = {
+    'xy': (0.0, 0.0, 1.0),
+    'xz': (0.0, 1.0, 0.0),
+    'yz': (1.0, 0.0, 0.0),
+}
+
+#: where a trajectory crosses a plane: index of the sample before the
+#: crossing, interpolated time (int64 ns) and position, one per crossing
+Crossings = namedtuple('Crossings', ['index', 'time', 'position'])
+
+
+def parse_plane(text: str) -> Tuple[np.ndarray, float]:
+    """(normal, offset) of 'xz' or 'xz:OFFSET' (Earth radii along the normal)."""
+    name, _, offset = text.partition(':')
+    try:
+        normal = PLANES[name.strip().lower()]
+    except KeyError:
+        raise ValueError('unknown plane {!r}, expected one of {}'.format(name, ', '.join(sorted(PLANES))))
+    try:
+        return np.array(normal), float(offset) if offset else 0.0
+    except ValueError:
+        raise ValueError('invalid plane offset {!r}'.format(offset))
+
+
+def plane_axes(normal) -> Tuple[np.ndarray, np.ndarray]:
+    """Unit vectors (u, v) in a plane: u towards X (Y for planes facing X), v towards Z (Y for planes facing Z).
+
+    The coordinate planes come out as (x, y), (x, z) and (y, z).
+    """
+    normal = _unit(normal)
+    axis = np.array([0.0, 1.0, 0.0]) if abs(normal[0]) > 0.9 else np.array([1.0, 0.0, 0.0])
+    u = _unit(axis - (axis @ normal) * normal)
+    v = np.cross(normal, u)
+    return u, v if v[1 if abs(normal[2]) > 0.9 else 2] >= 0 else -v
+
+
+def plane_coordinates(points, normal) -> np.ndarray:
+    """(n, 2) coordinates of (n, 3) points in the `plane_axes()` of a plane."""
+    u, v = plane_axes(normal)
+    points = np.asarray(points, dtype=np.float64)
+    return np.column_stack([points @ u, points @ v])
+
+
+def _unit(v) -> np.ndarray:
+    v = np.asarray(v, dtype=np.float64)
+    return v / np.linalg.norm(v)
+
+
+class _Extents:
+    """Primitives (rows of vertex indices) by their extent along a normal."""
+
+    def __init__(self, heights: np.ndarray, primitives: np.ndarray):
+        corners = [heights[primitives[:, i]] for i in range(primitives.shape[1])]
+        lo, hi = corners[0].copy(), corners[0].copy()
+        for corner in corners[1:]:
+            np.minimum(lo, corner, out=lo)
+            np.maximum(hi, corner, out=hi)
+
+        self._order = np.argsort(lo, kind='stable')
+        self._lo = lo[self._order]
+        self._hi = hi[self._order]
+        self._reach = float((hi - lo).max()) if len(lo) else 0.0
+
+    def crossing(self, offset: float) -> np.ndarray:
+        """Indices of the primitives with vertices on both sides of the plane at `offset`.
+
+        A vertex in the plane counts as below it.
+        """
+        # lo <= offset < hi, and hi <= lo + reach
+        first = np.searchsorted(self._lo, offset - self._reach, 'right')
+        stop = np.searchsorted(self._lo, offset, 'right')
+        candidates = slice(first, stop)
+        return self._order[candidates][self._hi[candidates] > offset]
+
+
+def _crossing(heights: np.ndarray, a: np.ndarray, b: np.ndarray, offset: float) -> np.ndarray:
+    """Fraction of the way from vertices a to b where the plane at `offset` is crossed."""
+    da = heights[a] - offset
+    return da / (da - (heights[b] - offset))
+
+
+class MeshSlicer:
+    """Cuts of a triangle mesh with planes of one normal.
+
+    `positions` are (n, 3) vertex positions, `triangles` (m, 3) vertex
+    indices, e.g. ``geometry.grid_index_data(width, height).reshape(-1, 3)``.
+    """
+
+    def __init__(self, positions: np.ndarray, triangles: np.ndarray, normal):
+        self.positions = positions
+        self.triangles = triangles
+        self.normal = _unit(normal)
+
+        self._heights = positions @ self.normal
+        self._extents = _Extents(self._heights, triangles)
+
+    def slice(self, offset: float) -> np.ndarray:
+        """(k, 2, 3) float64 line segments where the plane at `offset` cuts the triangles."""
+        with profiling.span('slice'):
+            triangles = self.triangles[self._extents.crossing(offset)]
+            k = np.arange(len(triangles))
+
+            # the vertex alone on its side of the plane and the other two
+            above = self._heights[triangles] > offset
+            single = np.where(above.sum(axis=1) == 1, above.argmax(axis=1), above.argmin(axis=1))
+            lone = triangles[k, single]
+
+            segments = np.empty((len(triangles), 2, 3))
+            for end in range(2):
+                other = triangles[k, (single + 1 + end) % 3]
+                t = _crossing(self._heights, lone, other, offset)[:, np.newaxis]
+                segments[:, end] = self.positions[lone] + t * (self.positions[other] - self.positions[lone])
+            return segments
+
+
+class TrajectorySlicer:
+    """Crossings of a trajectory with planes of one normal."""
+
+    def __init__(self, trajectory: Trajectory, normal):
+        self.trajectory = trajectory
+        self.normal = _unit(normal)
+
+        self._heights = trajectory.positions @ self.normal
+        n = len(trajectory)
+        segments = np.arange(max(n - 1, 0))
+        self._extents = _Extents(self._heights, np.column_stack([segments, segments + 1]))
+
+    def slice(self, offset: float) -> Crossings:
+        with profiling.span('slice'):
+            index = np.sort(self._extents.crossing(offset))
+            t = _crossing(self._heights, index, index + 1, offset)
+
+            positions = self.trajectory.positions
+            position = positions[index] + t[:, np.newaxis] * (positions[index + 1] - positions[index])
+            times = self.trajectory.times
+            time = times[index] + np.rint(t * (times[index + 1] - times[index])).astype(np.int64)
+            return Crossings(index, time, position)
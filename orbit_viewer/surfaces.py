@@ -0,0 +1,185 @@
+"""Boundary model surfaces built in worker processes.
+
+Evaluating a model on a fine (theta, phi) grid takes long enough to freeze
+the viewer (about 0.2 s for 1000 x 1000 vertices, more for expensive
+models).  A `SurfaceBuilder` splits the grid into tiles of consecutive
+vertices and quad rows and builds them on a process pool.  The workers
+write straight into a vertex and an index buffer in
+`multiprocessing.shared_memory`, so no vertex data is pickled: the GUI
+thread only creates the two blocks, passes their names along and uploads
+the filled arrays when all tiles are done::
+
+    with SurfaceBuilder() as builder:
+        pending = builder.submit(mp_formisano1979, 1000, 1000)
+        ...                           # the event loop keeps running
+        if pending.ready():
+            surface = pending.result()
+            upload(surface.vertices, surface.indices)
+            surface.release()
+
+The model must be picklable, e.g. a module level function or a
+`functools.partial` of one with its parameters.  The tiles are the same
+arrays `orbit_viewer.geometry.model_vertex_data` and `grid_index_data`
+return for the whole grid.
+
+This module does not import Qt, see `OrbitScene.addModel(builder=...)`.
+"""
+
+import multiprocessing
+
+from collections import namedtuple
+from multiprocessing import shared_memory
+from typing import Callable
+
+import numpy as np
+
+from . import geometry
+
+TILE_VERTICES = 1 << 17
+
+#: names of the shared memory blocks and the grid of a surface, all a worker needs
+SurfaceHandle = namedtuple('SurfaceHandle', ['vertices', 'indices', 'width', 'height', 'index_dtype'])
+
+
+class SharedSurface:
+    """Vertex and index arrays of a width x height grid surface in shared memory.
+
+    Created by the builder, attached to by name (`attach()`) in the workers.
+    """
+
+    def __init__(self, width: int, height: int, _handle: SurfaceHandle = None):
+        assert width > 1
+        assert height > 1
+
+        self.width = width
+        self.height = height
+        dtype = np.dtype(_handle.index_dtype if _handle else geometry.grid_index_dtype(width, height))
+        shapes = [((width * height, geometry.ELEMENT_SIZE), np.dtype(np.single)),
+                  ((6 * (width - 1) * (height - 1),), dtype)]
+
+        self._blocks = []
+        arrays = []
+        for i, (shape, dt) in enumerate(shapes):
+            if _handle is None:
+                block = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * dt.itemsize)
+            else:
+                block = shared_memory.SharedMemory(_handle[i])
+            self._blocks.append(block)
+            arrays.append(np.ndarray(shape, dt, buffer=block.buf))
+        self.vertices, self.indices = arrays
+
+    @classmethod
+    def attach(cls, handle: SurfaceHandle) -> 'SharedSurface':
+        return cls(handle.width, handle.height, handle)
+
+    @property
+    def handle(self) -> SurfaceHandle:
+        return SurfaceHandle(self._blocks[0].name, self._blocks[1].name, self.width, self.height,
+                             self.indices.dtype.str)
+
+    def close(self):
+        """Detach from the shared memory; the arrays are gone, the blocks stay."""
+        # the blocks cannot be closed while arrays still point into them
+        self.vertices = self.indices = None
+        for block in self._blocks:
+            block.close()
+
+    def release(self):
+        """Close and free the shared memory, once the data is uploaded."""
+        self.close()
+        for block in self._blocks:
+            block.unlink()
+
+
+def _split(count: int, parts: int):
+    """`parts` [begin, end) bounds of consecutive items covering `count`, some may be empty."""
+    bounds = np.linspace(0, count, parts + 1).astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _build_tile(handle: SurfaceHandle, model: Callable, theta: float, phi: float, vertices, rows):
+    surface = SharedSurface.attach(handle)
+    try:
+        begin, end = vertices
+        geometry.model_vertex_rows(surface.vertices[begin:end], theta, phi, model,
+                                   handle.width, handle.height, begin)
+
+        first, stop = rows
+        perRow = 6 * (handle.width - 1)
+        surface.indices[first * perRow:stop * perRow] = geometry.grid_index_rows(
+            handle.width, first, stop, surface.indices.dtype)
+    finally:
+        surface.close()
+
+
+class PendingSurface:
+    """A surface whose tiles are being built."""
+
+    def __init__(self, surface: SharedSurface, results):
+        self.surface = surface
+        self._results = results
+
+    def ready(self) -> bool:
+        return all(result.ready() for result in self._results)
+
+    def result(self, timeout: float = None) -> SharedSurface:
+        """Wait for all tiles and return the surface.
+
+        Raises the error of a failed tile or multiprocessing.TimeoutError
+        after releasing the shared memory: the surface is gone, poll
+        `ready()` to wait without a timeout.
+        """
+        if self.surface is None:
+            raise RuntimeError('the surface was released by a failed result()')
+
+        done = False
+        try:
+            for result in self._results:
+                result.get(timeout)
+            done = True
+        finally:
+            if not done:
+                self.surface.release()
+                self.surface = None
+        return self.surface
+
+
+class SurfaceBuilder:
+    """Process pool building model surfaces tile by tile, see the module documentation.
+
+    The workers are started with the 'spawn' method (no Qt state is
+    inherited), on the first `submit()`.
+    """
+
+    def __init__(self, processes: int = None, tile_vertices: int = TILE_VERTICES):
+        self.processes = processes
+        self.tile_vertices = tile_vertices
+        self._pool = None
+
+    def submit(self, model: Callable, width: int, height: int,
+               theta: float = np.pi * 0.75, phi: float = 2 * np.pi) -> PendingSurface:
+        """Start building the surface of `model` on a width x height grid, see `model_vertex_data()`."""
+        if self._pool is None:
+            self._pool = multiprocessing.get_context('spawn').Pool(self.processes)
+
+        surface = SharedSurface(width, height)
+        handle = surface.handle
+
+        # a task builds a tile of vertices and one of quad rows
+        tiles = max(-(-width * height // self.tile_vertices), 1)
+        results = [self._pool.apply_async(_build_tile, (handle, model, theta, phi, vertices, rows))
+                   for vertices, rows in zip(_split(width * height, tiles), _split(height - 1, tiles))]
+        return PendingSurface(surface, results)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,196 @@
+"""Synthetic spacecraft orbits from Keplerian elements.
+
+For tests, benchmarks and demos without network access or the `space`
+package.  Orbits are unperturbed two-body Kepler orbits around the Earth
+in an Earth-centred inertial frame, positions in Earth radii::
+
+    trajectory = orbit('mms', '2020-01-01', '2020-02-01')
+    fleet = constellation(4, 'mms', '2020-01-01', '2020-01-08', cadence=np.timedelta64(10, 's'))
+
+Kepler's equation is solved by Newton iterations on whole (spacecraft,
+epochs) arrays at once, time chunk by time chunk so that temporaries stay
+bounded: 10^8 samples only cost the memory of the result.  Everything is
+deterministic, `constellation` draws its spread from a seeded generator.
+"""
+
+from collections import namedtuple
+from typing import Dict, Union
+
+import numpy as np
+
+from .orbits import EARTH_RADIUS_KM
+from .trajectory import Trajectory, to_nanoseconds
+
+EARTH_MU = 398600.4418  # km^3 / s^2
+
+#: a: semi-major axis (Earth radii), e: eccentricity, angles in radians:
+#: inclination, right ascension of the ascending node, argument of perigee
+#: and mean anomaly at the epoch
+Elements = namedtuple('Elements', ['a', 'e', 'i', 'raan', 'argp', 'm0'])
+
+
+def _apsides(perigee: float, apogee: float, inclination: float, argp: float = 0.0):
+    """Elements from perigee and apogee radii (Earth radii) and angles in degrees."""
+    return Elements((perigee + apogee) / 2.0, (apogee - perigee) / (apogee + perigee),
+                    np.radians(inclination), 0.0, np.radians(argp), 0.0)
+
+
+PRESETS = {
+    'leo': _apsides(1.0 + 400 / EARTH_RADIUS_KM, 1.0 + 420 / EARTH_RADIUS_KM, 51.6),
+    'geo': _apsides(42164 / EARTH_RADIUS_KM, 42164 / EARTH_RADIUS_KM, 0.0),
+    # Molniya-like highly elliptical orbit
+    'heo': _apsides(1.0 + 600 / EARTH_RADIUS_KM, 1.0 + 39700 / EARTH_RADIUS_KM, 63.4, 270.0),
+    # MMS phase 2: 1.2 x 25 Re
+    'mms': _apsides(1.2, 25.0, 28.0),
+}
+
+
+def elements(preset: str) -> Elements:
+    try:
+        return PRESETS[preset.lower()]
+    except KeyError:
+        raise ValueError('unknown orbit {!r}, expected one of {}'.format(preset, ', '.join(sorted(PRESETS))))
+
+
+def solve_kepler(mean_anomaly, eccentricity, tolerance: float = 1e-12, max_iterations: int = 50) -> np.ndarray:
+    """Eccentric anomaly E in [0, 2 pi) with E - e sin E = M, element-wise.
+
+    `eccentricity` broadcasts against `mean_anomaly`, e.g. (k, 1) for k
+    orbits of (k, n) anomalies.  Newton iterations; for one eccentricity,
+    or one per row, they start from interpolated tables of M(E), which
+    leaves about two iterations even for e = 0.99.
+    """
+    m = np.remainder(mean_anomaly, 2 * np.pi)
+    e = np.asarray(eccentricity, dtype=np.float64)
+
+    if e.size == 1 or (m.ndim == 2 and e.shape == (len(m), 1)):
+        rows = e.reshape(-1, 1)
+        table = np.linspace(0.0, 2 * np.pi, 4097)
+        # the tables of the rows 4 pi apart, increasing as a whole: one interpolation for all
+        shift = 4 * np.pi * np.arange(len(rows))[:, np.newaxis]
+        anomalies = table - rows * np.sin(table) + shift
+        ecc = np.interp(m.reshape(len(rows), -1) + shift, anomalies.ravel(),
+                        np.tile(table, len(rows))).reshape(m.shape)
+    else:
+        ecc = m + 0.85 * e * np.sign(np.sin(m))  # Danby's starter
+
+    for _ in range(max_iterations):
+        step = (ecc - e * np.sin(ecc) - m) / (1.0 - e * np.cos(ecc))
+        ecc -= step
+        if np.max(np.abs(step), initial=0.0) < tolerance:
+            break
+    return ecc
+
+
+def _orientation(el: Elements):
+    """(k, 3) unit vectors P (to perigee) and Q (90 degrees ahead) of k orbits."""
+    cos_o, sin_o = np.cos(el.raan), np.sin(el.raan)
+    cos_w, sin_w = np.cos(el.argp), np.sin(el.argp)
+    cos_i, sin_i = np.cos(el.i), np.sin(el.i)
+
+    p = np.stack([cos_o * cos_w - sin_o * sin_w * cos_i,
+                  sin_o * cos_w + cos_o * sin_w * cos_i,
+                  sin_w * sin_i], axis=-1)
+    q = np.stack([-cos_o * sin_w - sin_o * cos_w * cos_i,
+                  -sin_o * sin_w + cos_o * cos_w * cos_i,
+                  cos_w * sin_i], axis=-1)
+    return p, q
+
+
+def propagate(el: Elements, times, epoch=None, velocities: bool = False, chunk_size: int = 1 << 20):
+    """Positions (Earth radii) of k orbits at n times, as a (k, n, 3) float64 array.
+
+    The fields of `el` are scalars or arrays of k orbits.  `times` are
+    datetime64 or int64 ns, `epoch` (default: the first time) is the time of
+    the mean anomalies `m0`.  With `velocities`, (positions, velocities) is
+    returned, velocities in km/s as (k, n, 3) float32.  The k orbits are
+    computed together, about `chunk_size` samples of all of them at a time.
+    """
+    times = to_nanoseconds(times)
+    if epoch is None:
+        epoch = times[0] if len(times) else 0
+    else:
+        epoch = to_nanoseconds(epoch)
+
+    el = Elements(*(np.atleast_1d(np.asarray(field, dtype=np.float64)) for field in el))
+    count = max(len(field) for field in el)
+    el = Elements(*(np.broadcast_to(field, (count,)) for field in el))
+
+    p, q = _orientation(el)
+    b = el.a * np.sqrt(1.0 - el.e ** 2)
+    motion = np.sqrt(EARTH_MU / (el.a * EARTH_RADIUS_KM) ** 3)  # rad/s
+
+    positions = np.empty((count, len(times), 3))
+    speeds = np.empty((count, len(times), 3), dtype=np.float32) if velocities else None
+
+    # (k, 1) elements and orientations against (n,) times: (k, n) arrays
+    a, e, b, motion = (field[:, np.newaxis] for field in (el.a, el.e, b, motion))
+    m0 = el.m0[:, np.newaxis]
+
+    step = max(chunk_size // max(count, 1), 1)
+    for begin in range(0, len(times), step):
+        chunk = slice(begin, begin + step)
+        seconds = (times[chunk] - epoch).astype(np.float64) * 1e-9
+
+        ecc = solve_kepler(m0 + motion * seconds, e)
+        cos_e, sin_e = np.cos(ecc), np.sin(ecc)
+
+        # in the orbital plane: x towards perigee, y along the velocity at perigee
+        x = a * (cos_e - e)
+        y = b * sin_e
+        for axis in range(3):
+            positions[:, chunk, axis] = x * p[:, axis:axis + 1] + y * q[:, axis:axis + 1]
+
+        if velocities:
+            rate = motion * EARTH_RADIUS_KM / (1.0 - e * cos_e)  # dE/dt, scaled to km
+            vx = -a * sin_e * rate
+            vy = b * cos_e * rate
+            for axis in range(3):
+                speeds[:, chunk, axis] = vx * p[:, axis:axis + 1] + vy * q[:, axis:axis + 1]
+
+    return (positions, speeds) if velocities else positions
+
+
+def sample_times(start, stop, cadence=np.timedelta64(60, 's')) -> np.ndarray:
+    """datetime64[ns] times from start (included) to stop (excluded) every `cadence`."""
+    start = np.datetime64(start, 'ns')
+    return np.arange(start, np.datetime64(stop, 'ns'), np.timedelta64(cadence, 'ns'))
+
+
+def orbit(kind: Union[str, Elements], start, stop, cadence=np.timedelta64(60, 's'),
+          epoch=None, velocities: bool = False) -> Trajectory:
+    """One spacecraft on a preset orbit ('leo', 'geo', 'heo', 'mms') or given `Elements`."""
+    el = elements(kind) if isinstance(kind, str) else kind
+    times = sample_times(start, stop, cadence)
+    result = propagate(el, times, epoch, velocities)
+    if velocities:
+        return Trajectory(times, result[0][0], result[1][0])
+    return Trajectory(times, result[0])
+
+
+def constellation(count: int, kind: Union[str, Elements], start, stop, cadence=np.timedelta64(60, 's'),
+                  seed: int = 0, spread: float = 0.05, velocities: bool = False) -> Dict[str, Trajectory]:
+    """`count` spacecraft on perturbed copies of one orbit, named '<kind>1'...
+
+    Semi-major axis and eccentricity vary by up to `spread` (relative), the
+    angles by up to `spread` radians and the spacecraft are spread along the
+    orbit by up to `spread` of a revolution; the same seed gives the same
+    constellation.
+    """
+    base = elements(kind) if isinstance(kind, str) else kind
+    name = kind if isinstance(kind, str) else 'sc'
+
+    rng = np.random.default_rng(seed)
+    jitter = rng.uniform(-spread, spread, size=(6, count))
+    el = Elements(a=base.a * (1 + jitter[0]),
+                  e=np.clip(base.e * (1 + jitter[1]), 0.0, 0.99),
+                  i=base.i + jitter[2],
+                  raan=base.raan + jitter[3],
+                  argp=base.argp + jitter[4],
+                  m0=base.m0 + 2 * np.pi * jitter[5])
+
+    times = sample_times(start, stop, cadence)
+    result = propagate(el, times, velocities=velocities)
+    positions, speeds = result if velocities else (result, None)
+    return {'{}{}'.format(name, n + 1): Trajectory(times, positions[n], None if speeds is None else speeds[n])
+            for n in range(count)}
@@ -0,0 +1,135 @@
+"""Shared textures of planets and textured planes.
+
+A `TextureCache` hands out one texture per image file however many
+materials use it: the image is decoded, uploaded and its mipmaps are
+generated once.  For views from afar it also keeps a small downsampled
+copy of each image (`fallback()`); `texturedMaterial()` shows that copy
+beyond a camera distance and switches to the full texture, created on
+first use, when the camera comes closer::
+
+    textures = TextureCache(root)
+    for entity in planes:
+        entity.addComponent(textures.material('earthmap2k.jpg'))
+
+Scenes of many distant textured objects thus only hold the small copies.
+"""
+
+import os
+
+from PySide2.Qt3DCore import Qt3DCore
+from PySide2.Qt3DRender import Qt3DRender
+
+from PySide2.QtGui import (
+    QImage,
+)
+
+from PySide2.QtCore import (
+    QSize,
+    QUrl,
+    Qt,
+)
+
+from .materials import TextureMaterial
+
+#: longest side in pixels of the downsampled fallback images
+FALLBACK_SIZE = 256
+
+
+def _mipmapped(texture):
+    texture.setGenerateMipMaps(True)
+    texture.setMinificationFilter(Qt3DRender.QAbstractTexture.LinearMipMapLinear)
+    texture.setMagnificationFilter(Qt3DRender.QAbstractTexture.Linear)
+    return texture
+
+
+class PaintedImage(Qt3DRender.QPaintedTextureImage):
+    """An already decoded QImage as texture image."""
+
+    def __init__(self, image: QImage, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.image = image
+        self.setSize(image.size())
+
+    def paint(self, painter):
+        painter.drawImage(0, 0, self.image)
+
+
+class TextureCache(Qt3DCore.QNode):
+    """Textures and materials by image file, shared by all entities of a scene."""
+
+    def __init__(self, parent, fallbackSize: int = FALLBACK_SIZE):
+        super().__init__(parent)
+
+        self.fallbackSize = fallbackSize
+        # by absolute path, referenced from Python, see OrbitScene
+        self._textures = {}
+        self._fallbacks = {}
+        self._materials = {}
+
+    def texture(self, path: str) -> Qt3DRender.QAbstractTexture:
+        """The full resolution, mipmapped texture of an image file."""
+        path = os.path.abspath(path)
+        texture = self._textures.get(path)
+        if texture is None:
+            texture = _mipmapped(Qt3DRender.QTextureLoader(self))
+            texture.setSource(QUrl.fromLocalFile(path))
+            self._textures[path] = texture
+        return texture
+
+    def fallback(self, path: str) -> Qt3DRender.QAbstractTexture:
+        """A copy of the image downsampled to `fallbackSize`, for far views.
+
+        Raises OSError if the image cannot be read.
+        """
+        path = os.path.abspath(path)
+        texture = self._fallbacks.get(path)
+        if texture is None:
+            image = QImage(path)
+            if image.isNull():
+                raise OSError('cannot read image {}'.format(path))
+            if max(image.width(), image.height()) > self.fallbackSize:
+                image = image.scaled(QSize(self.fallbackSize, self.fallbackSize), Qt.KeepAspectRatio,
+                                     Qt.SmoothTransformation)
+
+            texture = _mipmapped(Qt3DRender.QTexture2D(self))
+            texture.setFormat(Qt3DRender.QAbstractTexture.RGBA8_UNorm)
+            texture.setSize(image.width(), image.height())
+            # flipped like QTextureLoader does by default
+            texture.image = PaintedImage(image.convertToFormat(QImage.Format_RGBA8888).mirrored(), texture)
+            texture.addTextureImage(texture.image)
+            self._fallbacks[path] = texture
+        return texture
+
+    def material(self, path: str) -> TextureMaterial:
+        """One unlit material per image, to be added to any number of entities."""
+        path = os.path.abspath(path)
+        material = self._materials.get(path)
+        if material is None:
+            material = TextureMaterial(parent=self)
+            material.setTexture(self.texture(path))
+            self._materials[path] = material
+        return material
+
+    def texturedMaterial(self, entity, path: str, camera, distance: float) -> TextureMaterial:
+        """Add a material to `entity` which shows the `fallback()` beyond `distance` from `camera`.
+
+        The full texture is only created once the camera first comes that
+        close to one of the entities using it.
+        """
+        material = TextureMaterial(parent=entity)
+        material.setTexture(self.fallback(path))
+
+        lod = Qt3DRender.QLevelOfDetail(entity)
+        lod.setCamera(camera)
+        lod.setThresholdType(Qt3DRender.QLevelOfDetail.DistanceToCameraThreshold)
+        lod.setThresholds([distance])
+
+        def switch(index):
+            material.setTexture(self.texture(path) if index == 0 else self.fallback(path))
+
+        lod.currentIndexChanged.connect(switch)
+        entity.addComponent(lod)
+        entity.addComponent(material)
+        entity.levelOfDetail = lod
+        return material
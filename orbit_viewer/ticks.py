@@ -0,0 +1,128 @@
+"""Time ticks along trajectories.
+
+Ticks are put at whole multiples of a step (1 minute to 10 days) since the
+epoch, day boundaries are major ticks.  The tick times come from integer
+arithmetic on the int64 nanosecond times, their positions from one
+vectorized linear interpolation of the samples; there is no per-sample
+Python code, so a mission of millions of samples is ticked as fast as a
+day of it::
+
+    generator = TickGenerator(trajectory)
+    ticks = generator.ticks(start, stop, pixels)
+    if ticks is not None:     # None: the same ticks as the last call
+        upload(ticks.positions, ticks.major)
+
+The step is chosen from the on-screen length of the visible part of the
+trajectory (`visible_range`), so that ticks stay `spacing` pixels apart
+on average: zooming changes the density, panning within a step does not
+make new ticks.
+"""
+
+from collections import namedtuple
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .trajectory import Trajectory
+
+MINUTE = 60 * 10 ** 9
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+#: tick steps in ns, from fine to coarse
+STEPS = [MINUTE * m for m in (1, 2, 5, 10, 15, 30)] + [HOUR * h for h in (1, 2, 3, 6, 12)] + \
+        [DAY * d for d in (1, 2, 5, 10)]
+
+#: of n ticks: int64 times, (n, 3) float64 positions, mask of the major
+#: ticks and the step between ticks
+Ticks = namedtuple('Ticks', ['times', 'positions', 'major', 'step'])
+
+
+def tick_step(duration: int, count: float) -> int:
+    """The finest of `STEPS` giving at most `count` ticks over `duration` ns, the coarsest if none does."""
+    for step in STEPS:
+        if duration <= count * step:
+            return step
+    return STEPS[-1]
+
+
+def tick_times(start: int, stop: int, step: int, major: int = DAY) -> Tuple[np.ndarray, np.ndarray]:
+    """(times, major mask) of the multiples of `step` in [start, stop], all int64 ns.
+
+    Ticks at multiples of `major` are major ticks.
+    """
+    first = -(-start // step) * step  # ceil
+    times = np.arange(first, stop + 1, step, dtype=np.int64)
+    return times, times % major == 0
+
+
+def interpolate(trajectory: Trajectory, times: np.ndarray) -> np.ndarray:
+    """(n, 3) positions at `times`, linear between samples, within the trajectory's time span."""
+    samples = trajectory.times
+    if len(samples) < 2:
+        return np.repeat(trajectory.positions[:1], len(times), axis=0)
+
+    index = np.clip(np.searchsorted(samples, times, 'right') - 1, 0, len(samples) - 2)
+    t = (times - samples[index]) / (samples[index + 1] - samples[index])
+    positions = trajectory.positions
+    return positions[index] + t[:, np.newaxis] * (positions[index + 1] - positions[index])
+
+
+def visible_range(times: np.ndarray, xy: np.ndarray, front: np.ndarray,
+                  width: int, height: int) -> Optional[Tuple[int, int, float]]:
+    """(start, stop, pixels) of the on-screen samples of a (decimated) trajectory.
+
+    `xy` and `front` are its samples projected by `orbit_viewer.labels.project`,
+    `pixels` is the length of the trajectory between them on screen.  None
+    if no sample is on screen.
+    """
+    shown = front & (xy[:, 0] >= 0) & (xy[:, 0] <= width) & (xy[:, 1] >= 0) & (xy[:, 1] <= height)
+    index = np.flatnonzero(shown)
+    if not len(index):
+        return None
+
+    # the segments between consecutive on-screen samples
+    both = shown[:-1] & shown[1:]
+    pixels = float(np.linalg.norm(np.diff(xy, axis=0)[both], axis=1).sum())
+    return int(times[index[0]]), int(times[index[-1]]), pixels
+
+
+def tick_labels(times: np.ndarray, major: np.ndarray, step: int) -> list:
+    """'HH:MM' of the ticks, 'YYYY-MM-DD' of the major ones and of all for steps of days."""
+    text = np.datetime_as_string(times.view('datetime64[ns]'), unit='m')
+    dates = major | (step >= DAY)
+    return [t[:10] if date else t[11:] for t, date in zip(text.tolist(), dates.tolist())]
+
+
+class TickGenerator:
+    """Ticks of a trajectory, regenerated when the visible range or the density changes.
+
+    `spacing` is the mean distance in pixels between ticks along the
+    trajectory on screen.
+    """
+
+    def __init__(self, trajectory: Trajectory, spacing: float = 60.0, major: int = DAY):
+        self.trajectory = trajectory
+        self.spacing = spacing
+        self.major = major
+        self._key = None
+
+    def ticks(self, start: int, stop: int, pixels: float) -> Optional[Ticks]:
+        """Ticks of the samples in [start, stop] (ns), shown `pixels` long; None if unchanged since the last call."""
+        if len(self.trajectory):
+            start = max(start, int(self.trajectory.times[0]))
+            stop = min(stop, int(self.trajectory.times[-1]))
+        step = tick_step(max(stop - start, 0), max(pixels / self.spacing, 1.0))
+
+        # the same first and last tick at the same step are the same ticks
+        key = -(-start // step), stop // step, step
+        if key == self._key:
+            return None
+        self._key = key
+
+        times, major = tick_times(start, stop, step, self.major)
+        return Ticks(times, interpolate(self.trajectory, times), major, step)
+
+    def reset(self):
+        """Make the next `ticks()` call generate ticks."""
+        self._key = None
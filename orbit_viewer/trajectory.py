@@ -0,0 +1,141 @@
+"""Columnar in-memory trajectory container.
+
+`Trajectory` is the one representation of orbit samples shared by
+loading, selection, level of detail and rendering.  Every column is a
+contiguous typed numpy array, there are no per-sample Python objects:
+
+- ``times``: int64 nanoseconds since 1970-01-01 (sorted)
+- ``positions``: (n, 3) float64, Earth radii
+- ``velocities``: optional (n, 3) float32
+- ``columns``: optional dict of extra per-sample arrays
+
+Slicing (by index or by time) returns views on the same memory.
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+from .lod import decimation_indices
+from .profiling import profiled
+
+
+def to_nanoseconds(time) -> np.ndarray:
+    """int64 nanoseconds of datetime64 values, ISO strings or integers (taken as ns)."""
+    time = np.asarray(time)
+    if time.dtype.kind in 'iu':
+        return time.astype(np.int64, copy=False)
+    return time.astype('datetime64[ns]').view(np.int64)
+
+
+def _describe(array: np.ndarray) -> str:
+    return '{} {}'.format(array.shape, array.dtype)
+
+
+class Trajectory:
+    __slots__ = ('times', 'positions', 'velocities', 'columns', '_positions32')
+
+    def __init__(self, times, positions, velocities=None, columns: Dict[str, np.ndarray] = None):
+        self.times = np.ascontiguousarray(to_nanoseconds(times))
+        self.positions = np.ascontiguousarray(positions, dtype=np.float64)
+        self.velocities = None if velocities is None else np.ascontiguousarray(velocities, dtype=np.float32)
+        self.columns = {name: np.ascontiguousarray(column) for name, column in (columns or {}).items()}
+        self._positions32 = None
+        self._check()
+
+    def _check(self, check_sorted: bool = True):
+        """Raise ValueError unless the columns have the shapes and types above.
+
+        Without `check_sorted` only the array headers are looked at, not the data.
+        """
+        n = len(self.times)
+        if self.times.ndim != 1 or self.times.dtype != np.int64:
+            raise ValueError('times must be one-dimensional int64, got {}'.format(_describe(self.times)))
+        if self.positions.shape != (n, 3) or self.positions.dtype != np.float64:
+            raise ValueError('positions must be ({}, 3) float64, got {}'.format(n, _describe(self.positions)))
+        if self.velocities is not None and (self.velocities.shape != (n, 3) or self.velocities.dtype != np.float32):
+            raise ValueError('velocities must be ({}, 3) float32, got {}'.format(n, _describe(self.velocities)))
+        for name, column in self.columns.items():
+            if len(column) != n:
+                raise ValueError('column {} has {} samples, expected {}'.format(name, len(column), n))
+        if check_sorted and n > 1 and np.any(self.times[1:] < self.times[:-1]):
+            raise ValueError('times must be sorted')
+
+    @classmethod
+    def _wrap(cls, times, positions, velocities, columns, positions32=None):
+        # no validation and no copies, for views of an already valid trajectory
+        trajectory = cls.__new__(cls)
+        trajectory.times = times
+        trajectory.positions = positions
+        trajectory.velocities = velocities
+        trajectory.columns = columns
+        trajectory._positions32 = positions32
+        return trajectory
+
+    def __len__(self):
+        return len(self.times)
+
+    def __repr__(self):
+        if not len(self):
+            return 'Trajectory(empty)'
+        start, stop = np.datetime_as_string(self.datetimes[[0, -1]])
+        return 'Trajectory({} samples, {} - {})'.format(len(self), start, stop)
+
+    def __getitem__(self, index):
+        """Basic slices give views, integer or boolean index arrays give copies."""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 if index != -1 else None)
+
+        return Trajectory._wrap(self.times[index],
+                                self.positions[index],
+                                None if self.velocities is None else self.velocities[index],
+                                {name: column[index] for name, column in self.columns.items()},
+                                None if self._positions32 is None else self._positions32[index])
+
+    @property
+    def datetimes(self) -> np.ndarray:
+        """The times as datetime64[ns], a view."""
+        return self.times.view('datetime64[ns]')
+
+    @property
+    def positions32(self) -> np.ndarray:
+        """Positions as contiguous float32, ready for a vertex buffer.
+
+        Converted once and cached; slices of this trajectory share it.
+        """
+        if self._positions32 is None:
+            self._positions32 = self.positions.astype(np.float32)
+        return self._positions32
+
+    def time_range(self, start=None, stop=None) -> slice:
+        """Index slice of the samples with start <= time < stop."""
+        i0 = 0 if start is None else int(np.searchsorted(self.times, to_nanoseconds(start), 'left'))
+        i1 = len(self) if stop is None else int(np.searchsorted(self.times, to_nanoseconds(stop), 'left'))
+        return slice(i0, max(i0, i1))
+
+    def between(self, start=None, stop=None) -> 'Trajectory':
+        """View of the samples with start <= time < stop."""
+        return self[self.time_range(start, stop)]
+
+    @profiled('decimate')
+    def decimate(self, max_samples: int) -> 'Trajectory':
+        """Copy with at most `max_samples` evenly strided samples, end points kept."""
+        return self[decimation_indices(len(self), max_samples)]
+
+    @classmethod
+    def concatenate(cls, chunks: Sequence['Trajectory']) -> 'Trajectory':
+        """Join chunks (in time order) into one trajectory, column by column."""
+        chunks = [chunk for chunk in chunks if len(chunk)]
+        if not chunks:
+            raise ValueError('nothing to concatenate')
+
+        velocities = None
+        if all(chunk.velocities is not None for chunk in chunks):
+            velocities = np.concatenate([chunk.velocities for chunk in chunks])
+
+        names = set.intersection(*(set(chunk.columns) for chunk in chunks))
+        columns = {name: np.concatenate([chunk.columns[name] for chunk in chunks]) for name in names}
+
+        return cls(np.concatenate([chunk.times for chunk in chunks]),
+                   np.concatenate([chunk.positions for chunk in chunks]),
+                   velocities, columns)
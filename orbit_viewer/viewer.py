@@ -0,0 +1,363 @@
+"""Interactive orbit viewer window.
+
+Hovering a trajectory shows the time, position and region of the point
+under the mouse in a tooltip (see `orbit_viewer.picking`).
+
+Selection shapes are dragged by their handles (see `orbit_viewer.gizmos`)
+and the highlighted selection follows the mouse.  Mesh, handles and
+selection are updated once per frame, in the ``sync`` span (see
+`OrbitScene.sync`), however many drag events came in.  The latency of
+each drag event, from the event to the end of the sync which applied it,
+is kept in `dragLatencies` and logged when the mouse is released; the
+``drag`` profiling span only times the handling of the event itself.
+
+Conjunctions (`showConjunctions`, see `orbit_viewer.conjunctions`) are
+highlighted on the trajectories of both spacecraft and selected on the main
+trajectory together with the shapes.  N and P select the next or previous
+conjunction alone and center the view on it, Escape selects all again.
+
+Page up and down move the last slice plane (`OrbitScene.addSlice`) along
+its normal, its cuts of the models and the trajectory crossings follow.
+
+Text labels (`addLabels`) share one `orbit_viewer.annotations.LabelLayer`,
+decluttered whenever the camera moves.  Time ticks (`addTicks`) along a
+trajectory follow the zoom.
+
+F3 toggles profiling (see `orbit_viewer.profiling`); while it is on, the
+last time of each pipeline stage and the counters are shown in the title
+bar and the full report is logged when it is switched off.
+"""
+
+import logging
+import sys
+import time
+
+from typing import Iterable, Sequence
+
+from PySide2.Qt3DExtras import Qt3DExtras
+from PySide2.Qt3DCore import Qt3DCore
+from PySide2.Qt3DRender import Qt3DRender
+
+from PySide2.QtWidgets import (
+    QApplication,
+    QToolTip,
+)
+
+from PySide2.QtGui import (
+    QVector3D,
+    QColor,
+)
+
+from PySide2.QtCore import (
+    QTimer,
+    Qt,
+)
+
+import numpy as np
+
+from . import profiling
+from .annotations import LabelLayer, TickLayer
+from .framegraph import DepthFrameGraph
+from .gizmos import ShapeGizmo
+from .picking import camera_ray, ray_plane
+from .projection import DepthMode
+from .scene import OrbitScene
+from .shapes import Shape, region_name
+from .ticks import interpolate
+from .trajectory import Trajectory
+
+log = logging.getLogger(__name__)
+
+
+class OrbitWindow(Qt3DExtras.Qt3DWindow):
+    """`OrbitScene` in a window with an orbit camera controller."""
+
+    #: distance in pixels from the mouse within which a trajectory is picked
+    pickRadius = 6
+
+    #: Earth radii a slice plane moves per key press
+    sliceStep = 0.5
+
+    def __init__(self, depthMode: DepthMode = DepthMode.ReverseZ, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.setTitle('Orbit Viewer')
+
+        self.frameGraph = DepthFrameGraph(self, self.camera(), depthMode, QColor(210, 210, 220))
+        self.setActiveFrameGraph(self.frameGraph)
+
+        self.root = Qt3DCore.QEntity()
+        self.scene = OrbitScene(self.root)
+
+        camera = self.camera()
+        camera.lens().setPerspectiveProjection(65.0, 16.0 / 9.0, 0.1, 1000.0)
+        camera.setPosition(QVector3D(40, -40, 30))
+        camera.setUpVector(QVector3D(0, 0, 1))
+        camera.setViewCenter(QVector3D(0, 0, 0))
+
+        self.cameraController = Qt3DExtras.QOrbitCameraController(self.root)
+        self.cameraController.setCamera(camera)
+
+        self.light = Qt3DCore.QEntity(camera)
+        pointLight = Qt3DRender.QPointLight(self.light)
+        pointLight.setColor('white')
+        pointLight.setIntensity(1)
+        self.light.addComponent(pointLight)
+
+        self.setRootEntity(self.root)
+        self.scene.synced.connect(self._synced)
+
+        self.gizmos = []
+        self.labels = None  # LabelLayer, made by the first addLabels()
+        self.tickLayers = []
+        self._drag = None  # (gizmo, handle name, plane point, plane normal)
+        self.dragLatencies = []  # seconds per event of the last drag, until its sync
+        self._dragEvents = []  # perf_counter() of the drag events waiting for a sync
+        self.conjunctions = []
+        self._trajectoryNames = []  # of the main and the added trajectories, see showConjunctions()
+        self._conjunction = None  # index of the conjunction selected alone
+
+        self._overlayTimer = QTimer(self)
+        self._overlayTimer.setInterval(500)
+        self._overlayTimer.timeout.connect(self._updateOverlay)
+        self.setProfiling(profiling.profiler.enabled)
+
+    def setProfiling(self, enabled: bool):
+        """Switch profiling and its title bar overlay on or off."""
+        if not enabled and profiling.profiler.enabled:
+            log.info('profile:\n%s', profiling.profiler.report())
+
+        profiling.enable(enabled)
+        if enabled:
+            self._overlayTimer.start()
+            self._updateOverlay()
+        else:
+            self._overlayTimer.stop()
+            self.setTitle('Orbit Viewer')
+
+    def _updateOverlay(self):
+        self.setTitle('Orbit Viewer - ' + (profiling.profiler.summary() or 'profiling'))
+
+    def addShape(self, shape: Shape):
+        """Show a selection shape with handles to drag it."""
+        entity = self.scene.addShape(shape)
+        self.gizmos.append(ShapeGizmo(self.scene, entity))
+        return entity
+
+    def addLabels(self, positions: np.ndarray, texts: Sequence[str], priorities: np.ndarray = None):
+        """Label (n, 3) positions, see `LabelLayer.setLabels`; replaces the labels of the last call."""
+        if self.labels is None:
+            self.labels = LabelLayer(self.scene, self.camera())
+            self.labels.setViewportSize(self.width(), self.height())
+        self.labels.setLabels(positions, texts, priorities)
+        return self.labels
+
+    def addTicks(self, trajectory: Trajectory, color: QColor = QColor.fromRgb(20, 20, 20)):
+        """Mark times along a trajectory, more finely the closer it is, see `TickLayer`."""
+        layer = TickLayer(self.scene, self.camera(), trajectory, color)
+        layer.setViewportSize(self.width(), self.height())
+        self.tickLayers.append(layer)
+        return layer
+
+    def showConjunctions(self, conjunctions: Sequence, names: Sequence[str]):
+        """Highlight `orbit_viewer.conjunctions.Conjunction`s on the trajectories and select them.
+
+        `names` are the spacecraft names of the main trajectory and of the
+        `OrbitScene.addTrajectory()` ones, in that order.
+        """
+        self.conjunctions = list(conjunctions)
+        self._trajectoryNames = list(names)
+        self.selectConjunction(None)
+
+    def selectConjunction(self, index: int = None):
+        """Select conjunction `index` alone and center the view on it, all of them with None."""
+        self._conjunction = index
+        selected = self.conjunctions if index is None else [self.conjunctions[index]]
+
+        entities = [None] + self.scene.trajectories
+        for name, entity in zip(self._trajectoryNames, entities):
+            intervals = [(c.start, c.stop) for c in selected if name in (c.first, c.second)]
+            self.scene.selectIntervals(intervals, 'conjunctions', entity)
+
+        if index is not None:
+            c = selected[0]
+            trajectories = [self.scene.trajectory.data] + [entity.data for entity in self.scene.trajectories]
+            trajectory = trajectories[self._trajectoryNames.index(c.first)]
+            middle = c.start + (c.stop - c.start) // 2
+            position = interpolate(trajectory, np.array([middle]).view(np.int64))[0]
+            self.camera().setViewCenter(QVector3D(*position))
+            log.info('conjunction %d of %d: %s and %s from %s to %s, %.2f Re', index + 1, len(self.conjunctions),
+                     c.first, c.second, c.start, c.stop, c.min_distance)
+
+    def _stepConjunction(self, step: int):
+        if not self.conjunctions:
+            return
+        if self._conjunction is None:
+            index = 0 if step > 0 else len(self.conjunctions) - 1
+        else:
+            index = (self._conjunction + step) % len(self.conjunctions)
+        self.selectConjunction(index)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        for layer in [self.labels] + self.tickLayers:
+            if layer is not None:
+                layer.setViewportSize(self.width(), self.height())
+
+    def _ray(self, pos):
+        """(origin, direction) of the camera ray through a window position and the pixel size there."""
+        camera = self.camera()
+        lens = camera.lens()
+        x = 2.0 * pos.x() / self.width() - 1.0
+        y = 1.0 - 2.0 * pos.y() / self.height()
+
+        origin, direction = camera_ray(_vector(camera.position()), _vector(camera.viewCenter()),
+                                       _vector(camera.upVector()), lens.fieldOfView(), lens.aspectRatio(), x, y)
+        # pixel size at the distance of the view center
+        pixel = 2.0 * camera.viewVector().length() * np.tan(np.radians(lens.fieldOfView()) / 2) / self.height()
+        return origin, direction, pixel
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self._startDrag(event.pos()):
+            return
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._drag is not None:
+            self._dragTo(event.pos())
+            return
+        super().mouseMoveEvent(event)
+        if event.buttons() == Qt.NoButton:
+            self._hover(event.pos())
+
+    def mouseReleaseEvent(self, event):
+        if self._drag is not None and event.button() == Qt.LeftButton:
+            self._endDrag()
+            return
+        super().mouseReleaseEvent(event)
+
+    def _startDrag(self, pos) -> bool:
+        origin, direction, pixel = self._ray(pos)
+        hits = [(hit, gizmo) for gizmo in self.gizmos
+                for hit in [gizmo.hit(origin, direction, self.pickRadius * pixel)] if hit is not None]
+        if not hits:
+            return False
+
+        (name, _), gizmo = min(hits, key=lambda hit: hit[0][1])
+        # the handle moves in the plane through it facing the camera
+        normal = _vector(self.camera().viewVector())
+        self._drag = gizmo, name, gizmo.position(name), normal
+        self.dragLatencies = []
+        self._dragEvents = []
+
+        # the camera stays put while a handle is dragged
+        self.cameraController.setEnabled(False)
+        QToolTip.hideText()
+        return True
+
+    def _dragTo(self, pos):
+        start = time.perf_counter()
+        with profiling.span('drag'):
+            gizmo, name, point, normal = self._drag
+            origin, direction, _ = self._ray(pos)
+            position = ray_plane(origin, direction, point, normal)
+            if position is None:
+                return
+            gizmo.drag(name, position)
+        self._dragEvents.append(start)
+
+    def _synced(self):
+        if self._dragEvents:
+            end = time.perf_counter()
+            self.dragLatencies.extend(end - start for start in self._dragEvents)
+            self._dragEvents = []
+
+    def _endDrag(self):
+        gizmo, _, _, _ = self._drag
+        self._drag = None
+        self.cameraController.setEnabled(True)
+        self.scene.sync()  # the last moves, for their latencies
+
+        if self.dragLatencies:
+            latencies = np.array(self.dragLatencies) * 1e3
+            log.info('dragged %r: %d events, latency %.2f ms mean, %.2f ms max',
+                     gizmo.shapeEntity.shape, len(latencies), latencies.mean(), latencies.max())
+
+    def _hover(self, pos):
+        origin, direction, pixel = self._ray(pos)
+        picked = self.scene.pick(origin, direction, self.pickRadius * pixel)
+        if picked is None:
+            QToolTip.hideText()
+            return
+
+        trajectory, pick = picked
+        lines = [np.datetime_as_string(np.datetime64(int(pick.time), 'ns'), unit='ms'),
+                 'X {:.2f}  Y {:.2f}  Z {:.2f} Re'.format(*pick.position)]
+        try:
+            lines.append(region_name(pick.position))
+        except ImportError:
+            pass  # no boundary models without the space package
+        QToolTip.showText(self.mapToGlobal(pos), '\n'.join(lines))
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_F3:
+            self.setProfiling(not profiling.profiler.enabled)
+        elif event.key() in (Qt.Key_PageUp, Qt.Key_PageDown) and self.scene.slices:
+            entity = self.scene.slices[-1]
+            step = self.sliceStep if event.key() == Qt.Key_PageUp else -self.sliceStep
+            self.scene.moveSlice(entity, offset=entity.offset + step)
+        elif event.key() in (Qt.Key_N, Qt.Key_P):
+            self._stepConjunction(1 if event.key() == Qt.Key_N else -1)
+        elif event.key() == Qt.Key_Escape and self._conjunction is not None:
+            self.selectConjunction(None)
+        else:
+            super().keyPressEvent(event)
+
+
+def _vector(v: QVector3D):
+    return v.x(), v.y(), v.z()
+
+
+_COLORS = [QColor.fromRgb(200, 0, 0), QColor.fromRgb(0, 120, 200), QColor.fromRgb(0, 160, 0),
+           QColor.fromRgb(200, 120, 0), QColor.fromRgb(140, 0, 200)]
+
+
+def run(trajectories: Sequence[Trajectory], shapes: Iterable[Shape] = (), models: bool = True,
+        slices: Iterable = (), ticks: bool = False, conjunctions: float = None, names: Sequence[str] = None):
+    """Show orbits (and selection shapes) and run the Qt event loop until the window is closed.
+
+    `slices` are (normal, offset) planes, see `orbit_viewer.slicing.parse_plane`.  With
+    `ticks` the main trajectory has time ticks.  With a `conjunctions` distance the
+    conjunctions of the spacecraft (by `names`, of the trajectories) are shown.
+    """
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    window = OrbitWindow()
+    window.scene.setTrajectory(trajectories[0])
+    for i, trajectory in enumerate(trajectories[1:], 1):
+        window.scene.addTrajectory(trajectory, _COLORS[i % len(_COLORS)])
+
+    if models:
+        from space.models.planetary import mp_formisano1979, bs_formisano1979
+
+        window.scene.addModel(mp_formisano1979, QColor.fromRgb(100, 20, 0, 150))
+        window.scene.addModel(bs_formisano1979, QColor.fromRgb(20, 100, 0, 150), lines=True)
+
+    for shape in shapes:
+        window.addShape(shape)
+
+    for normal, offset in slices:
+        window.scene.addSlice(normal, offset)
+
+    if ticks:
+        window.addTicks(trajectories[0])
+
+    if conjunctions is not None:
+        from .conjunctions import find_conjunctions
+
+        names = list(names or ['sc{}'.format(i + 1) for i in range(len(trajectories))])
+        window.showConjunctions(find_conjunctions(dict(zip(names, trajectories)), conjunctions), names)
+
+    window.resize(1280, 720)
+    window.show()
+    return app.exec_()
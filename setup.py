@@ -10,7 +10,7 @@ with open('README.rst') as readme_file:
 with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
-requirements = ['broni', 'PySide2', 'space']
+requirements = ['broni', 'numpy', 'PySide2', 'space']
 
 setup_requirements = [ ]
 
@@ -19,22 +19,20 @@ test_requirements = [ ]
 setup(
     author="Patrick Boettcher",
     author_email='p@yai.se',
-    python_requires='>=3.5',
+    python_requires='>=3.8',
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: GNU General Public License v3 (GPLv3)',
         'Natural Language :: English',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
     ],
     description="Orbit Viewer allows visualizing orbit-trajetories and with the of shapes and models select potions of it (as intervals)",
     entry_points={
         'console_scripts': [
             'orbit_viewer=orbit_viewer.cli:main',
+            'orbit-viewer=orbit_viewer.cli:main',
         ],
     },
     install_requires=requirements,
@@ -0,0 +1,54 @@
+"""Tests for `orbit_viewer.batch`."""
+
+import json
+import os
+import tempfile
+import unittest
+
+from orbit_viewer.batch import read_manifest, render_batch, Job
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _write(self, text):
+        path = os.path.join(self._dir.name, 'manifest')
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_json_lines(self):
+        entries = [dict(spacecraft='mms1', start='2020-10-10', stop='2020-10-11', camera='xy', output='a.png'),
+                   dict(spacecraft='cluster1', start='2020-10-10', stop='2020-10-11', output='b.png')]
+        path = self._write('\n'.join(json.dumps(e) for e in entries) + '\n\n')
+
+        jobs = read_manifest(path)
+        self.assertEqual(jobs[0], Job('mms1', '2020-10-10', '2020-10-11', 'xy', 'a.png'))
+        self.assertEqual(jobs[1].camera, 'oblique')
+
+    def test_json_array(self):
+        path = self._write(json.dumps([dict(spacecraft='mms1', start='a', stop='b', output='c.png')]))
+        self.assertEqual(len(read_manifest(path)), 1)
+
+    def test_missing_key(self):
+        path = self._write(json.dumps(dict(spacecraft='mms1', start='a', output='c.png')))
+        with self.assertRaises(ValueError):
+            read_manifest(path)
+
+
+class TestRenderBatch(unittest.TestCase):
+
+    def test_worker_setup_failed(self):
+        # QSize(None, None) raises in the pool initializer of each worker
+        jobs = [Job('mms1', '2020-10-10', '2020-10-11', 'xy', '{}.png'.format(i)) for i in range(3)]
+        results = list(render_batch(jobs, processes=1, width=None, height=None))
+
+        self.assertEqual(sorted(result.job for result in results), jobs)
+        for result in results:
+            self.assertFalse(result.ok)
+            self.assertIn('TypeError', result.error)
@@ -0,0 +1,53 @@
+"""Tests for `orbit_viewer.cli`."""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from orbit_viewer import cli
+from orbit_viewer.io import save_orbit, load_intervals, load_orbit
+from orbit_viewer.trajectory import Trajectory
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.orbit = os.path.join(self._dir.name, 'orbit.npz')
+
+        times = np.datetime64('2020-10-10T00:00') + np.arange(10) * np.timedelta64(1, 'm')
+        positions = np.zeros((10, 3))
+        positions[:, 0] = np.arange(10)
+        save_orbit(self.orbit, Trajectory(times, positions))
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_select(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(cli.main(['select', self.orbit, '-s', 'cuboid:2,-1,-1,3,2,2']), 0)
+        self.assertEqual(out.getvalue().split(),
+                         ['2020-10-10T00:02:00.000000000', '2020-10-10T00:05:00.000000000'])
+
+    def test_export(self):
+        for suffix in ['.csv', '.json']:
+            path = os.path.join(self._dir.name, 'intervals' + suffix)
+            with contextlib.redirect_stdout(io.StringIO()):
+                cli.main(['export', self.orbit, '-s', 'sphere:0,0,0,3', '-s', 'sphere:9,0,0,1', '-o', path])
+            self.assertEqual(len(load_intervals(path)), 2)
+
+    def test_synthetic(self):
+        path = os.path.join(self._dir.name, 'geo.ovc')
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(cli.main(['synthetic', 'geo', '2020-01-01', '2020-01-02', '--cadence', '600',
+                                       '-o', path]), 0)
+        self.assertEqual(len(load_orbit(path)), 144)
+
+    def test_no_command(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(cli.main([]), 1)
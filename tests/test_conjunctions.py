@@ -0,0 +1,81 @@
+"""Tests for `orbit_viewer.conjunctions`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer import profiling
+from orbit_viewer.conjunctions import common_grid, resample, find_conjunctions
+from orbit_viewer.trajectory import Trajectory
+
+_T0 = np.datetime64('2020-01-01', 'ns')
+
+
+def _line(n, step_s, x0, vx, y=0.0):
+    times = _T0 + np.arange(n) * np.timedelta64(step_s, 's')
+    positions = np.zeros((n, 3))
+    positions[:, 0] = x0 + vx * np.arange(n)
+    positions[:, 1] = y
+    return Trajectory(times, positions)
+
+
+class TestConjunctions(unittest.TestCase):
+
+    def test_resample(self):
+        t = _line(3, 120, 0.0, 2.0)
+        grid = common_grid([t], np.timedelta64(60, 's'))
+        self.assertEqual(len(grid), 5)
+        np.testing.assert_allclose(resample(t, grid)[:, 0], [0, 1, 2, 3, 4])
+
+    def test_crossing(self):
+        # a goes 0 -> 100, b stays at 50 (sampled at a different cadence)
+        a = _line(101, 60, 0.0, 1.0)
+        b = _line(51, 120, 50.0, 0.0, y=1.0)
+
+        for chunk_size in [7, 65536]:
+            found = find_conjunctions({'b': b, 'a': a}, 2.0, chunk_size=chunk_size)
+            self.assertEqual(len(found), 1)
+            c = found[0]
+            self.assertEqual((c.first, c.second), ('a', 'b'))
+            # sqrt(dx^2 + 1) <= 2 for |dx| <= sqrt(3)
+            self.assertEqual(c.start, _T0 + np.timedelta64(49, 'm'))
+            self.assertEqual(c.stop, _T0 + np.timedelta64(51, 'm'))
+            self.assertAlmostEqual(c.min_distance, 1.0)
+
+    def test_far_apart_is_empty(self):
+        a = _line(100, 60, 0.0, 0.0)
+        b = _line(100, 60, 100.0, 0.0)
+        self.assertEqual(find_conjunctions({'a': a, 'b': b}, 2.0), [])
+
+    def test_several_intervals(self):
+        n = 200
+        times = _T0 + np.arange(n) * np.timedelta64(60, 's')
+        a = Trajectory(times, np.zeros((n, 3)))
+        positions = np.zeros((n, 3))
+        positions[:, 0] = 10 * np.cos(np.arange(n) * 2 * np.pi / 50)
+        b = Trajectory(times, positions)
+
+        found = find_conjunctions({'a': a, 'b': b}, 5.0, chunk_size=16)
+        self.assertEqual(len(found), 8)  # twice per period, 4 periods
+
+    def test_pruned(self):
+        # circles in the xy and the xz plane with different periods, close only near the x axis
+        n = 30 * 1440
+        times = _T0 + np.arange(n) * np.timedelta64(60, 's')
+        a = 2 * np.pi * np.arange(n) / 1440
+        b = a / 1.3
+        first = Trajectory(times, np.column_stack([10 * np.cos(a), 10 * np.sin(a), np.zeros(n)]))
+        second = Trajectory(times, np.column_stack([10 * np.cos(b), np.zeros(n), 10 * np.sin(b)]))
+
+        profiling.profiler.reset()
+        profiling.enable()
+        try:
+            found = find_conjunctions({'a': first, 'b': second}, 1.0)
+            computed = profiling.profiler.counters['distance_samples']
+        finally:
+            profiling.disable()
+            profiling.profiler.reset()
+
+        self.assertEqual(found, find_conjunctions({'a': first, 'b': second}, 1.0, block_size=n))
+        self.assertEqual(len(found), 3)
+        self.assertLess(computed, n / 100)
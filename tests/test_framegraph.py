@@ -0,0 +1,67 @@
+"""Tests for `orbit_viewer.framegraph`."""
+
+import unittest
+
+import numpy as np
+
+from PySide2.Qt3DRender import Qt3DRender
+from PySide2.QtGui import QColor
+
+from orbit_viewer.framegraph import DepthFrameGraph
+from orbit_viewer.materials import LOG_DEPTH_FILTER_KEY, ColorMaterial
+from orbit_viewer.projection import DepthMode, perspective_projection, reverse_z_projection
+
+
+def _projection(camera):
+    return np.array(camera.lens().projectionMatrix().data()).reshape(4, 4).T
+
+
+class TestDepthFrameGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.camera = Qt3DRender.QCamera()
+
+    def tearDown(self):
+        del self.camera
+
+    def test_lens_set_after_graph(self):
+        # the order of OrbitWindow: graph first, then the perspective of the camera
+        graph = DepthFrameGraph(None, self.camera, DepthMode.ReverseZ)
+        self.camera.lens().setPerspectiveProjection(65.0, 16.0 / 9.0, 0.1, 1000.0)
+        np.testing.assert_allclose(_projection(self.camera), reverse_z_projection(65.0, 16.0 / 9.0, 0.1), rtol=1e-6)
+
+        self.camera.lens().setFieldOfView(40.0)
+        np.testing.assert_allclose(_projection(self.camera), reverse_z_projection(40.0, 16.0 / 9.0, 0.1), rtol=1e-6)
+        del graph
+
+    def test_mode_switch(self):
+        self.camera.lens().setPerspectiveProjection(65.0, 1.5, 0.1, 1000.0)
+        graph = DepthFrameGraph(None, self.camera, DepthMode.ReverseZ)
+        np.testing.assert_allclose(_projection(self.camera), reverse_z_projection(65.0, 1.5, 0.1), rtol=1e-6)
+
+        graph.setDepthMode(DepthMode.Standard)
+        np.testing.assert_allclose(_projection(self.camera), perspective_projection(65.0, 1.5, 0.1, 1000.0),
+                                   rtol=1e-5)
+
+        graph.setDepthMode(DepthMode.ReverseZ)
+        np.testing.assert_allclose(_projection(self.camera), reverse_z_projection(65.0, 1.5, 0.1), rtol=1e-6)
+
+    def test_log_depth_techniques(self):
+        graph = DepthFrameGraph(None, self.camera, DepthMode.Logarithmic)
+        keys = [(key.name(), key.value()) for key in graph.leaf().matchAll()]
+        self.assertEqual(keys, [LOG_DEPTH_FILTER_KEY])
+
+        # the standard technique first, the logarithmic one selected by the key
+        material = ColorMaterial(QColor('red'))
+        techniques = material.effect().techniques()
+        self.assertEqual([[(key.name(), key.value()) for key in technique.filterKeys()] for technique in techniques],
+                         [[('renderingStyle', 'forward')], [('renderingStyle', 'forward'), LOG_DEPTH_FILTER_KEY]])
+        fragments = []
+        for technique in techniques:
+            renderPasses = technique.renderPasses()
+            fragments.append(renderPasses[0].shaderProgram().fragmentShaderCode().data().decode())
+        self.assertNotIn('#define LOG_DEPTH', fragments[0])
+        self.assertIn('#define LOG_DEPTH', fragments[1])
+
+        graph.setDepthMode(DepthMode.ReverseZ)
+        self.assertEqual(graph.leaf().matchAll(), [])
@@ -0,0 +1,91 @@
+"""Tests for `orbit_viewer.geometry`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer import geometry
+
+
+def _reference_index_data(width, height):
+    data = []
+    for j in range(height - 1):
+        rowStartIndex = j * width
+        nextRowStartIndex = (j + 1) * width
+
+        for i in range(width - 1):
+            data.append(rowStartIndex + i)
+            data.append(nextRowStartIndex + i)
+            data.append(rowStartIndex + i + 1)
+
+            data.append(nextRowStartIndex + i)
+            data.append(nextRowStartIndex + i + 1)
+            data.append(rowStartIndex + i + 1)
+    return data
+
+
+def _sphere(theta, phi):
+    return np.cos(theta), np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi)
+
+
+def _spheres(theta, phi, radius):
+    return radius * np.cos(theta), radius * np.sin(theta) * np.cos(phi), radius * np.sin(theta) * np.sin(phi)
+
+
+class TestGeometry(unittest.TestCase):
+
+    def test_grid_index_matches_loop(self):
+        indices = geometry.grid_index_data(7, 5)
+        self.assertEqual(indices.dtype, np.uint16)
+        self.assertEqual(indices.tolist(), _reference_index_data(7, 5))
+
+    def test_grid_index_large_is_uint32(self):
+        indices = geometry.grid_index_data(300, 300)
+        self.assertEqual(indices.dtype, np.uint32)
+        self.assertEqual(indices.max(), 300 * 300 - 1)
+
+    def test_model_vertex_data(self):
+        data = geometry.model_vertex_data(np.pi, 2 * np.pi, _sphere, 10, 12)
+        self.assertEqual(data.shape, (120, geometry.ELEMENT_SIZE))
+        self.assertEqual(data.dtype, np.float32)
+        np.testing.assert_allclose(np.linalg.norm(data[:, 0:3], axis=1), 1.0, rtol=1e-6)
+        self.assertEqual(len(data.tobytes()), 120 * geometry.STRIDE)
+
+    def test_plane_vertex_data(self):
+        data = geometry.plane_vertex_data(4.0, 2.0, 3, 2)
+        self.assertEqual(data[:, 0].tolist(), [-2.0, 0.0, 2.0] * 2)
+        self.assertEqual(data[:, 2].tolist(), [-1.0] * 3 + [1.0] * 3)
+
+    def test_sweep_vertex_data(self):
+        radii = [1.0, 2.0, 4.0]
+        data = geometry.sweep_vertex_data(np.pi, 2 * np.pi, _spheres, 10, 12, radii)
+        self.assertEqual(data.shape, (3 * 120, geometry.ELEMENT_SIZE))
+
+        # each surface as evaluated alone
+        for i, radius in enumerate(radii):
+            single = geometry.model_vertex_data(np.pi, 2 * np.pi, lambda t, p: _spheres(t, p, radius), 10, 12)
+            np.testing.assert_array_equal(data[i * 120:(i + 1) * 120], single)
+
+        members = geometry.sweep_members(10, 12, 3)
+        self.assertEqual(members.tolist(), [0.0] * 120 + [1.0] * 120 + [2.0] * 120)
+
+    def test_sweep_index_data(self):
+        indices = geometry.sweep_index_data(7, 5, 3)
+        self.assertEqual(indices.dtype, np.uint16)
+        grid = _reference_index_data(7, 5)
+        self.assertEqual(indices.tolist(), grid + [i + 35 for i in grid] + [i + 70 for i in grid])
+        self.assertEqual(geometry.sweep_index_data(200, 200, 2).dtype, np.uint32)
+
+    def test_rgba8(self):
+        self.assertEqual(geometry.rgba8([[1.0, 0.5, 0.0]]).tolist(), [[255, 128, 0, 255]])
+        self.assertEqual(geometry.rgba8(np.array([[1, 2, 3, 4]], dtype=np.uint8)).tolist(), [[1, 2, 3, 4]])
+        self.assertEqual(geometry.rgba8([[2.0, -1.0, 0.0, 0.0]]).tolist(), [[255, 0, 0, 0]])
+
+    def test_colormap(self):
+        gradient = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 1.0, 1.0)]
+        colors = geometry.colormap([0, 5, 10, 15, 20], gradient=gradient)
+        self.assertEqual(colors[:, 0].tolist(), [0, 128, 255, 255, 255])
+        self.assertEqual(colors[:, 1].tolist(), [0, 0, 0, 128, 255])
+        self.assertEqual(colors[:, 3].tolist(), [255] * 5)
+        self.assertEqual(geometry.colormap([-1, 3], 0, 1, gradient).tolist(), [[0, 0, 0, 255], [255, 255, 255, 255]])
+        self.assertEqual(geometry.colormap([7, 7])[:, 2].tolist(), [204, 204])
@@ -0,0 +1,88 @@
+"""Tests for `orbit_viewer.io`."""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from orbit_viewer import io
+from orbit_viewer.trajectory import Trajectory
+
+
+def _trajectory(n=1000):
+    times = np.datetime64('2020-01-01', 'ns') + np.arange(n) * np.timedelta64(1, 'm')
+    positions = np.random.default_rng(0).normal(size=(n, 3))
+    return Trajectory(times, positions, velocities=positions * 2, columns={'region': np.arange(n) % 3})
+
+
+class TestIo(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self._dir.name, name)
+
+    def _assertSame(self, a, b):
+        np.testing.assert_array_equal(a.times, b.times)
+        np.testing.assert_array_equal(a.positions, b.positions)
+        np.testing.assert_array_equal(a.velocities, b.velocities)
+        np.testing.assert_array_equal(a.columns['region'], b.columns['region'])
+
+    def test_orbit_roundtrip(self):
+        t = _trajectory()
+        for name in ['orbit.npz', 'orbit.ovc']:
+            io.save_orbit(self._path(name), t)
+            self._assertSame(t, io.load_orbit(self._path(name)))
+
+    def test_ovc_is_memory_mapped_and_aligned(self):
+        io.save_orbit(self._path('orbit.ovc'), _trajectory())
+        loaded = io.load_orbit(self._path('orbit.ovc'))
+
+        self.assertIsInstance(loaded.positions.base, np.memmap)
+        self.assertFalse(loaded.positions.flags['WRITEABLE'])
+        self.assertEqual(loaded.positions.ctypes.data % 64, 0)
+        part = loaded.between('2020-01-01T01:00', '2020-01-01T02:00')
+        self.assertTrue(np.shares_memory(part.positions, loaded.positions))
+
+    def test_intervals_roundtrip(self):
+        intervals = np.array([['2020-01-01T00:00', '2020-01-01T01:00'],
+                              ['2020-01-02T00:00', '2020-01-02T00:30']], dtype='datetime64[ns]')
+        for name in ['i.csv', 'i.json', 'i.ovc']:
+            io.save_intervals(self._path(name), intervals)
+            np.testing.assert_array_equal(io.load_intervals(self._path(name)), intervals)
+
+    def test_selection_roundtrip(self):
+        t = _trajectory()
+        mask = t.columns['region'] == 0
+        intervals = np.array([[t.datetimes[0], t.datetimes[-1]]])
+
+        for name in ['s.ovc', 's.npz']:
+            io.save_selection(self._path(name), t, mask, intervals)
+            selected, loaded_intervals = io.load_selection(self._path(name))
+
+            self._assertSame(t[mask], selected)
+            np.testing.assert_array_equal(loaded_intervals, intervals)
+        with self.assertRaises(ValueError):
+            io.load_orbit(self._path('s.ovc'))
+
+    def test_ovc_checked(self):
+        t = _trajectory()
+        columns = io._trajectory_columns(t)
+
+        for name, array in [('positions', t.positions[:, :2]),
+                            ('positions', t.positions.astype(np.float32)),
+                            ('velocities', t.velocities[:10]),
+                            ('times', t.times.astype(np.float64))]:
+            io.write_columns(self._path('bad.ovc'), 'trajectory', dict(columns, **{name: array}))
+            with self.assertRaisesRegex(ValueError, name):
+                io.load_orbit(self._path('bad.ovc'))
+
+        columns['intervals'] = np.zeros(3, dtype=np.int64)
+        io.write_columns(self._path('bad.ovc'), 'selection', columns)
+        with self.assertRaisesRegex(ValueError, 'intervals'):
+            io.load_selection(self._path('bad.ovc'))
@@ -0,0 +1,85 @@
+"""Tests for `orbit_viewer.labels`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer.labels import GlyphMetrics, declutter, layout, project
+
+
+def _metrics():
+    # 'A' to 'Z' and '?', 7 pixels apart, quads one pixel wider on each side
+    codes = np.array(sorted([ord('?')] + list(range(ord('A'), ord('Z') + 1))), dtype=np.uint32)
+    advances = np.full(len(codes), 7.0)
+    uv = np.column_stack([np.arange(len(codes)), np.zeros(len(codes)),
+                          np.arange(len(codes)) + 1, np.ones(len(codes))]) / len(codes)
+    return GlyphMetrics(codes, advances, advances + 2, 12, 1, uv)
+
+
+def _overlaps(xy, boxes, margin=6.0):
+    lo = np.column_stack([xy[:, 0] + margin, xy[:, 1] - boxes[:, 1] / 2])
+    hi = lo + boxes
+    return ((lo[:, np.newaxis] < hi[np.newaxis]) & (lo[np.newaxis] < hi[:, np.newaxis])).all(axis=2)
+
+
+class TestLayout(unittest.TestCase):
+
+    def test_glyphs(self):
+        metrics = _metrics()
+        result = layout(metrics, ['AB', '', 'XYZ'], margin=6.0)
+
+        self.assertEqual(result.label.tolist(), [0, 0, 2, 2, 2])
+        self.assertEqual(result.offsets[:, 0].tolist(), [5, 12, 5, 12, 19])
+        self.assertEqual(result.offsets[:, 1].tolist(), [-6] * 5)
+        self.assertEqual(result.sizes.tolist(), [[9, 12]] * 5)
+        self.assertEqual(result.boxes.tolist(), [[14, 12], [0, 12], [21, 12]])
+        np.testing.assert_allclose(result.uv[0], metrics.uv[1])  # 'A' after '?'
+
+    def test_fallback(self):
+        metrics = _metrics()
+        result = layout(metrics, ['aé'])
+        np.testing.assert_allclose(result.uv, metrics.uv[[0, 0]])
+
+
+class TestProject(unittest.TestCase):
+
+    def test_orthographic(self):
+        matrix = np.diag([0.1, 0.1, 0.1, 1.0])
+        xy, front = project(np.array([[0.0, 0.0, 0.0], [10.0, 10.0, 0.0], [-10.0, 0.0, 5.0]]), matrix, 200, 100)
+        self.assertEqual(xy.tolist(), [[100, 50], [200, 0], [0, 50]])
+        self.assertTrue(front.all())
+
+    def test_behind(self):
+        # w = -z as for a camera looking down -Z
+        matrix = np.array([[1.0, 0, 0, 0], [0, 1.0, 0, 0], [0, 0, -1.0, 0], [0, 0, -1.0, 0]])
+        _, front = project(np.array([[0.0, 0.0, -1.0], [0.0, 0.0, 1.0]]), matrix, 200, 100)
+        self.assertEqual(front.tolist(), [True, False])
+
+
+class TestDeclutter(unittest.TestCase):
+
+    def test_no_overlaps(self):
+        rng = np.random.default_rng(0)
+        xy = rng.random((2000, 2)) * [800, 600]
+        boxes = np.column_stack([rng.integers(10, 60, len(xy)), np.full(len(xy), 14)]).astype(float)
+
+        shown = declutter(xy, boxes, 800, 600)
+        overlaps = _overlaps(xy[shown], boxes[shown])
+        np.fill_diagonal(overlaps, False)
+        self.assertFalse(overlaps.any())
+        self.assertGreater(shown.sum(), 100)
+
+    def test_priority(self):
+        xy = np.array([[100.0, 100.0], [105.0, 102.0]])
+        boxes = np.array([[40.0, 14.0], [40.0, 14.0]])
+        self.assertEqual(declutter(xy, boxes, 800, 600).tolist(), [True, False])
+        self.assertEqual(declutter(xy, boxes, 800, 600, priorities=[0, 1]).tolist(), [False, True])
+        self.assertEqual(declutter(xy, boxes, 800, 600, priorities=np.array([False, True])).tolist(),
+                         [False, True])
+
+    def test_culled(self):
+        xy = np.array([[100.0, 100.0], [-100.0, 100.0], [100.0, 700.0], [300.0, 100.0]])
+        boxes = np.full((4, 2), 14.0)
+        front = np.array([True, True, True, False])
+        self.assertEqual(declutter(xy, boxes, 800, 600, front).tolist(), [True, False, False, False])
+        self.assertEqual(declutter(xy[:0], boxes[:0], 800, 600).tolist(), [])
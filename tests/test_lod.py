@@ -0,0 +1,25 @@
+"""Tests for `orbit_viewer.lod`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer.lod import decimation_indices, decimate
+
+
+class TestLod(unittest.TestCase):
+
+    def test_small_is_untouched(self):
+        self.assertEqual(decimation_indices(5, 10).tolist(), [0, 1, 2, 3, 4])
+
+    def test_bounds_and_endpoints(self):
+        for count in [11, 100, 101, 102, 12345]:
+            indices = decimation_indices(count, 11)
+            self.assertLessEqual(len(indices), 11)
+            self.assertEqual(indices[0], 0)
+            self.assertEqual(indices[-1], count - 1)
+            self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_decimate(self):
+        positions = np.arange(300, dtype=np.float64).reshape(100, 3)
+        self.assertEqual(decimate(positions, 10).shape[1], 3)
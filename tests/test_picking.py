@@ -0,0 +1,73 @@
+"""Tests for `orbit_viewer.picking`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer.picking import TrajectoryIndex, camera_ray
+from orbit_viewer.synthetic import constellation, orbit
+from orbit_viewer.trajectory import Trajectory
+
+
+def _brute_force(positions, origin, direction):
+    """Smallest distance of the ray to the densely subdivided polyline."""
+    s = np.linspace(0, 1, 51)[:, np.newaxis, np.newaxis]
+    points = (positions[:-1] + s * (positions[1:] - positions[:-1])).reshape(-1, 3)
+    t = np.maximum((points - origin) @ direction, 0)
+    return np.linalg.norm(points - origin - t[:, np.newaxis] * direction, axis=1).min()
+
+
+class TestPicking(unittest.TestCase):
+
+    def test_camera_ray(self):
+        origin, direction = camera_ray((10, 0, 0), (0, 0, 0), (0, 0, 1), 90.0, 2.0, 0.0, 0.0)
+        np.testing.assert_allclose(direction, [-1, 0, 0])
+        _, direction = camera_ray((10, 0, 0), (0, 0, 0), (0, 0, 1), 90.0, 2.0, 0.0, 1.0)
+        np.testing.assert_allclose(direction, np.array([-1, 0, 1]) / np.sqrt(2))
+        _, direction = camera_ray((10, 0, 0), (0, 0, 0), (0, 0, 1), 90.0, 2.0, 1.0, 0.0)
+        np.testing.assert_allclose(direction, np.array([-1, 2, 0]) / np.sqrt(5))
+
+    def test_against_brute_force(self):
+        trajectory = list(constellation(1, 'mms', '2020-01-01', '2020-01-03', seed=1).values())[0]
+        index = TrajectoryIndex(trajectory, leaf_size=8, branching=4)
+        rng = np.random.default_rng(0)
+
+        for _ in range(20):
+            target = trajectory.positions[rng.integers(len(trajectory))] + rng.normal(scale=0.3, size=3)
+            origin = rng.normal(scale=40, size=3)
+            direction = (target - origin) / np.linalg.norm(target - origin)
+
+            pick = index.pick(origin, direction, 1.0)
+            expected = _brute_force(trajectory.positions, origin, direction)
+            if expected > 1.0 + 1e-6:
+                self.assertIsNone(pick)
+                continue
+            self.assertIsNotNone(pick)
+            self.assertLessEqual(pick.distance, expected + 1e-6)
+
+            # the picked point is on the trajectory, between its sample times
+            self.assertLess(np.linalg.norm(pick.position - trajectory.positions[pick.index]), 2.0)
+            self.assertLessEqual(abs(int(pick.time) - int(trajectory.times[pick.index])), 30 * 10 ** 9)
+
+    def test_exact_hit(self):
+        trajectory = Trajectory(np.arange(3) * 10, [[0, 0, 0], [10, 0, 0], [10, 10, 0]])
+        pick = TrajectoryIndex(trajectory).pick((2.5, 0, 5), (0, 0, -1), 0.1)
+        self.assertEqual(pick.index, 0)
+        self.assertEqual(pick.time, 2)
+        np.testing.assert_allclose(pick.position, [2.5, 0, 0])
+
+        self.assertIsNone(TrajectoryIndex(trajectory).pick((2.5, 0, 5), (0, 0, 1), 0.1))  # behind the ray
+        self.assertIsNone(TrajectoryIndex(trajectory).pick((5, 5, 5), (0, 0, -1), 0.1))
+
+    def test_degenerate(self):
+        self.assertIsNone(TrajectoryIndex(Trajectory(np.zeros(0), np.zeros((0, 3)))).pick((0, 0, 1), (0, 0, -1), 1))
+        pick = TrajectoryIndex(Trajectory([5], [[0, 0, 0]])).pick((0, 0, 1), (0, 0, -1), 1)
+        self.assertEqual((pick.index, pick.time), (0, 5))
+
+    def test_long_orbit(self):
+        trajectory = orbit('heo', '2020-01-01', '2020-03-01', np.timedelta64(5, 's'))
+        index = TrajectoryIndex(trajectory)
+        sample = len(trajectory) // 3
+        target = trajectory.positions[sample]
+        pick = index.pick(target + (0, 0, 50), (0, 0, -1), 0.01)
+        self.assertLess(np.linalg.norm(pick.position[:2] - target[:2]), 0.01)
@@ -0,0 +1,81 @@
+"""Tests for `orbit_viewer.profiling`."""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from orbit_viewer import cli, profiling
+from orbit_viewer.io import save_orbit
+from orbit_viewer.profiling import Profiler
+from orbit_viewer.trajectory import Trajectory
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_disabled_records_nothing(self):
+        profiler = Profiler()
+        self.assertIs(profiler.span('a'), profiler.span('b'))
+        with profiler.span('a'):
+            pass
+        profiler.count('bytes', 10)
+        self.assertEqual(profiler.spans, {})
+        self.assertEqual(profiler.counters, {})
+
+    def test_spans_and_counters(self):
+        profiler = Profiler(enabled=True)
+        for _ in range(3):
+            with profiler.span('stage'):
+                pass
+        profiler.count('bytes', 10)
+        profiler.count('bytes', 5)
+
+        stats = profiler.stats('stage')
+        self.assertEqual(stats.calls, 3)
+        self.assertGreaterEqual(stats.total, stats.max)
+        self.assertEqual(profiler.counters, {'bytes': 15})
+        self.assertIn('stage', profiler.report())
+        self.assertIn('bytes 15', profiler.summary())
+
+        profiler.reset()
+        self.assertEqual(profiler.stats('stage').calls, 0)
+
+    def test_span_records_on_exception(self):
+        profiler = Profiler(enabled=True)
+        with self.assertRaises(KeyError):
+            with profiler.span('failing'):
+                raise KeyError()
+        self.assertEqual(profiler.stats('failing').calls, 1)
+
+
+class TestPipelineSpans(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.orbit = os.path.join(self._dir.name, 'orbit.npz')
+        times = np.datetime64('2020-10-10T00:00') + np.arange(100) * np.timedelta64(1, 'm')
+        save_orbit(self.orbit, Trajectory(times, np.random.default_rng(0).normal(size=(100, 3))))
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.profiler.reset()
+        self._dir.cleanup()
+
+    def test_cli_profile(self):
+        err = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(err):
+            cli.main(['--profile', 'select', self.orbit, '-s', 'sphere:0,0,0,2'])
+        self.assertFalse(profiling.profiler.enabled)
+        self.assertEqual(profiling.profiler.stats('load').calls, 1)
+        self.assertEqual(profiling.profiler.stats('select').calls, 1)
+        self.assertIn('select', err.getvalue())
+
+    def test_decimate(self):
+        from orbit_viewer.io import load_orbit
+
+        profiling.enable()
+        load_orbit(self.orbit).decimate(10)
+        self.assertEqual(profiling.profiler.stats('decimate').calls, 1)
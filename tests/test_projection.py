@@ -0,0 +1,35 @@
+"""Tests for `orbit_viewer.projection`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer.projection import (
+    perspective_projection,
+    reverse_z_projection,
+    log_depth_coefficient,
+)
+
+
+def _ndc_z(m, z_eye):
+    clip = m @ np.array([0.0, 0.0, z_eye, 1.0])
+    return clip[2] / clip[3]
+
+
+class TestProjection(unittest.TestCase):
+
+    def test_perspective_maps_near_far(self):
+        m = perspective_projection(65.0, 16.0 / 9.0, 0.1, 200.0)
+        self.assertAlmostEqual(_ndc_z(m, -0.1), -1.0)
+        self.assertAlmostEqual(_ndc_z(m, -200.0), 1.0)
+
+    def test_reverse_z_is_reversed_and_infinite(self):
+        m = reverse_z_projection(65.0, 16.0 / 9.0, 0.1)
+        self.assertAlmostEqual(_ndc_z(m, -0.1), 1.0)
+        self.assertGreater(_ndc_z(m, -1.0), _ndc_z(m, -1e6))
+        self.assertGreater(_ndc_z(m, -1e9), -1.0)
+
+    def test_log_depth_covers_range(self):
+        far = 1e6
+        c = log_depth_coefficient(far)
+        self.assertAlmostEqual(np.log2(far + 1.0) * 0.5 * c, 1.0)
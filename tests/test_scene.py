@@ -0,0 +1,52 @@
+"""Tests for the geometries of `orbit_viewer.scene`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer.scene import PointCloudRenderer, TrajectoryRenderer
+from orbit_viewer.scenemodel import SceneModel
+
+
+def _upload(buffer, data, offset=None):
+    if offset is None:
+        buffer.setData(data.tobytes())
+    else:
+        buffer.updateData(offset, data.tobytes())
+
+
+class TestDeferredCounts(unittest.TestCase):
+
+    def setUp(self):
+        self.model = SceneModel(_upload)
+
+    def test_trajectory(self):
+        renderer = TrajectoryRenderer()
+        geometry = renderer.trajectoryGeometry
+        renderer.setPositions(np.zeros((5, 3)))
+        renderer.setPositions(np.zeros((10, 3)), self.model)
+
+        # buffers and counts wait for the same sync
+        self.assertEqual(renderer.vertexCount(), 5)
+        self.assertEqual(geometry.positionAttribute.count(), 5)
+        self.assertEqual(geometry.selectionAttribute.count(), 5)
+        self.assertEqual(len(geometry.vertexBuffer.data()), 5 * 12)
+
+        self.model.sync()
+        self.assertEqual(renderer.vertexCount(), 10)
+        self.assertEqual(geometry.positionAttribute.count(), 10)
+        self.assertEqual(geometry.selectionAttribute.count(), 10)
+        self.assertEqual(len(geometry.vertexBuffer.data()), 10 * 12)
+        self.assertEqual(len(geometry.selectionBuffer.data()), 10)
+
+    def test_point_cloud(self):
+        renderer = PointCloudRenderer(np.zeros((5, 3)), sizes=np.ones(5))
+        renderer.setPositions(np.zeros((2, 3)), np.ones(2), self.model)
+        self.assertEqual(renderer.vertexCount(), 5)
+        self.assertEqual(renderer.cloudGeometry.sizeAttribute.count(), 5)
+
+        self.model.sync()
+        self.assertEqual(renderer.vertexCount(), 2)
+        self.assertEqual(renderer.cloudGeometry.positionAttribute.count(), 2)
+        self.assertEqual(renderer.cloudGeometry.sizeAttribute.count(), 2)
+        self.assertEqual(len(renderer.cloudGeometry.sizeBuffer.data()), 2 * 4)
@@ -0,0 +1,105 @@
+"""Tests for `orbit_viewer.scenemodel`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer import profiling
+from orbit_viewer.scenemodel import SceneModel
+
+
+class _Node:
+    def __init__(self):
+        self.calls = []
+
+    def setValue(self, *args):
+        self.calls.append(('setValue',) + args)
+
+    def setOther(self, *args):
+        self.calls.append(('setOther',) + args)
+
+
+class TestSceneModel(unittest.TestCase):
+
+    def setUp(self):
+        self.uploads = []
+        self.model = SceneModel(lambda buffer, data, offset=None: self.uploads.append(
+            (buffer, offset, data.tolist())))
+
+    def test_layers(self):
+        synced = []
+        self.model.addLayer('shapes', lambda keys: synced.append(('shapes', keys)))
+        self.model.addLayer('slices', lambda keys: synced.append(('slices', keys)))
+
+        for key in ['b', 'a', 'b']:
+            self.model.markDirty('shapes', key)
+        self.model.markDirty('slices', 'x')
+        self.assertTrue(self.model.isDirty('shapes'))
+
+        self.model.sync()
+        self.assertEqual(synced, [('shapes', ['b', 'a']), ('slices', ['x'])])
+        self.assertFalse(self.model.isDirty())
+
+        self.model.sync()
+        self.assertEqual(len(synced), 2)
+
+    def test_later_layer_marked(self):
+        synced = []
+        self.model.addLayer('shapes', lambda keys: self.model.markDirty('slices', 'x'))
+        self.model.addLayer('slices', synced.append)
+        self.model.markDirty('shapes', 'a')
+        self.model.sync()
+        self.assertEqual(synced, [['x']])
+
+    def test_properties(self):
+        a, b = _Node(), _Node()
+        self.model.setProperty(a, 'setValue', 1)
+        self.model.setProperty(b, 'setValue', 2)
+        self.model.setProperty(a, 'setOther', 3, 4)
+        self.model.setProperty(a, 'setValue', 5)
+        self.assertEqual(a.calls, [])
+
+        self.model.sync()
+        self.assertEqual(a.calls, [('setOther', 3, 4), ('setValue', 5)])
+        self.assertEqual(b.calls, [('setValue', 2)])
+
+    def test_uploads(self):
+        buffer = object()
+        self.model.upload(buffer, np.array([1, 2], dtype=np.uint8), 0)
+        self.model.upload(buffer, np.zeros(6, dtype=np.uint8))
+        self.model.upload(buffer, np.array([7, 8], dtype=np.uint8), 2)
+        self.model.upload(buffer, np.array([9], dtype=np.uint8), 3)
+        self.model.sync()
+        self.assertEqual(self.uploads, [(buffer, None, [0, 0, 7, 9, 0, 0])])
+
+    def test_ranges(self):
+        buffer, other = object(), object()
+        data = np.array([1.0], dtype=np.float32)
+        self.model.upload(buffer, np.array([1, 2], dtype=np.uint8), 4)
+        self.model.upload(buffer, np.array([3], dtype=np.uint8), 0)
+        self.model.upload(buffer, np.array([4, 5, 6], dtype=np.uint8), 3)
+        self.model.upload(other, data)
+        self.model.sync()
+        self.assertEqual(self.uploads, [(buffer, 0, [3]), (buffer, 3, [4, 5, 6]),
+                                        (other, None, data.view(np.uint8).tolist())])
+
+    def test_replaced_data_unchanged(self):
+        buffer, array = object(), np.zeros(4, dtype=np.uint8)
+        self.model.upload(buffer, array)
+        self.model.upload(buffer, np.array([1], dtype=np.uint8), 0)
+        self.model.sync()
+        self.assertEqual(array.tolist(), [0] * 4)
+        self.assertEqual(self.uploads[0][2], [1, 0, 0, 0])
+
+    def test_merged_count(self):
+        profiling.profiler.reset()
+        profiling.enable()
+        try:
+            node, buffer = _Node(), object()
+            for i in range(3):
+                self.model.setProperty(node, 'setValue', i)
+                self.model.upload(buffer, np.zeros(2, dtype=np.uint8))
+            self.assertEqual(profiling.profiler.counters['merged_updates'], 4)
+        finally:
+            profiling.disable()
+            profiling.profiler.reset()
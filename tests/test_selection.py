@@ -0,0 +1,81 @@
+"""Tests for `orbit_viewer.selection` and `TrajectoryIndex.select`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer.picking import TrajectoryIndex
+from orbit_viewer.selection import LiveSelection, changed_slice, interval_mask
+from orbit_viewer.shapes import Cuboid, Sphere, select
+from orbit_viewer.synthetic import orbit
+
+
+class TestIndexSelect(unittest.TestCase):
+
+    def setUp(self):
+        self.trajectory = orbit('mms', '2020-01-01', '2020-01-15')
+
+    def test_matches_contains(self):
+        index = TrajectoryIndex(self.trajectory, leaf_size=8, branching=4)
+        a, b = Sphere(-15, 4, 2, 6), Cuboid(-25, -3, -2, 6, 6, 4)
+        for shape in [a, b, a | b, Sphere(0, 0, 0, 30) - a, ~b, Sphere(100, 0, 0, 1)]:
+            np.testing.assert_array_equal(index.select(shape), shape.contains(self.trajectory.positions))
+
+    def test_lengths(self):
+        # the last sample only ends the last segment of the last leaf
+        everything, first = Sphere(0, 0, 0, 100), Sphere(*self.trajectory.positions[0], 0.1)
+        for n in [0, 1, 2, 8, 9, 10, 65, 66]:
+            trajectory = self.trajectory[:n]
+            index = TrajectoryIndex(trajectory, leaf_size=8, branching=8)
+            for shape in [everything, first]:
+                np.testing.assert_array_equal(index.select(shape), shape.contains(trajectory.positions))
+
+
+class TestLiveSelection(unittest.TestCase):
+
+    def test_update_one_shape(self):
+        trajectory = orbit('mms', '2020-01-01', '2020-01-15')
+        selection = LiveSelection(TrajectoryIndex(trajectory))
+        sphere, cuboid = Sphere(-15, 4, 2, 6), Cuboid(-25, -3, -2, 6, 6, 4)
+
+        selection.set_shape('sphere', sphere)
+        selection.set_shape('cuboid', cuboid)
+        np.testing.assert_array_equal(selection.mask, select(trajectory.positions, [sphere, cuboid]))
+
+        for center in [(-12, 5, 2), (-20, 3, 1), (50, 0, 0)]:
+            previous = selection.mask.copy()
+            sphere.move_handle('center', center)
+            changed = selection.set_shape('sphere', sphere)
+            np.testing.assert_array_equal(selection.mask, select(trajectory.positions, [sphere, cuboid]))
+
+            # nothing changed outside of the returned slice
+            outside = np.ones(len(trajectory), dtype=bool)
+            outside[changed] = False
+            np.testing.assert_array_equal(selection.mask[outside], previous[outside])
+
+        selection.remove('cuboid')
+        self.assertFalse(selection.mask.any())
+        self.assertEqual(len(selection.intervals()), 0)
+
+    def test_intervals_mask(self):
+        trajectory = orbit('mms', '2020-01-01', '2020-01-03')
+        selection = LiveSelection(TrajectoryIndex(trajectory))
+        sphere = Sphere(-15, 4, 2, 6)
+        selection.set_shape('sphere', sphere)
+
+        times = trajectory.times
+        selected = np.array([[times[10], times[20]], [times[15], times[30] - 1]]).view('datetime64[ns]')
+        mask = interval_mask(times, selected)
+        self.assertEqual(np.flatnonzero(mask).tolist(), list(range(10, 30)))
+
+        selection.set_mask('conjunctions', mask)
+        np.testing.assert_array_equal(selection.mask, mask | sphere.contains(trajectory.positions))
+        selection.set_mask('conjunctions', interval_mask(times, []))
+        np.testing.assert_array_equal(selection.mask, sphere.contains(trajectory.positions))
+
+    def test_changed_slice(self):
+        a = np.array([0, 1, 1, 0, 0, 0], dtype=bool)
+        b = np.array([0, 1, 0, 0, 1, 0], dtype=bool)
+        self.assertEqual(changed_slice(a, b), slice(2, 5))
+        self.assertEqual(changed_slice(None, a), slice(1, 3))
+        self.assertEqual(changed_slice(a, a.copy()), slice(0, 0))
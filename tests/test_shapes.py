@@ -0,0 +1,128 @@
+"""Tests for `orbit_viewer.shapes`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer.shapes import MIN_SIZE, Sphere, Cuboid, parse_shape, select, intervals
+
+
+class TestShapes(unittest.TestCase):
+
+    def setUp(self):
+        self.positions = np.array([[0, 0, 0],
+                                   [1, 0, 0],
+                                   [3, 0, 0],
+                                   [5, 5, 5],
+                                   [0.5, 0.5, 0.5]], dtype=np.float64)
+
+    def test_sphere(self):
+        mask = Sphere(0, 0, 0, 2).contains(self.positions)
+        self.assertEqual(mask.tolist(), [True, True, False, False, True])
+
+    def test_cuboid(self):
+        mask = Cuboid(4, 4, 4, 2, 2, 2).contains(self.positions)
+        self.assertEqual(mask.tolist(), [False, False, False, True, False])
+
+    def test_select_is_union(self):
+        mask = select(self.positions, [Sphere(0, 0, 0, 2), Cuboid(4, 4, 4, 2, 2, 2)])
+        self.assertEqual(mask.tolist(), [True, True, False, True, True])
+
+    def test_parse(self):
+        self.assertIsInstance(parse_shape('sphere:1,2,3,4'), Sphere)
+        self.assertIsInstance(parse_shape('cuboid:1,2,3,4,5,6'), Cuboid)
+        with self.assertRaises(ValueError):
+            parse_shape('sphere:1,2,3')
+        with self.assertRaises(ValueError):
+            parse_shape('cone:1,2,3')
+
+    def test_intervals(self):
+        times = np.arange(8)
+        mask = np.array([1, 1, 0, 0, 1, 0, 1, 1], dtype=bool)
+        self.assertEqual(intervals(times, mask).tolist(), [[0, 1], [4, 4], [6, 7]])
+        self.assertEqual(intervals(times, np.zeros(8, dtype=bool)).shape, (0, 2))
+
+
+def _unit_sphere_model(radius):
+    def model(theta, phi):
+        return (radius * np.cos(theta),
+                radius * np.sin(theta) * np.cos(phi),
+                radius * np.sin(theta) * np.sin(phi))
+    return model
+
+
+class TestShapeAlgebra(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        # a random walk, so that chunks are spatially coherent like orbits
+        self.positions = np.cumsum(rng.normal(scale=0.3, size=(20000, 3)), axis=0)
+
+    def _check(self, expression):
+        expected = expression.contains(self.positions)
+        for chunk_size in [64, 1000, 65536]:
+            np.testing.assert_array_equal(expression.compile(chunk_size).contains(self.positions), expected)
+        return expected
+
+    def test_operators(self):
+        a = Sphere(0, 0, 0, 20)
+        b = Cuboid(-2, -2, -2, 8, 8, 8)
+        c = Sphere(5, 5, 5, 6)
+
+        inside_a = a.contains(self.positions)
+        inside_b = b.contains(self.positions)
+        inside_c = c.contains(self.positions)
+
+        np.testing.assert_array_equal(self._check(a | b), inside_a | inside_b)
+        np.testing.assert_array_equal(self._check(a & b), inside_a & inside_b)
+        np.testing.assert_array_equal(self._check(a - b), inside_a & ~inside_b)
+        np.testing.assert_array_equal(self._check(~a), ~inside_a)
+        np.testing.assert_array_equal(self._check((a - b) | (c & ~a)), (inside_a & ~inside_b) | (inside_c & ~inside_a))
+
+    def test_model_region(self):
+        from orbit_viewer.shapes import InsideModel
+
+        sheath = InsideModel(_unit_sphere_model(15.0)) - InsideModel(_unit_sphere_model(10.0))
+        r = np.linalg.norm(self.positions, axis=1)
+        np.testing.assert_array_equal(self._check(sheath), (r <= 15.0) & (r > 10.0))
+        np.testing.assert_array_equal(self._check(sheath & Sphere(12, 0, 0, 6)),
+                                      (r <= 15.0) & (r > 10.0) & Sphere(12, 0, 0, 6).contains(self.positions))
+
+    def test_flattening(self):
+        a, b, c = Sphere(0, 0, 0, 1), Sphere(1, 0, 0, 1), Sphere(2, 0, 0, 1)
+        self.assertEqual(len((a | (b | c)).shapes), 3)
+        self.assertIs(~~a, a)
+
+    def test_classify_boxes(self):
+        rng = np.random.default_rng(2)
+        lo = rng.uniform(-10, 10, size=(500, 3))
+        hi = lo + rng.uniform(0, 6, size=(500, 3))
+        a, b = Sphere(0, 0, 0, 12), Cuboid(-4, -4, -4, 8, 8, 8)
+
+        for shape in [a, b, a | b, a & b, a - b, ~a]:
+            inside, outside = shape.classify(lo, hi)
+            for i in range(len(lo)):
+                decision = shape._decide(lo[i], hi[i])
+                self.assertEqual(inside[i], decision is True, shape)
+                self.assertEqual(outside[i], decision is False, shape)
+
+
+class TestHandles(unittest.TestCase):
+
+    def test_sphere(self):
+        sphere = Sphere(1, 2, 3, 4)
+        np.testing.assert_array_equal(sphere.handles()['radius'], [3, 2, 3])
+        sphere.move_handle('center', (5, 5, 5))
+        np.testing.assert_array_equal(sphere.center, [5, 5, 5])
+        sphere.move_handle('radius', (5, 8, 5))
+        self.assertEqual(sphere.diameter, 6.0)
+        with self.assertRaises(KeyError):
+            sphere.move_handle('corner', (0, 0, 0))
+
+    def test_cuboid(self):
+        cuboid = Cuboid(0, 0, 0, 2, 4, 6)
+        np.testing.assert_array_equal(cuboid.handles()['center'], [1, 2, 3])
+        cuboid.move_handle('center', (0, 0, 0))
+        np.testing.assert_array_equal(cuboid.p0, [-1, -2, -3])
+        cuboid.move_handle('corner', (1, -5, 1))
+        np.testing.assert_array_equal(cuboid.size, [2, MIN_SIZE, 4])
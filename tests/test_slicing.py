@@ -0,0 +1,81 @@
+"""Tests for `orbit_viewer.slicing`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer import geometry
+from orbit_viewer.slicing import MeshSlicer, TrajectorySlicer, parse_plane, plane_axes, plane_coordinates
+from orbit_viewer.synthetic import orbit
+
+
+def _sphere(theta, phi):
+    return np.cos(theta), np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi)
+
+
+class TestMeshSlicer(unittest.TestCase):
+
+    def setUp(self):
+        vertices = geometry.model_vertex_data(np.pi, 2 * np.pi, _sphere, 60, 60)
+        self.positions = np.ascontiguousarray(vertices[:, 0:3])
+        self.triangles = geometry.grid_index_data(60, 60).reshape(-1, 3)
+
+    def test_cut_sphere(self):
+        normal = np.array([1.0, 2.0, 2.0]) / 3.0
+        slicer = MeshSlicer(self.positions, self.triangles, normal)
+        for offset in [-0.95, -0.5, 0.0, 0.3, 0.99]:
+            segments = slicer.slice(offset)
+
+            # as many segments as triangles with vertices on both sides
+            above = (self.positions @ normal)[self.triangles] > offset
+            self.assertEqual(len(segments), np.count_nonzero(above.any(axis=1) & ~above.all(axis=1)))
+
+            points = segments.reshape(-1, 3)
+            np.testing.assert_allclose(points @ normal, offset, atol=1e-6)
+            # on the circle where the plane cuts the (tessellated) unit sphere
+            radius = np.linalg.norm(points - offset * normal, axis=1)
+            np.testing.assert_allclose(radius, np.sqrt(1 - offset ** 2), atol=0.02)
+
+    def test_outside(self):
+        slicer = MeshSlicer(self.positions, self.triangles, (0, 0, 1))
+        self.assertEqual(slicer.slice(1.5).shape, (0, 2, 3))
+        self.assertEqual(slicer.slice(-1.0).shape, (0, 2, 3))
+
+
+class TestTrajectorySlicer(unittest.TestCase):
+
+    def test_crossings(self):
+        trajectory = orbit('mms', '2020-01-01', '2020-01-10')
+        crossings = TrajectorySlicer(trajectory, (0, 0, 1)).slice(1.0)
+
+        z = trajectory.positions[:, 2]
+        np.testing.assert_array_equal(crossings.index, np.flatnonzero((z[:-1] > 1.0) != (z[1:] > 1.0)))
+        np.testing.assert_allclose(crossings.position[:, 2], 1.0)
+        self.assertTrue(np.all(crossings.time >= trajectory.times[crossings.index]))
+        self.assertTrue(np.all(crossings.time <= trajectory.times[crossings.index + 1]))
+
+    def test_short(self):
+        trajectory = orbit('mms', '2020-01-01', '2020-01-02')
+        for n in [0, 1]:
+            self.assertEqual(len(TrajectorySlicer(trajectory[:n], (0, 1, 0)).slice(0.0).index), 0)
+
+
+class TestPlanes(unittest.TestCase):
+
+    def test_parse(self):
+        normal, offset = parse_plane('xz:2.5')
+        self.assertEqual(normal.tolist(), [0, 1, 0])
+        self.assertEqual(offset, 2.5)
+        self.assertEqual(parse_plane('XY')[1], 0.0)
+        for text in ['ab', 'xy:a']:
+            with self.assertRaises(ValueError):
+                parse_plane(text)
+
+    def test_axes(self):
+        points = np.array([[1.0, 2.0, 3.0]])
+        self.assertEqual(plane_coordinates(points, (0, 0, 1)).tolist(), [[1.0, 2.0]])
+        self.assertEqual(plane_coordinates(points, (0, 1, 0)).tolist(), [[1.0, 3.0]])
+        self.assertEqual(plane_coordinates(points, (1, 0, 0)).tolist(), [[2.0, 3.0]])
+
+        u, v = plane_axes((1, 1, 1))
+        np.testing.assert_allclose([u @ v, u @ [1, 1, 1], v @ [1, 1, 1]], 0.0, atol=1e-12)
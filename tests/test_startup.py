@@ -0,0 +1,43 @@
+"""Startup-time guard: importing the computation APIs must stay cheap and Qt-free.
+
+Runs a fresh interpreter with ``-X importtime`` and checks the import
+tree it reports.
+"""
+
+import subprocess
+import sys
+import unittest
+
+# cumulative import time of the package itself, numpy excluded (seconds)
+PACKAGE_BUDGET = 0.05
+
+
+def _import_times(code: str):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True, check=True)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(self_us) * 1e-6
+    return times
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_computation_api_does_not_import_qt(self):
+        times = _import_times('import orbit_viewer as ov; ov.select; ov.intervals; ov.decimate; '
+                              'ov.model_vertex_data; ov.grid_index_data')
+
+        self.assertFalse([name for name in times if name.startswith('PySide2')])
+        own = sum(t for name, t in times.items() if name.startswith('orbit_viewer'))
+        self.assertLess(own, PACKAGE_BUDGET)
+
+    def test_cli_imports_standard_library_only(self):
+        times = _import_times('import orbit_viewer.cli')
+
+        self.assertNotIn('numpy', times)
+        self.assertFalse([name for name in times if name.startswith('PySide2')])
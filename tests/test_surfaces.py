@@ -0,0 +1,78 @@
+"""Tests for `orbit_viewer.surfaces`."""
+
+import multiprocessing
+import time
+import unittest
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from orbit_viewer import geometry
+from orbit_viewer.surfaces import SharedSurface, SurfaceBuilder
+
+
+def _sphere(theta, phi):
+    return np.cos(theta), np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi)
+
+
+def _failing(theta, phi):
+    raise ValueError('no model')
+
+
+def _slow(theta, phi):
+    time.sleep(2)
+    return _sphere(theta, phi)
+
+
+class TestSurfaces(unittest.TestCase):
+
+    def test_tiles(self):
+        for begin, end in [(0, 120), (0, 7), (50, 120), (119, 120)]:
+            out = np.empty((end - begin, geometry.ELEMENT_SIZE), dtype=np.single)
+            geometry.model_vertex_rows(out, np.pi, 2 * np.pi, _sphere, 10, 12, begin)
+            np.testing.assert_array_equal(out, geometry.model_vertex_data(np.pi, 2 * np.pi, _sphere, 10, 12)[begin:end])
+
+        indices = geometry.grid_index_data(7, 5)
+        rows = [geometry.grid_index_rows(7, first, stop, indices.dtype) for first, stop in [(0, 1), (1, 3), (3, 4)]]
+        np.testing.assert_array_equal(np.concatenate(rows), indices)
+
+    def test_attach(self):
+        surface = SharedSurface(4, 3)
+        try:
+            surface.vertices[:] = 1.5
+            surface.indices[:] = 7
+            other = SharedSurface.attach(surface.handle)
+            self.assertEqual(other.vertices.sum(), 1.5 * 12 * geometry.ELEMENT_SIZE)
+            self.assertEqual(other.indices.dtype, np.uint16)
+            self.assertEqual(len(other.indices), 6 * 3 * 2)
+            other.close()
+        finally:
+            surface.release()
+
+    def test_builder(self):
+        with SurfaceBuilder(2, tile_vertices=50) as builder:
+            pending = [builder.submit(_sphere, 10, 12), builder.submit(_sphere, 2, 2, np.pi, np.pi)]
+            for (width, height, theta, phi), p in zip([(10, 12, np.pi * 0.75, 2 * np.pi), (2, 2, np.pi, np.pi)],
+                                                      pending):
+                surface = p.result()
+                np.testing.assert_array_equal(surface.vertices,
+                                              geometry.model_vertex_data(theta, phi, _sphere, width, height))
+                np.testing.assert_array_equal(surface.indices, geometry.grid_index_data(width, height))
+                surface.release()
+
+            with self.assertRaises(ValueError):
+                builder.submit(_failing, 10, 10).result()
+
+    def test_released_on_timeout(self):
+        with SurfaceBuilder(1) as builder:
+            pending = builder.submit(_slow, 4, 4)
+            handle = pending.surface.handle
+            with self.assertRaises(multiprocessing.TimeoutError):
+                pending.result(0.01)
+
+            for name in handle[:2]:
+                with self.assertRaises(FileNotFoundError):
+                    shared_memory.SharedMemory(name)
+            with self.assertRaises(RuntimeError):
+                pending.result()
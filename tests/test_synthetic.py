@@ -0,0 +1,79 @@
+"""Tests for `orbit_viewer.synthetic`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer import synthetic
+from orbit_viewer.orbits import EARTH_RADIUS_KM
+
+
+class TestSynthetic(unittest.TestCase):
+
+    def test_solve_kepler(self):
+        m = np.linspace(-10, 10, 1001)
+        for e in [0.0, 0.3, 0.9, 0.99]:
+            ecc = synthetic.solve_kepler(m, e)
+            difference = np.remainder(ecc - e * np.sin(ecc) - m + np.pi, 2 * np.pi) - np.pi
+            np.testing.assert_allclose(difference, 0.0, atol=1e-9)
+
+    def test_apsides_and_period(self):
+        el = synthetic.elements('mms')
+        period = 2 * np.pi * np.sqrt((el.a * EARTH_RADIUS_KM) ** 3 / synthetic.EARTH_MU)
+        times = np.datetime64('2020-01-01', 'ns') + (np.linspace(0, 1, 10001) * period * 1e9).astype('m8[ns]')
+
+        r = np.linalg.norm(synthetic.propagate(el, times)[0], axis=1)
+        self.assertAlmostEqual(r.min(), 1.2, places=6)
+        self.assertAlmostEqual(r.max(), 25.0, places=4)
+        # back at perigee after one period
+        self.assertAlmostEqual(r[-1], 1.2, places=6)
+
+    def test_circular_and_velocities(self):
+        trajectory = synthetic.orbit('geo', '2020-01-01', '2020-01-02', velocities=True)
+        r = np.linalg.norm(trajectory.positions, axis=1)
+        np.testing.assert_allclose(r, 42164 / EARTH_RADIUS_KM)
+        np.testing.assert_allclose(np.linalg.norm(trajectory.velocities, axis=1), 3.0747, rtol=1e-4)
+
+        # velocities are the derivative of the positions
+        el = synthetic.elements('heo')
+        times = np.arange(0, 3600 * 10 ** 9, 10 ** 9)
+        positions, velocities = synthetic.propagate(el, times, velocities=True)
+        derivative = np.gradient(positions[0], axis=0) * EARTH_RADIUS_KM  # km/s, 1 s steps
+        np.testing.assert_allclose(velocities[0][1:-1], derivative[1:-1], rtol=1e-3, atol=1e-3)
+
+    def test_chunks(self):
+        el = synthetic.elements('leo')
+        times = np.arange(0, 10 ** 4) * 10 ** 10
+        np.testing.assert_array_equal(synthetic.propagate(el, times, chunk_size=333),
+                                      synthetic.propagate(el, times))
+
+    def test_orbits_together(self):
+        m = np.linspace(-10, 10, 1001) + np.arange(3)[:, np.newaxis]
+        e = np.array([[0.0], [0.5], [0.99]])
+        ecc = synthetic.solve_kepler(m, e)
+        difference = np.remainder(ecc - e * np.sin(ecc) - m + np.pi, 2 * np.pi) - np.pi
+        np.testing.assert_allclose(difference, 0.0, atol=1e-9)
+
+        base = synthetic.elements('heo')
+        el = synthetic.Elements(base.a * np.array([1.0, 0.9, 1.1]), np.array([0.2, 0.5, 0.7]),
+                                base.i, np.array([0.0, 1.0, 2.0]), base.argp, np.array([0.0, 3.0, 5.0]))
+        times = np.arange(0, 10 ** 4) * 10 ** 10
+        positions, velocities = synthetic.propagate(el, times, velocities=True, chunk_size=999)
+        for k in range(3):
+            alone = synthetic.propagate(synthetic.Elements(*(np.broadcast_to(field, 3)[k] for field in el)),
+                                        times, velocities=True)
+            np.testing.assert_allclose(positions[k], alone[0][0], atol=1e-9)
+            np.testing.assert_allclose(velocities[k], alone[1][0], atol=1e-5)
+
+    def test_constellation(self):
+        fleet = synthetic.constellation(4, 'mms', '2020-01-01', '2020-01-02', seed=3)
+        self.assertEqual(sorted(fleet), ['mms1', 'mms2', 'mms3', 'mms4'])
+        self.assertEqual(len(fleet['mms1']), 24 * 60)
+        self.assertFalse(np.allclose(fleet['mms1'].positions, fleet['mms2'].positions))
+
+        again = synthetic.constellation(4, 'mms', '2020-01-01', '2020-01-02', seed=3)
+        np.testing.assert_array_equal(again['mms3'].positions, fleet['mms3'].positions)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            synthetic.orbit('lunar', '2020-01-01', '2020-01-02')
@@ -0,0 +1,70 @@
+"""Tests for `orbit_viewer.ticks`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer.synthetic import orbit
+from orbit_viewer.ticks import (
+    DAY, HOUR, MINUTE, TickGenerator, interpolate, tick_labels, tick_step, tick_times, visible_range,
+)
+from orbit_viewer.trajectory import to_nanoseconds
+
+
+class TestTicks(unittest.TestCase):
+
+    def test_times(self):
+        start = int(to_nanoseconds('2020-01-01T23:41:10'))
+        stop = int(to_nanoseconds('2020-01-02T00:30'))
+        times, major = tick_times(start, stop, 15 * MINUTE)
+
+        expected = np.arange('2020-01-01T23:45', '2020-01-02T00:31', 15, dtype='datetime64[m]')
+        self.assertEqual(times.tolist(), to_nanoseconds(expected).tolist())
+        self.assertEqual(major.tolist(), [False, True, False, False])
+
+    def test_step(self):
+        self.assertEqual(tick_step(DAY, 24), HOUR)
+        self.assertEqual(tick_step(DAY, 25), HOUR)
+        self.assertEqual(tick_step(DAY, 23), 2 * HOUR)
+        self.assertEqual(tick_step(0, 1), MINUTE)
+        self.assertEqual(tick_step(1000 * DAY, 10), 10 * DAY)
+
+    def test_interpolate(self):
+        trajectory = orbit('mms', '2020-01-01', '2020-01-02')
+        times = trajectory.times[[0, 10, -1]]
+        np.testing.assert_allclose(interpolate(trajectory, times), trajectory.positions[[0, 10, -1]])
+
+        middle = (trajectory.times[10] + trajectory.times[11]) // 2
+        np.testing.assert_allclose(interpolate(trajectory, np.array([middle]))[0],
+                                   trajectory.positions[10:12].mean(axis=0))
+
+    def test_labels(self):
+        times, major = tick_times(int(to_nanoseconds('2020-01-01T23:00')), int(to_nanoseconds('2020-01-02T01:00')),
+                                  HOUR)
+        self.assertEqual(tick_labels(times, major, HOUR), ['23:00', '2020-01-02', '01:00'])
+        self.assertEqual(tick_labels(times[:1], major[:1], DAY), ['2020-01-01'])
+
+
+class TestTickGenerator(unittest.TestCase):
+
+    def test_regenerate(self):
+        trajectory = orbit('mms', '2020-01-01', '2020-01-05')
+        generator = TickGenerator(trajectory, spacing=50.0)
+        start, stop = int(trajectory.times[0]), int(trajectory.times[-1])
+
+        ticks = generator.ticks(start, stop, 2500.0)
+        self.assertEqual(ticks.step, 2 * HOUR)
+        self.assertEqual(ticks.major.sum(), 4)
+        np.testing.assert_allclose(ticks.positions, interpolate(trajectory, ticks.times))
+
+        # the same ticks when panning within a step, others when zooming
+        self.assertIsNone(generator.ticks(start, stop - MINUTE, 2500.0))
+        self.assertIsNotNone(generator.ticks(start + MINUTE, stop, 2500.0))
+        self.assertEqual(generator.ticks(start, stop, 10000.0).step, 30 * MINUTE)
+
+    def test_visible_range(self):
+        times = np.arange(5) * HOUR
+        xy = np.array([[-10.0, 0], [10, 10], [40, 50], [70, 90], [900, 10]])
+        front = np.array([True, True, True, False, True])
+        self.assertEqual(visible_range(times, xy, front, 800, 600), (HOUR, 2 * HOUR, 50.0))
+        self.assertIsNone(visible_range(times, xy, np.zeros(5, dtype=bool), 800, 600))
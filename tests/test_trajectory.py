@@ -0,0 +1,54 @@
+"""Tests for `orbit_viewer.trajectory`."""
+
+import unittest
+
+import numpy as np
+
+from orbit_viewer.trajectory import Trajectory
+
+
+def _trajectory(n=100, start='2020-01-01'):
+    times = np.datetime64(start, 'ns') + np.arange(n) * np.timedelta64(1, 'm')
+    positions = np.arange(3 * n, dtype=np.float64).reshape(n, 3)
+    return Trajectory(times, positions, velocities=np.ones((n, 3)), columns={'flag': np.arange(n) % 2})
+
+
+class TestTrajectory(unittest.TestCase):
+
+    def test_types(self):
+        t = _trajectory()
+        self.assertEqual(t.times.dtype, np.int64)
+        self.assertEqual(t.positions.dtype, np.float64)
+        self.assertEqual(t.velocities.dtype, np.float32)
+        self.assertEqual(t.positions32.dtype, np.float32)
+        self.assertTrue(t.positions32.flags['C_CONTIGUOUS'])
+
+    def test_between_is_view(self):
+        t = _trajectory()
+        part = t.between('2020-01-01T00:10', '2020-01-01T00:20')
+        self.assertEqual(len(part), 10)
+        self.assertEqual(str(part.datetimes[0]), '2020-01-01T00:10:00.000000000')
+        self.assertTrue(np.shares_memory(part.positions, t.positions))
+        self.assertTrue(np.shares_memory(part.columns['flag'], t.columns['flag']))
+
+    def test_slices_share_float32_positions(self):
+        t = _trajectory()
+        t.positions32
+        self.assertTrue(np.shares_memory(t[5:10].positions32, t.positions32))
+
+    def test_concatenate(self):
+        t = Trajectory.concatenate([_trajectory(10), _trajectory(5, '2020-02-01')])
+        self.assertEqual(len(t), 15)
+        self.assertEqual(t.velocities.shape, (15, 3))
+        self.assertEqual(len(t.columns['flag']), 15)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            Trajectory(np.arange(3), np.zeros((4, 3)))
+        with self.assertRaises(ValueError):
+            Trajectory(np.array([2, 1, 3]), np.zeros((3, 3)))
+
+    def test_decimate(self):
+        t = _trajectory().decimate(10)
+        self.assertLessEqual(len(t), 10)
+        self.assertEqual(len(t.columns['flag']), len(t))